@@ -0,0 +1,137 @@
+"""Benchmark bulk moderation against a local fake of the Discord HTTP API
+
+Starts an aiohttp server that answers the kick, ban and bulk ban routes with
+a fixed latency and Discord-style per-route rate limit buckets (including
+X-RateLimit headers and 429 responses), points discord.py's HTTP client at
+it, and compares one request at a time (the single-member commands) with
+BulkModerationJob at several pool sizes.
+
+Run from the repository root:
+    python -m benchmarks.bulk_moderation
+"""
+import asyncio
+import json
+import time
+import discord
+from aiohttp import web
+from discord import http
+from utils.bulk_moderation import BulkModerationJob
+
+USER_COUNT = 400
+LATENCY = 0.1  # Seconds per fake API request
+BUCKET_LIMIT = 50  # Requests per route bucket per window
+BUCKET_WINDOW = 1.0
+GUILD_ID = 100_000_000_000_000_000
+
+class FakeDiscord:
+    def __init__(self):
+        self.buckets = {}  # route -> (window start, requests in window)
+        self.requests = 0
+        self.rate_limited = 0
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/api/v10/users/@me', self.me)
+        app.router.add_delete('/api/v10/guilds/{guild_id}/members/{user_id}', self.handle)
+        app.router.add_put('/api/v10/guilds/{guild_id}/bans/{user_id}', self.handle)
+        app.router.add_post('/api/v10/guilds/{guild_id}/bulk-ban', self.bulk_ban)
+        return app
+
+    async def me(self, request):
+        body = json.dumps({'id': '1', 'username': 'bench', 'discriminator': '0', 'avatar': None})
+        return web.Response(body=body.encode(), headers={'Content-Type': 'application/json'})
+
+    def _limit(self, bucket):
+        now = time.monotonic()
+        window_start, count = self.buckets.get(bucket, (now, 0))
+        if now - window_start >= BUCKET_WINDOW:
+            window_start, count = now, 0
+        reset_after = BUCKET_WINDOW - (now - window_start)
+        headers = {
+            'X-RateLimit-Limit': str(BUCKET_LIMIT),
+            'X-RateLimit-Reset-After': f"{reset_after:.3f}",
+            'X-RateLimit-Reset': f"{time.time() + reset_after:.3f}",
+            'X-RateLimit-Bucket': bucket
+        }
+        if count >= BUCKET_LIMIT:
+            self.rate_limited += 1
+            headers['X-RateLimit-Remaining'] = '0'
+            headers['Retry-After'] = f"{reset_after:.3f}"
+            body = {'message': 'You are being rate limited.', 'retry_after': reset_after, 'global': False}
+            headers['Content-Type'] = 'application/json'
+            return web.Response(body=json.dumps(body).encode(), status=429, headers=headers)
+        self.buckets[bucket] = (window_start, count + 1)
+        headers['X-RateLimit-Remaining'] = str(BUCKET_LIMIT - count - 1)
+        return headers
+
+    async def handle(self, request):
+        self.requests += 1
+        await asyncio.sleep(LATENCY)
+        limited = self._limit(f"{request.method}:{request.match_info['guild_id']}")
+        if isinstance(limited, web.Response):
+            return limited
+        return web.Response(status=204, headers=limited)
+
+    async def bulk_ban(self, request):
+        self.requests += 1
+        payload = await request.json()
+        await asyncio.sleep(LATENCY)
+        limited = self._limit(f"bulk:{request.match_info['guild_id']}")
+        if isinstance(limited, web.Response):
+            return limited
+        # discord.py only decodes bodies whose content type is exactly application/json
+        limited['Content-Type'] = 'application/json'
+        body = json.dumps({'banned_users': payload['user_ids'], 'failed_users': []})
+        return web.Response(body=body.encode(), headers=limited)
+
+class Moderator:
+    id = 2
+
+    def __str__(self):
+        return "bench-moderator"
+
+async def run_job(guild, action, user_ids, workers):
+    job = BulkModerationJob(guild, action, user_ids, Moderator(), "benchmark", workers=workers, max_per_second=1000.0)
+    start = time.perf_counter()
+    await job.start(None)
+    elapsed = time.perf_counter() - start
+    assert job.succeeded == len(user_ids), job.results
+    return elapsed
+
+async def main():
+    fake = FakeDiscord()
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    http.Route.BASE = f'http://127.0.0.1:{port}/api/v10'
+    client = discord.Client(intents=discord.Intents.none())
+    await client.http.static_login('benchmark-token')
+    guild = discord.Guild(data={'id': str(GUILD_ID), 'name': 'bench', 'owner_id': '1'}, state=client._connection)
+
+    user_ids = list(range(10**17, 10**17 + USER_COUNT))
+    results = []
+
+    # The single-member commands: one request at a time
+    start = time.perf_counter()
+    for user_id in user_ids:
+        await guild.kick(discord.Object(id=user_id))
+    results.append(("one at a time (kick)", time.perf_counter() - start))
+
+    for workers in (1, 4, 8):
+        results.append((f"job, {workers} worker{'s' if workers != 1 else ''} (kick)", await run_job(guild, 'kick', user_ids, workers)))
+
+    results.append(("job, 4 workers (bulk ban)", await run_job(guild, 'ban', user_ids, 4)))
+
+    await client.http.close()
+    await runner.cleanup()
+
+    print(f"{USER_COUNT} users, {LATENCY * 1000:.0f} ms per request, {BUCKET_LIMIT} requests/{BUCKET_WINDOW:.0f}s per route bucket")
+    for label, elapsed in results:
+        print(f"{label:28} {elapsed:7.2f} s {USER_COUNT / elapsed:8.1f} users/s")
+    print(f"fake API: {fake.requests} requests, {fake.rate_limited} answered 429")
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+"""Compare scanning every guild for a DM's author against the DM routing index
+
+Run from the repository root:
+    python -m benchmarks.dm_routing
+"""
+import random
+import time
+from utils.dm_routing import DMRoutingIndex
+
+GUILD_COUNT = 5000
+USER_COUNT = 200_000
+MEMBERS_PER_GUILD = 200
+CONFIGURED_FRACTION = 0.2  # Share of guilds with a DM reply channel
+DM_COUNT = 20_000
+
+class FakeMember:
+    def __init__(self, guild, user_id):
+        self.guild = guild
+        self.id = user_id
+        self.bot = False
+
+class FakeGuild:
+    def __init__(self, guild_id, user_ids):
+        self.id = guild_id
+        self._members = {user_id: FakeMember(self, user_id) for user_id in user_ids}
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    def get_member(self, user_id):
+        return self._members.get(user_id)
+
+def scan_route(guilds, dm_channels, user_id):
+    """The original DMManager.on_message loop"""
+    for guild in guilds:
+        member = guild.get_member(user_id)
+        if member:
+            if str(guild.id) in dm_channels:
+                return [guild.id]
+            return []
+    return []
+
+def main():
+    rng = random.Random(1234)
+    guilds = [FakeGuild(guild_id, rng.sample(range(USER_COUNT), MEMBERS_PER_GUILD)) for guild_id in range(GUILD_COUNT)]
+    dm_channels = {str(guild.id): 1 for guild in guilds if rng.random() < CONFIGURED_FRACTION}
+    dm_stream = [rng.randrange(USER_COUNT) for _ in range(DM_COUNT)]
+
+    index = DMRoutingIndex()
+    start = time.perf_counter()
+    for guild in guilds:
+        if str(guild.id) in dm_channels:
+            index.add_guild(guild)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for user_id in dm_stream:
+        scan_route(guilds, dm_channels, user_id)
+    scan_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for user_id in dm_stream:
+        index.route(user_id)
+    index_seconds = time.perf_counter() - start
+
+    # Every guild the scan finds must also be in the routed set
+    for user_id in dm_stream[:1000]:
+        assert set(scan_route(guilds, dm_channels, user_id)) <= set(index.route(user_id))
+
+    print(f"{GUILD_COUNT:,} guilds, {len(dm_channels):,} with a reply channel, {DM_COUNT:,} DMs")
+    print(f"scan every guild: {DM_COUNT / scan_seconds:14,.0f} DMs/s ({scan_seconds / DM_COUNT * 1e6:8.1f} us/DM)")
+    print(f"routing index:    {DM_COUNT / index_seconds:14,.0f} DMs/s ({index_seconds / DM_COUNT * 1e6:8.3f} us/DM)")
+    print(f"index build: {build_ms:.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Measure what recording a metric costs on the hot path
+
+Times MetricsRegistry.observe_command() for a handful of command names,
+error counting, and the overhead timed_listener adds to an empty listener,
+then renders the registry once to check scrape time.
+
+Run from the repository root:
+    python -m benchmarks.metrics
+"""
+import asyncio
+import time
+from utils.metrics import MetricsRegistry, timed_listener
+
+OBSERVATIONS = 1_000_000
+LISTENER_CALLS = 200_000
+COMMANDS = ['ping', 'weather', 'joke', 'meme', 'userinfo', 'translate', 'clear', 'info']
+
+class Bot:
+    def __init__(self):
+        self.metrics = MetricsRegistry()
+
+class Cog:
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def plain(self, message):
+        pass
+
+    @timed_listener('Cog.on_message')
+    async def timed(self, message):
+        pass
+
+def per_call(elapsed, calls):
+    return elapsed / calls * 1e6
+
+async def time_listener(func):
+    start = time.perf_counter()
+    for _ in range(LISTENER_CALLS):
+        await func(None)
+    return time.perf_counter() - start
+
+def main():
+    registry = MetricsRegistry()
+    values = [(i % 997) / 100.0 for i in range(OBSERVATIONS)]
+
+    start = time.perf_counter()
+    for i, value in enumerate(values):
+        registry.observe_command(COMMANDS[i & 7], value)
+    observe = per_call(time.perf_counter() - start, OBSERVATIONS)
+
+    error = ValueError()
+    start = time.perf_counter()
+    for _ in range(OBSERVATIONS):
+        registry.count_error('app_command', error)
+    count_error = per_call(time.perf_counter() - start, OBSERVATIONS)
+
+    cog = Cog(Bot())
+    plain = asyncio.run(time_listener(cog.plain))
+    timed = asyncio.run(time_listener(cog.timed))
+    listener_overhead = per_call(timed - plain, LISTENER_CALLS)
+
+    start = time.perf_counter()
+    text = registry.render()
+    render = (time.perf_counter() - start) * 1000
+
+    print(f"observe_command        {observe:6.2f} µs")
+    print(f"count_error            {count_error:6.2f} µs")
+    print(f"timed_listener overhead {listener_overhead:5.2f} µs")
+    print(f"render ({len(text.splitlines())} lines)     {render:6.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Measure the cost and memory footprint of the app command rate limiter
+
+Feeds two million distinct users through RateLimiter and reports the time
+per check and the traced memory held, which should level off at
+max_tracked_users buckets.
+
+Run from the repository root:
+    python -m benchmarks.rate_limiter
+"""
+import time
+import tracemalloc
+from utils.rate_limiter import RateLimiter
+
+USER_COUNT = 2_000_000
+MAX_TRACKED_USERS = 50_000
+COMMANDS = ['ping', 'weather', 'joke', 'meme', 'userinfo']
+
+def main():
+    limiter = RateLimiter(5, 10.0, 10**9, max_tracked_users=MAX_TRACKED_USERS,
+                          command_overrides={'weather': {'per_user': 2, 'per_bucket': 30.0}})
+
+    tracemalloc.start()
+    checkpoints = []
+    start = time.perf_counter()
+    for i in range(USER_COUNT):
+        limiter.check(10**17 + i, COMMANDS[i % len(COMMANDS)])
+        if (i + 1) % 500_000 == 0:
+            checkpoints.append((i + 1, tracemalloc.get_traced_memory()[0]))
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    # One user spamming a command: 5 allowed, the rest rejected
+    spammer = RateLimiter(5, 10.0, 100)
+    results = [spammer.check(1, 'meme') for _ in range(20)]
+
+    print(f"{USER_COUNT:,} distinct users, LRU capped at {MAX_TRACKED_USERS:,} buckets")
+    print(f"check(): {elapsed / USER_COUNT * 1e6:.2f} us/call (under tracemalloc)")
+    for users, size in checkpoints:
+        print(f"  after {users:>9,} users: {size / 2**20:6.1f} MiB traced, {len(limiter):,} buckets")
+    print(f"spammer: {sum(1 for r in results if r == 0)} allowed, {sum(1 for r in results if r)} rejected, "
+          f"retry after {results[-1]:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Measure the memory and CPU cost of 100k pending reminders
+
+The old /remindme kept one sleeping task (plus its interaction) per reminder;
+ReminderScheduler keeps one heap tuple per reminder and a single task. This
+compares the memory held by 100k sleeping tasks with the scheduler's heap,
+and times adding, loading and firing reminders.
+
+Run from the repository root:
+    python -m benchmarks.reminders
+"""
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from utils.reminders import ReminderScheduler
+
+REMINDER_COUNT = 100_000
+
+async def sleeping_tasks():
+    """Memory held by one asyncio.sleep task per reminder"""
+    async def remind(duration, text):
+        await asyncio.sleep(duration)
+
+    tracemalloc.start()
+    tasks = [asyncio.create_task(remind(3600 + i, f"reminder {i}")) for i in range(REMINDER_COUNT)]
+    await asyncio.sleep(0)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return size
+
+async def main():
+    task_bytes = await sleeping_tasks()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'reminders.db')
+        delivered = []
+
+        async def deliver(batch):
+            delivered.extend(batch)
+
+        scheduler = ReminderScheduler(path, deliver)
+        await scheduler.open()
+
+        # /remindme path: one insert on the DB thread plus a heap push
+        now = time.time()
+        start = time.perf_counter()
+        for i in range(1000):
+            await scheduler.add(i, 1, f"reminder {i}", now + 3600 + i)
+        add_us = (time.perf_counter() - start) / 1000 * 1e6
+
+        # Bulk load the rest directly, then time a cold start from disk
+        rows = [(now + 3600 + i, i, 1, f"reminder {i}", now) for i in range(1000, REMINDER_COUNT)]
+        with scheduler.db:
+            scheduler.db.executemany(
+                "INSERT INTO reminders (due_at, user_id, channel_id, text, created_at) VALUES (?, ?, ?, ?, ?)", rows
+            )
+        await scheduler.close()
+
+        tracemalloc.start()
+        scheduler = ReminderScheduler(path, deliver)
+        start = time.perf_counter()
+        await scheduler.open()
+        load_ms = (time.perf_counter() - start) * 1000
+        heap_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(scheduler) == REMINDER_COUNT
+
+        # Make every reminder due and time draining the heap in batches
+        scheduler.heap = [(now - 1,) + reminder[1:] for reminder in scheduler.heap]
+        start = time.perf_counter()
+        scheduler.wakeup.set()
+        while len(delivered) < REMINDER_COUNT:
+            await asyncio.sleep(0.001)
+        fire_seconds = time.perf_counter() - start
+        await scheduler.close()
+
+    print(f"{REMINDER_COUNT:,} pending reminders")
+    print(f"one sleeping task each: {task_bytes / 2**20:8.1f} MiB ({task_bytes / REMINDER_COUNT:6.0f} B/reminder)")
+    print(f"scheduler heap:         {heap_bytes / 2**20:8.1f} MiB ({heap_bytes / REMINDER_COUNT:6.0f} B/reminder)")
+    print(f"add (insert + push):    {add_us:8.1f} us/reminder")
+    print(f"load from disk:         {load_ms:8.1f} ms")
+    print(f"fire all (batches of {scheduler.batch_size}): {fire_seconds * 1000:8.1f} ms "
+          f"({REMINDER_COUNT / fire_seconds:,.0f} reminders/s incl. DB deletes)")
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""Compare per-role member scans against the role count index used by /roles
+
+Run from the repository root:
+    python -m benchmarks.role_counts
+"""
+import random
+import time
+import discord
+from utils.member_stats import MemberStatsIndex
+
+ROLE_COUNT = 200
+MEMBER_COUNT = 100_000
+ROLES_SHOWN = 60  # /roles lists at most three chunks of 20
+
+class FakeRole:
+    """Mimics discord.Role.members, which filters the whole guild member list"""
+
+    def __init__(self, guild, role_id):
+        self.guild = guild
+        self.id = role_id
+
+    @property
+    def members(self):
+        return [member for member in self.guild.members if self.id in member.role_ids]
+
+class FakeMember:
+    def __init__(self, guild, member_id, roles):
+        self.guild = guild
+        self.id = member_id
+        self.bot = False
+        self.status = discord.Status.offline
+        self.role_ids = {role.id for role in roles}
+        self.roles = roles
+
+class FakeGuild:
+    def __init__(self, rng):
+        self.id = 1
+        self.roles = [FakeRole(self, role_id) for role_id in range(ROLE_COUNT)]
+        self.members = []
+        for member_id in range(MEMBER_COUNT):
+            roles = rng.sample(self.roles, rng.randint(0, 5))
+            self.members.append(FakeMember(self, member_id, roles))
+
+def main():
+    rng = random.Random(1234)
+    guild = FakeGuild(rng)
+    shown = guild.roles[:ROLES_SHOWN]
+    print(f"{ROLE_COUNT} roles, {MEMBER_COUNT:,} members, {ROLES_SHOWN} roles shown per /roles call")
+
+    start = time.perf_counter()
+    scanned = [len(role.members) for role in shown]
+    scan_ms = (time.perf_counter() - start) * 1000
+
+    index = MemberStatsIndex()
+    start = time.perf_counter()
+    index.build(guild)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    stats = index.get(guild)
+    indexed = [stats.role_count(role) for role in shown]
+    lookup_ms = (time.perf_counter() - start) * 1000
+
+    assert scanned == indexed
+
+    print(f"len(role.members) per role: {scan_ms:10.2f} ms per call")
+    print(f"role count index lookup:    {lookup_ms:10.4f} ms per call")
+    print(f"index build (once per guild): {build_ms:8.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Measure event loop stalls caused by saving DM channel settings
+
+Compares the old synchronous json.dump on the event loop with
+JSONSettingsStore, using 50k guild entries.
+
+Run from the repository root:
+    python -m benchmarks.settings_store
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+from utils.settings_store import JSONSettingsStore
+
+GUILD_COUNT = 50_000
+SAVES = 20  # A burst of /setchannel calls
+TICK = 0.001
+
+async def measure_stall(action):
+    """Run action while a ticker records the longest gap between its wakeups"""
+    worst = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal worst
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(TICK)
+            now = time.perf_counter()
+            worst = max(worst, now - last - TICK)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await action()
+    elapsed = time.perf_counter() - start
+    running = False
+    await task
+    return worst * 1000, elapsed * 1000
+
+async def main():
+    data = {str(guild_id): guild_id * 7 for guild_id in range(10**17, 10**17 + GUILD_COUNT)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'dm_channels.json')
+
+        async def old_save():
+            # The previous DMManager.save_dm_channels, once per /setchannel
+            for _ in range(SAVES):
+                with open(path, 'w') as f:
+                    json.dump(data, f, indent=2)
+                await asyncio.sleep(0)
+
+        store = JSONSettingsStore(path, debounce=0.05)
+        store.data = data
+
+        async def new_save():
+            for _ in range(SAVES):
+                store.save()
+                await asyncio.sleep(0)
+            await store.flush()
+
+        old_stall, old_total = await measure_stall(old_save)
+        new_stall, new_total = await measure_stall(new_save)
+
+        with open(path, 'r') as f:
+            assert json.load(f) == data
+
+    print(f"{GUILD_COUNT:,} guild entries, burst of {SAVES} saves")
+    print(f"sync json.dump on loop:  worst stall {old_stall:8.2f} ms, burst took {old_total:8.1f} ms")
+    print(f"JSONSettingsStore:       worst stall {new_stall:8.2f} ms, burst took {new_total:8.1f} ms (1 write)")
+
+if __name__ == '__main__':
+    asyncio.run(main())
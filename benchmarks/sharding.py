@@ -0,0 +1,180 @@
+"""Benchmark sharded startup against a local stand-in for the Discord gateway
+
+Starts an aiohttp server that speaks enough of the gateway protocol for
+discord.py to log in: HELLO, heartbeat ACKs, and a READY followed by one
+GUILD_CREATE (with its members) per guild on the shard that owns it. Time to
+on_ready is measured at 1, 4 and 16 shards, with discord.py's default
+IDENTIFY pacing (5 seconds before every shard after the first) and with
+IdentifyLimiter honouring max_concurrency, along with the event loop lag
+seen while the guilds were streaming in.
+
+Run from the repository root:
+    python -m benchmarks.sharding
+"""
+import asyncio
+import json
+import time
+import discord
+import yarl
+from aiohttp import web
+from discord import http
+from discord.gateway import DiscordWebSocket
+from utils.loop_monitor import LoopMonitor
+from utils.sharding import IdentifyLimiter
+
+GUILD_COUNT = 2000
+MEMBERS_PER_GUILD = 25
+MAX_CONCURRENCY = 16  # What /gateway/bot reports for the fake application
+SHARD_COUNTS = (1, 4, 16)
+JOINED_AT = '2024-01-01T00:00:00+00:00'
+
+def guild_id(index):
+    # Spread guilds evenly: a guild's shard is (id >> 22) % shard_count
+    return (10**6 + index) << 22
+
+def guild_payload(index):
+    gid = guild_id(index)
+    members = [
+        {
+            'user': {'id': str(gid + 1 + n), 'username': f'user{n}', 'discriminator': '0', 'avatar': None},
+            'roles': [], 'joined_at': JOINED_AT, 'deaf': False, 'mute': False, 'flags': 0
+        }
+        for n in range(MEMBERS_PER_GUILD)
+    ]
+    return {
+        'id': str(gid), 'name': f'guild {index}', 'owner_id': members[0]['user']['id'],
+        'member_count': MEMBERS_PER_GUILD, 'members': members, 'large': False, 'unavailable': False,
+        'channels': [], 'threads': [], 'emojis': [], 'stickers': [], 'features': [], 'voice_states': [],
+        'presences': [], 'stage_instances': [], 'guild_scheduled_events': [], 'joined_at': JOINED_AT,
+        'roles': [{'id': str(gid), 'name': '@everyone', 'permissions': '0', 'position': 0, 'color': 0,
+                   'hoist': False, 'managed': False, 'mentionable': False}]
+    }
+
+class FakeGateway:
+    def __init__(self):
+        self.port = None
+        self.identifies = []  # monotonic time of each IDENTIFY
+        self.guilds = [json.dumps(guild_payload(index)) for index in range(GUILD_COUNT)]
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/api/v10/users/@me', self.me)
+        app.router.add_get('/api/v10/oauth2/applications/@me', self.application)
+        app.router.add_get('/api/v10/gateway/bot', self.gateway_bot)
+        app.router.add_get('/', self.websocket)
+        return app
+
+    @staticmethod
+    def json_response(payload):
+        # discord.py only decodes bodies whose content type is exactly application/json
+        return web.Response(body=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'})
+
+    async def me(self, request):
+        return self.json_response({'id': '1', 'username': 'bench', 'discriminator': '0', 'avatar': None, 'bot': True})
+
+    async def application(self, request):
+        return self.json_response({
+            'id': '1', 'name': 'bench', 'icon': None, 'description': '', 'bot_public': True,
+            'bot_require_code_grant': False, 'verify_key': '', 'flags': 0,
+            'owner': {'id': '2', 'username': 'owner', 'discriminator': '0', 'avatar': None}
+        })
+
+    async def gateway_bot(self, request):
+        return self.json_response({
+            'url': f'ws://127.0.0.1:{self.port}/', 'shards': 1,
+            'session_start_limit': {'total': 1000, 'remaining': 1000, 'reset_after': 0, 'max_concurrency': MAX_CONCURRENCY}
+        })
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({'op': 10, 'd': {'heartbeat_interval': 41250}}))
+        stream = None
+        async for message in ws:
+            payload = json.loads(message.data)
+            if payload['op'] == 1:
+                await ws.send_str(json.dumps({'op': 11}))
+            elif payload['op'] == 2:
+                self.identifies.append(time.monotonic())
+                shard_id, shard_count = payload['d']['shard']
+                stream = asyncio.create_task(self.stream_guilds(ws, shard_id, shard_count))
+        if stream is not None:
+            stream.cancel()
+        return ws
+
+    async def stream_guilds(self, ws, shard_id, shard_count):
+        owned = [index for index in range(GUILD_COUNT) if (guild_id(index) >> 22) % shard_count == shard_id]
+        ready = {
+            'v': 10, 'session_id': f'session-{shard_id}', 'resume_gateway_url': f'ws://127.0.0.1:{self.port}/',
+            'shard': [shard_id, shard_count], 'application': {'id': '1', 'flags': 0},
+            'user': {'id': '1', 'username': 'bench', 'discriminator': '0', 'avatar': None, 'bot': True},
+            'guilds': [{'id': str(guild_id(index)), 'unavailable': True} for index in owned]
+        }
+        await ws.send_str(json.dumps({'op': 0, 't': 'READY', 's': 1, 'd': ready}))
+        for seq, index in enumerate(owned, start=2):
+            await ws.send_str(f'{{"op":0,"t":"GUILD_CREATE","s":{seq},"d":{self.guilds[index]}}}')
+
+class BenchClient(discord.AutoShardedClient):
+    def __init__(self, shard_count, limiter):
+        intents = discord.Intents.default()
+        intents.members = True
+        super().__init__(intents=intents, shard_count=shard_count, chunk_guilds_at_startup=False)
+        self.limiter = limiter
+        self.ready = asyncio.Event()
+
+    async def before_identify_hook(self, shard_id, *, initial=False):
+        if self.limiter is None:
+            await super().before_identify_hook(shard_id, initial=initial)
+        else:
+            await self.limiter.wait(shard_id)
+
+    async def on_ready(self):
+        self.ready.set()
+
+async def start_up(fake, shard_count, limiter):
+    fake.identifies.clear()
+    client = BenchClient(shard_count, limiter)
+    monitor = LoopMonitor(interval=0.01, threshold=0.05, samples=100_000, log_interval=3600)
+    monitor.start()
+
+    start = time.perf_counter()
+    runner = asyncio.create_task(client.start('benchmark-token'))
+    ready = asyncio.create_task(client.ready.wait())
+    await asyncio.wait({runner, ready}, return_when=asyncio.FIRST_COMPLETED)
+    if runner.done():
+        runner.result()  # Login or connect failed; raise why
+    elapsed = time.perf_counter() - start
+    identify_spread = fake.identifies[-1] - fake.identifies[0]
+
+    monitor.close()
+    assert len(client.guilds) == GUILD_COUNT, len(client.guilds)
+    await client.close()
+    runner.cancel()
+    return elapsed, identify_spread, monitor.percentile(0.99), max(monitor.samples[:monitor.filled])
+
+async def main():
+    discord.utils.setup_logging(level=40)  # Errors only
+    fake = FakeGateway()
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    fake.port = site._server.sockets[0].getsockname()[1]
+
+    http.Route.BASE = f'http://127.0.0.1:{fake.port}/api/v10'
+    DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f'ws://127.0.0.1:{fake.port}/')
+
+    results = []
+    for shard_count in SHARD_COUNTS:
+        for label, limiter in (("default pacing", None), (f"max_concurrency={MAX_CONCURRENCY}", IdentifyLimiter(MAX_CONCURRENCY))):
+            results.append((shard_count, label, *await start_up(fake, shard_count, limiter)))
+
+    await runner.cleanup()
+
+    print(f"{GUILD_COUNT} guilds x {MEMBERS_PER_GUILD} members; on_ready includes discord.py's 2s guild_ready_timeout")
+    print(f"{'shards':>6}  {'identify pacing':22} {'on_ready':>9} {'identifies':>11} {'loop lag p99':>13} {'max':>8}")
+    for shard_count, label, elapsed, spread, p99, worst in results:
+        print(f"{shard_count:>6}  {label:22} {elapsed:8.2f}s {spread:10.2f}s {p99 * 1000:11.1f}ms {worst * 1000:6.1f}ms")
+
+if __name__ == '__main__':
+    asyncio.run(main())
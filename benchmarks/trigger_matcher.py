@@ -0,0 +1,77 @@
+"""Compare the compiled trigger matcher against the old per-trigger scan
+
+Run from the repository root:
+    python -m benchmarks.trigger_matcher
+"""
+import random
+import string
+import time
+from utils.triggers import TriggerMatcher, MODE_SUBSTRING, MODE_WORD
+
+TRIGGER_COUNTS = [10, 1000, 10000]
+MESSAGE_COUNT = 2000
+
+def random_word(rng, min_length=4, max_length=10):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(min_length, max_length)))
+
+def make_messages(rng, words):
+    """Chat-like messages; roughly one in ten contains a trigger"""
+    messages = []
+    for _ in range(MESSAGE_COUNT):
+        message_words = [random_word(rng, 2, 8) for _ in range(rng.randint(3, 25))]
+        if rng.random() < 0.1:
+            message_words.insert(rng.randrange(len(message_words) + 1), rng.choice(words))
+        messages.append(' '.join(message_words))
+    return messages
+
+def linear_match(triggers, message_content):
+    """The original Utility.on_message loop"""
+    words = message_content.split()
+    for trigger_word, response in triggers.items():
+        if trigger_word in words or trigger_word in message_content:
+            return response
+    return None
+
+def throughput(function, messages):
+    start = time.perf_counter()
+    for message in messages:
+        function(message)
+    return len(messages) / (time.perf_counter() - start)
+
+def main():
+    rng = random.Random(1234)
+    print(f"{'triggers':>10} {'linear msg/s':>14} {'compiled msg/s':>16} {'speedup':>9}")
+
+    for count in TRIGGER_COUNTS:
+        words = list({random_word(rng) for _ in range(count * 2)})[:count]
+        triggers = {word: f"response {i}" for i, word in enumerate(words)}
+        messages = make_messages(rng, words)
+
+        build_start = time.perf_counter()
+        matcher = TriggerMatcher((word, response, MODE_SUBSTRING) for word, response in triggers.items())
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        # Both strategies must agree before their speed means anything
+        for message in messages:
+            assert matcher.match(message) == linear_match(triggers, message)
+
+        linear = throughput(lambda message: linear_match(triggers, message), messages)
+        compiled = throughput(matcher.match, messages)
+        print(f"{count:>10} {linear:>14,.0f} {compiled:>16,.0f} {compiled / linear:>8.1f}x  (build {build_ms:.1f} ms)")
+
+        # Mixed modes: the automaton must agree with the per-trigger scan
+        mixed = TriggerMatcher(
+            (word, response, rng.choice([MODE_SUBSTRING, MODE_WORD])) for word, response in triggers.items()
+        )
+        for message in messages:
+            assert mixed.match(message) == mixed._linear_match(message)
+
+    # Whole-word mode should only fire on whitespace-delimited matches
+    word_matcher = TriggerMatcher([('cat', 'meow', MODE_WORD), ('dog', 'woof', MODE_SUBSTRING)])
+    assert word_matcher.match('concatenate hotdog') == 'woof'
+    assert word_matcher.match('my cat and dog') == 'meow'
+    assert word_matcher.match('cat') == 'meow'
+    assert word_matcher.match('category') is None
+
+if __name__ == '__main__':
+    main()
@@ -4,10 +4,26 @@ import logging
 import os
 import asyncio
 from config import BOT_CONFIG
+from utils.cluster import ClusterClient
+from utils.command_tree import BotCommandTree
+from utils.http_client import APIClient
+from utils.loop_monitor import LoopMonitor
+from utils.metrics import MetricsRegistry, MetricsServer
+from utils.presence import PresenceManager
+from utils.process_sampler import ProcessSampler
+from utils.rate_limiter import RateLimiter
+from utils.settings_store import JSONSettingsStore
+from utils.sharding import IdentifyLimiter, ShardStats, parse_shard_ids
+from utils.trigger_store import TriggerStore
+from utils.watchdog import CommandWatchdog
 
 logger = logging.getLogger(__name__)
 
-class DiscordBot(commands.Bot):
+# Sharded mode opens one gateway connection per shard instead of one for every guild
+SHARDING = BOT_CONFIG['sharding']
+BotBase = commands.AutoShardedBot if SHARDING['enabled'] else commands.Bot
+
+class DiscordBot(BotBase):
     """Main Discord bot class with enhanced functionality"""
     
     def __init__(self):
@@ -17,13 +33,22 @@ class DiscordBot(commands.Bot):
         intents.members = True
         intents.guilds = True
         
+        shard_options = {}
+        if SHARDING['enabled']:
+            shard_options = {
+                'shard_count': SHARDING['shard_count'],
+                'shard_ids': parse_shard_ids(SHARDING['shard_ids'])
+            }
+        
         # Initialize bot with slash command support
         super().__init__(
             command_prefix=BOT_CONFIG['prefix'],
             intents=intents,
             help_command=None,  # We'll create a custom help command
             case_insensitive=True,
-            strip_after_prefix=True
+            strip_after_prefix=True,
+            tree_cls=BotCommandTree,
+            **shard_options
         )
         
         # Store bot configuration
@@ -35,11 +60,118 @@ class DiscordBot(commands.Bot):
             'cogs.server',
             'cogs.dm_manager'
         ]
+        
+        # Latency histograms, error counts and gauges, served for Prometheus from setup_hook
+        self.metrics = MetricsRegistry()
+        self.metrics.gauge('bot_gateway_latency_seconds', 'Gateway heartbeat latency', lambda: self.latency)
+        self.metrics.gauge('bot_guilds', 'Guilds the bot is in', lambda: len(self.guilds))
+        self.metrics.cache_gauge('users', lambda: len(self.users))
+        self.metrics.cache_gauge('rate_limit_buckets', lambda: len(self.rate_limiter))
+        self.metrics.cache_gauge('trigger_guilds', lambda: len(self.trigger_store.cache))
+        self.metrics_server = None
+        
+        # Link to the supervisor when this process is one worker of a cluster started by main.py
+        cluster = BOT_CONFIG['cluster']
+        self.cluster = None
+        if cluster['id'] is not None:
+            self.cluster = ClusterClient(self, cluster['id'], cluster['ipc'], cluster['report_interval'])
+        
+        # Server count in the status text, updated at most once per interval however fast guilds come and go
+        self.presence = PresenceManager(self, lambda: f"{self.fleet_counts()[0]} servers | /help", BOT_CONFIG['presence']['interval'])
+        self.metrics.family('bot_presence_updates_total', 'Presence updates by result (sent, coalesced, unchanged)', 'result', self.presence.counts, kind='counter')
+        
+        # Per-shard connect/resume counters, latencies and guild counts
+        self.shard_stats = ShardStats(self)
+        self.identify_limiter = None
+        self.metrics.family('bot_shard_latency_seconds', 'Gateway heartbeat latency per shard', 'shard', lambda: dict(self.shard_stats.latencies()))
+        self.metrics.family('bot_shard_guilds', 'Guilds per shard', 'shard', lambda: {shard: guilds for shard, (guilds, _) in self.shard_stats.guild_counts().items()})
+        self.metrics.family('bot_shard_connects_total', 'Gateway sessions started per shard', 'shard', lambda: self.shard_stats.connects, kind='counter')
+        self.metrics.family('bot_shard_resumes_total', 'Gateway sessions resumed per shard', 'shard', lambda: self.shard_stats.resumes, kind='counter')
+        
+        # Event loop lag samples and the handlers that blocked the loop
+        loop_monitor = BOT_CONFIG['loop_monitor']
+        self.loop_monitor = LoopMonitor(
+            loop_monitor['interval'],
+            loop_monitor['threshold'],
+            loop_monitor['samples'],
+            log_interval=loop_monitor['log_interval']
+        )
+        self.metrics.gauge('bot_event_loop_lag_p50_seconds', 'Median event loop lag', lambda: self.loop_monitor.percentile(0.5))
+        self.metrics.gauge('bot_event_loop_lag_p99_seconds', '99th percentile event loop lag', lambda: self.loop_monitor.percentile(0.99))
+        self.metrics.gauge('bot_event_loop_stalls', 'Times the event loop was blocked past the threshold', lambda: self.loop_monitor.slow_callbacks)
+        
+        # Process RSS/CPU/fd/task/thread/GC history read by /info, /uptime and the metrics endpoint
+        process_sampler = BOT_CONFIG['process_sampler']
+        self.process_sampler = ProcessSampler(process_sampler['interval'], process_sampler['history'])
+        self.metrics.gauge('bot_process_rss_bytes', 'Resident memory of the bot process', lambda: self.process_sampler.latest()['rss'])
+        self.metrics.gauge('bot_process_cpu_percent', 'CPU use of the bot process since the previous sample', lambda: self.process_sampler.latest()['cpu'])
+        self.metrics.gauge('bot_process_open_fds', 'Open file descriptors', lambda: self.process_sampler.latest()['fds'])
+        self.metrics.gauge('bot_asyncio_tasks', 'Pending asyncio tasks', lambda: self.process_sampler.latest()['tasks'])
+        
+        # Per-user and global limits applied to every app command by BotCommandTree
+        rate_limits = BOT_CONFIG['rate_limits']
+        self.rate_limiter = RateLimiter(
+            rate_limits['per_user'],
+            rate_limits['per_bucket'],
+            rate_limits['global_rate_limit'],
+            max_tracked_users=rate_limits['max_tracked_users'],
+            command_overrides=rate_limits['command_overrides']
+        )
+        
+        # Time budget per app command, enforced by BotCommandTree
+        self.watchdog = CommandWatchdog(BOT_CONFIG['command_timeout'], BOT_CONFIG['command_budgets'])
+        
+        # Shared HTTP client for external APIs (session is opened in setup_hook)
+        self.api_client = APIClient(
+            BOT_CONFIG['api_endpoints'],
+            BOT_CONFIG['http_pool'],
+            BOT_CONFIG['circuit_breaker']
+        )
+        
+        # Persistent trigger words (database is opened in setup_hook)
+        self.trigger_store = TriggerStore(
+            BOT_CONFIG['triggers']['database'],
+            cache_size=BOT_CONFIG['triggers']['cache_size'],
+            flush_interval=BOT_CONFIG['triggers']['flush_interval']
+        )
+        
+        # DM reply channel per guild (loaded in setup_hook, written off the event loop)
+        self.dm_settings = JSONSettingsStore(BOT_CONFIG['cluster']['dm_settings_path'], debounce=BOT_CONFIG['settings_debounce'])
     
     async def setup_hook(self):
         """Called when the bot is starting up"""
         logger.info("Setting up bot...")
         
+        if self.cluster is not None:
+            # The supervisor paces IDENTIFYs for every worker
+            await self.cluster.start()
+        elif self.sharded:
+            # Let shards in different session start buckets IDENTIFY together
+            max_concurrency = SHARDING['max_concurrency']
+            if max_concurrency is None:
+                _, _, session_start_limit = await self.http.get_bot_gateway()
+                max_concurrency = session_start_limit.get('max_concurrency', 1)
+            self.identify_limiter = IdentifyLimiter(max_concurrency)
+            logger.info(f"Sharded mode: {self.shard_count or 'recommended'} shards, {max_concurrency} IDENTIFY at once")
+        
+        # Open the pooled HTTP session before any cog can use it
+        await self.api_client.start()
+        await self.trigger_store.open()
+        await self.dm_settings.load()
+        self.loop_monitor.start()
+        self.process_sampler.start()
+        
+        metrics_config = BOT_CONFIG['metrics']
+        if metrics_config['enabled']:
+            # Cluster workers each serve their own metrics, on consecutive ports
+            port = metrics_config['port'] + (self.cluster.cluster_id if self.cluster is not None else 0)
+            self.metrics_server = MetricsServer(self.metrics, metrics_config['host'], port)
+            try:
+                await self.metrics_server.start()
+            except OSError as e:
+                logger.error(f"Could not start metrics server on port {port}: {e}")
+                self.metrics_server = None
+        
         # Load all cogs
         for cog in self.initial_cogs:
             try:
@@ -55,42 +187,85 @@ class DiscordBot(commands.Bot):
         except Exception as e:
             logger.error(f"Failed to sync commands: {e}")
     
+    @property
+    def sharded(self):
+        return isinstance(self, commands.AutoShardedBot)
+    
+    async def before_identify_hook(self, shard_id, *, initial=False):
+        if self.cluster is not None:
+            await self.cluster.identify(shard_id)
+        elif self.identify_limiter is not None:
+            await self.identify_limiter.wait(shard_id)
+        else:
+            await super().before_identify_hook(shard_id, initial=initial)
+    
+    def fleet_counts(self):
+        """(guilds, users) for the whole bot: every cluster in cluster mode, else this process"""
+        if self.cluster is not None:
+            return self.cluster.fleet_counts()
+        return len(self.guilds), len(self.users)
+    
+    # Sharded bots get shard_* events; a single connection only gets the plain ones
+    async def on_shard_connect(self, shard_id):
+        self.shard_stats.record_connect(shard_id)
+    
+    async def on_shard_resumed(self, shard_id):
+        self.shard_stats.record_resume(shard_id)
+    
+    async def on_shard_disconnect(self, shard_id):
+        self.shard_stats.record_disconnect(shard_id)
+    
+    async def on_connect(self):
+        # Dispatched on every READY (for each shard when sharded)
+        self.presence.session_started()
+        if not self.sharded:
+            self.shard_stats.record_connect(self.shard_id)
+    
+    async def on_resumed(self):
+        if not self.sharded:
+            self.shard_stats.record_resume(self.shard_id)
+    
+    async def on_disconnect(self):
+        if not self.sharded:
+            self.shard_stats.record_disconnect(self.shard_id)
+    
     async def on_ready(self):
         """Called when the bot is ready and connected"""
         logger.info(f"{self.user} has connected to Discord!")
         logger.info(f"Bot is in {len(self.guilds)} guilds")
+        if self.cluster is not None:
+            self.cluster.report()
         
         # Set bot status
-        activity = discord.Activity(
-            type=discord.ActivityType.watching,
-            name=f"{len(self.guilds)} servers | /help"
-        )
-        await self.change_presence(activity=activity)
+        self.presence.request()
     
     async def on_guild_join(self, guild):
         """Called when the bot joins a new guild"""
         logger.info(f"Joined new guild: {guild.name} (ID: {guild.id})")
+        if self.cluster is not None:
+            self.cluster.report()
         
         # Update presence
-        activity = discord.Activity(
-            type=discord.ActivityType.watching,
-            name=f"{len(self.guilds)} servers | /help"
-        )
-        await self.change_presence(activity=activity)
+        self.presence.request()
     
     async def on_guild_remove(self, guild):
         """Called when the bot leaves a guild"""
         logger.info(f"Left guild: {guild.name} (ID: {guild.id})")
+        if self.cluster is not None:
+            self.cluster.report()
         
         # Update presence
-        activity = discord.Activity(
-            type=discord.ActivityType.watching,
-            name=f"{len(self.guilds)} servers | /help"
-        )
-        await self.change_presence(activity=activity)
+        self.presence.request()
+    
+    async def on_cluster_update(self, clusters):
+        """A cluster's counts changed; keep the presence text on the fleet total"""
+        if self.is_ready():
+            self.presence.request()
     
     async def on_command_error(self, ctx, error):
         """Global error handler for commands"""
+        self.metrics.count_error('command', getattr(error, 'original', error))
+        
         if isinstance(error, commands.CommandNotFound):
             return  # Ignore command not found errors
         
@@ -112,7 +287,15 @@ class DiscordBot(commands.Bot):
     
     async def on_app_command_error(self, interaction: discord.Interaction, error):
         """Global error handler for slash commands"""
-        if isinstance(error, discord.app_commands.MissingPermissions):
+        self.metrics.count_error('app_command', getattr(error, 'original', error))
+        
+        if isinstance(error, discord.app_commands.CommandOnCooldown):
+            await interaction.response.send_message(
+                f"⏳ You're using commands too quickly! Try again in {error.retry_after:.1f}s.",
+                ephemeral=True
+            )
+        
+        elif isinstance(error, discord.app_commands.MissingPermissions):
             await interaction.response.send_message(
                 "❌ You don't have permission to use this command!", 
                 ephemeral=True
@@ -135,4 +318,15 @@ class DiscordBot(commands.Bot):
     async def close(self):
         """Clean shutdown of the bot"""
         logger.info("Shutting down bot...")
+        # Unload the cogs and disconnect first so nothing uses the shared resources below once they are closed
         await super().close()
+        await self.api_client.close()
+        await self.trigger_store.close()
+        await self.dm_settings.flush()
+        if self.metrics_server is not None:
+            await self.metrics_server.close()
+        self.loop_monitor.close()
+        self.process_sampler.close()
+        self.presence.close()
+        if self.cluster is not None:
+            await self.cluster.close()
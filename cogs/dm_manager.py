@@ -1,35 +1,126 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
+import asyncio
+import logging
+import time
+from collections import OrderedDict
 from datetime import datetime
+from utils.broadcast import BroadcastCheckpoint, BroadcastJob
+from utils.dm_routing import DMRoutingIndex
+from utils.metrics import timed_listener
+
+logger = logging.getLogger(__name__)
+
+# /dm recipients remembered for reply routing; the least recently messaged are forgotten first
+MAX_TRACKED_RECIPIENTS = 10000
 
 class DMManager(commands.Cog):
     """DM management commands for sending and tracking direct messages"""
     
+    dmall = app_commands.Group(
+        name="dmall",
+        description="Send and manage direct messages to all server members",
+        default_permissions=discord.Permissions(administrator=True)
+    )
+    
     def __init__(self, bot):
         self.bot = bot
-        self.dm_channels_file = 'dm_channels.json'
-        self.dm_channels = self.load_dm_channels()
+        # Loaded by the bot before cogs; saved off the event loop
+        self.dm_channels = bot.dm_settings.data
+        
+        # Running or finished mass DM jobs by guild ID
+        self.broadcasts = {}
+        self.startup_tasks = []
+        
+        # Which reply-channel guilds each user belongs to
+        self.dm_routes = DMRoutingIndex()
+        
+        # Who last messaged a user, so a DM reply goes back to that server only
+        self.last_dm = OrderedDict()  # user_id -> (guild_id, time of their last /dm), oldest first
+        self.last_broadcast = {}  # guild_id -> time its last /dmall started
     
-    def load_dm_channels(self):
-        """Load DM channel settings from file"""
-        if os.path.exists(self.dm_channels_file):
-            try:
-                with open(self.dm_channels_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+    async def cog_load(self):
+        """Index DM routes and resume interrupted mass DMs once the bot is ready"""
+        self.startup_tasks = [
+            asyncio.create_task(self.build_dm_routes()),
+            asyncio.create_task(self.resume_broadcasts())
+        ]
+        self.bot.metrics.cache_gauge('dm_routes', lambda: len(self.dm_routes.users))
     
-    def save_dm_channels(self):
-        """Save DM channel settings to file"""
-        try:
-            with open(self.dm_channels_file, 'w') as f:
-                json.dump(self.dm_channels, f, indent=2)
-        except Exception as e:
-            print(f"Error saving DM channels: {e}")
+    async def cog_unload(self):
+        """Stop running mass DMs, checkpointing them so they resume on the next start"""
+        self.bot.metrics.remove_cache_gauge('dm_routes')
+        for task in self.startup_tasks:
+            task.cancel()
+        for job in self.broadcasts.values():
+            await job.stop()
+    
+    def build_broadcast_embed(self, guild, message, timestamp):
+        """Build the DM embed sent to every member by /dmall"""
+        dm_embed = discord.Embed(
+            title=f"📬 Message from {guild.name}",
+            description=message,
+            color=discord.Color.blue(),
+            timestamp=timestamp
+        )
+        dm_embed.add_field(
+            name="Server",
+            value=guild.name,
+            inline=True
+        )
+        dm_embed.set_footer(text="Reply to this message to respond back to the server")
+        return dm_embed
+    
+    def create_broadcast_job(self, guild, member_ids, dm_embed, author_id):
+        settings = self.bot.config['broadcast']
+        return BroadcastJob(
+            guild,
+            member_ids,
+            dm_embed,
+            author_id,
+            BroadcastCheckpoint(settings['checkpoint_dir'], guild.id),
+            workers=settings['workers'],
+            max_per_second=settings['max_per_second'],
+            progress_interval=settings['progress_interval'],
+            checkpoint_every=settings['checkpoint_every']
+        )
+    
+    async def build_dm_routes(self):
+        """Index guilds with a DM reply channel that were not indexed as they became available"""
+        await self.bot.wait_until_ready()
+        
+        for guild_id in self.dm_channels:
+            guild = self.bot.get_guild(int(guild_id))
+            if guild is not None and guild.id not in self.dm_routes:
+                self.dm_routes.add_guild(guild)
+    
+    async def resume_broadcasts(self):
+        """Restart every saved broadcast from its last checkpoint once guilds are cached"""
+        await self.bot.wait_until_ready()
+        
+        for checkpoint in BroadcastCheckpoint.saved(self.bot.config['broadcast']['checkpoint_dir']):
+            try:
+                meta, counters, bitmap = await asyncio.to_thread(checkpoint.load)
+            except Exception as e:
+                logger.error(f"Could not load broadcast checkpoint for guild {checkpoint.guild_id}: {e}")
+                continue
+            
+            guild = self.bot.get_guild(checkpoint.guild_id)
+            channel = guild.get_channel(meta['channel_id']) if guild else None
+            if channel is None:
+                logger.warning(f"Discarding broadcast for guild {checkpoint.guild_id}: server or channel is gone")
+                await asyncio.to_thread(checkpoint.delete)
+                continue
+            
+            dm_embed = self.build_broadcast_embed(guild, meta['message'], datetime.fromisoformat(meta['created_at']))
+            job = self.create_broadcast_job(guild, meta['member_ids'], dm_embed, meta['author_id'])
+            job.restore(counters, bitmap)
+            self.last_broadcast[guild.id] = datetime.fromisoformat(meta['created_at']).timestamp()
+            
+            self.broadcasts[guild.id] = job
+            job.start(channel.get_partial_message(meta['progress_message_id']))
+            logger.info(f"Resumed broadcast in guild {guild.id} at {job.processed}/{job.total}")
     
     @app_commands.command(name="setchannel", description="Set this channel to receive DM replies")
     @app_commands.default_permissions(manage_guild=True)
@@ -39,7 +130,10 @@ class DMManager(commands.Cog):
         channel_id = interaction.channel.id
         
         self.dm_channels[guild_id] = channel_id
-        self.save_dm_channels()
+        self.bot.dm_settings.save()
+        
+        if interaction.guild.id not in self.dm_routes:
+            self.dm_routes.add_guild(interaction.guild)
         
         embed = discord.Embed(
             title="✅ DM Reply Channel Set",
@@ -48,7 +142,7 @@ class DMManager(commands.Cog):
         )
         embed.add_field(
             name="Usage",
-            value="Use `/dm` to send DMs to users and `/dmall` to send DMs to all server members. "
+            value="Use `/dm` to send DMs to users and `/dmall send` to send DMs to all server members. "
                   "When users reply to the DMs, their responses will appear here.",
             inline=False
         )
@@ -103,6 +197,10 @@ class DMManager(commands.Cog):
             
             # Send DM
             await user.send(embed=dm_embed)
+            self.last_dm[user.id] = (interaction.guild.id, time.time())
+            self.last_dm.move_to_end(user.id)
+            if len(self.last_dm) > MAX_TRACKED_RECIPIENTS:
+                self.last_dm.popitem(last=False)
             
             # Confirmation embed
             confirm_embed = discord.Embed(
@@ -126,9 +224,8 @@ class DMManager(commands.Cog):
                 ephemeral=True
             )
     
-    @app_commands.command(name="dmall", description="Send a direct message to all server members")
+    @dmall.command(name="send", description="Send a direct message to all server members")
     @app_commands.describe(message="The message to send to all members")
-    @app_commands.default_permissions(administrator=True)
     async def dm_all(self, interaction: discord.Interaction, message: str):
         """Send a DM to all members in the server"""
         if len(message) > 2000:
@@ -138,64 +235,127 @@ class DMManager(commands.Cog):
             )
             return
         
-        # Defer the response since this might take a while
+        guild = interaction.guild
+        
+        # Only one broadcast per server at a time
+        running = self.broadcasts.get(guild.id)
+        if running is not None and not running.done:
+            await interaction.response.send_message(
+                f"❌ A mass DM is already running in this server ({running.processed:,}/{running.total:,} processed)!",
+                ephemeral=True
+            )
+            return
+        
+        # Defer the response since building the member list might take a while
         await interaction.response.defer()
         
-        guild = interaction.guild
-        members = [member for member in guild.members if not member.bot]
+        member_ids = [member.id for member in guild.members if not member.bot]
         
-        if len(members) == 0:
+        if len(member_ids) == 0:
             await interaction.followup.send("❌ No members to send DMs to!")
             return
         
         # Confirmation before mass DM
         confirm_embed = discord.Embed(
             title="⚠️ Mass DM Confirmation",
-            description=f"You are about to send a DM to **{len(members)}** members.\n\n"
+            description=f"You are about to send a DM to **{len(member_ids)}** members.\n\n"
                        f"**Message preview:**\n{message[:500]}{'...' if len(message) > 500 else ''}",
             color=discord.Color.orange()
         )
-        confirm_embed.set_footer(text="This action cannot be undone. Use with caution.")
+        confirm_embed.set_footer(text="This action cannot be undone. Use /dmall cancel to stop it.")
         
         await interaction.followup.send(embed=confirm_embed)
         
-        # Send DMs
-        successful = 0
-        failed = 0
+        created_at = datetime.now()
+        dm_embed = self.build_broadcast_embed(guild, message, created_at)
+        job = self.create_broadcast_job(guild, member_ids, dm_embed, interaction.user.id)
         
-        dm_embed = discord.Embed(
-            title=f"📬 Message from {guild.name}",
-            description=message,
-            color=discord.Color.blue(),
-            timestamp=datetime.now()
-        )
-        dm_embed.add_field(
-            name="Server",
-            value=guild.name,
-            inline=True
-        )
-        dm_embed.set_footer(text="Reply to this message to respond back to the server")
+        # Progress goes through a normal bot message because the interaction
+        # token expires long before a large broadcast finishes
+        try:
+            progress_message = await interaction.channel.send(embed=job.progress_embed())
+        except discord.HTTPException:
+            await interaction.followup.send(
+                "❌ I need permission to send messages in this channel to report progress!",
+                ephemeral=True
+            )
+            return
         
-        for member in members:
-            try:
-                await member.send(embed=dm_embed)
-                successful += 1
-            except:
-                failed += 1
-        
-        # Send results
-        result_embed = discord.Embed(
-            title="📤 Mass DM Results",
-            color=discord.Color.green() if failed == 0 else discord.Color.yellow()
+        # Save the job before the first DM so a restart can pick it up
+        meta = {
+            'message': message,
+            'created_at': created_at.isoformat(),
+            'author_id': interaction.user.id,
+            'channel_id': interaction.channel.id,
+            'progress_message_id': progress_message.id,
+            'member_ids': member_ids
+        }
+        await asyncio.to_thread(job.checkpoint.create, meta, len(member_ids))
+        
+        self.broadcasts[guild.id] = job
+        self.last_broadcast[guild.id] = created_at.timestamp()
+        job.start(progress_message)
+    
+    @dmall.command(name="status", description="Show the progress of this server's mass DM")
+    async def dm_all_status(self, interaction: discord.Interaction):
+        """Show progress of the current or last mass DM"""
+        job = self.broadcasts.get(interaction.guild.id)
+        if job is None:
+            await interaction.response.send_message(
+                "❌ No mass DM has been sent in this server since the bot started!",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.send_message(embed=job.progress_embed(), ephemeral=True)
+    
+    @dmall.command(name="cancel", description="Cancel this server's running mass DM")
+    async def dm_all_cancel(self, interaction: discord.Interaction):
+        """Cancel the running mass DM for good"""
+        job = self.broadcasts.get(interaction.guild.id)
+        if job is None or job.done:
+            await interaction.response.send_message(
+                "❌ There is no mass DM running in this server!",
+                ephemeral=True
+            )
+            return
+        
+        await job.cancel()
+        
+        embed = discord.Embed(
+            title="⏹️ Mass DM Cancelled",
+            description=f"Stopped after {job.processed:,} of {job.total:,} members. It will not resume.",
+            color=discord.Color.orange()
         )
-        result_embed.add_field(name="✅ Successful", value=str(successful), inline=True)
-        result_embed.add_field(name="❌ Failed", value=str(failed), inline=True)
-        result_embed.add_field(name="👥 Total Attempted", value=str(len(members)), inline=True)
-        result_embed.add_field(name="Sent by", value=interaction.user.mention, inline=True)
+        embed.add_field(name="Cancelled by", value=interaction.user.mention, inline=True)
         
-        await interaction.followup.send(embed=result_embed)
+        await interaction.response.send_message(embed=embed)
+    
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild):
+        """Index members of guilds with a DM reply channel once they are cached"""
+        if str(guild.id) in self.dm_channels:
+            self.dm_routes.add_guild(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        if str(guild.id) in self.dm_channels:
+            self.dm_routes.add_guild(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.dm_routes.remove_guild(guild.id)
+    
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        self.dm_routes.member_joined(member)
+    
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload):
+        self.dm_routes.member_left(payload.guild_id, payload.user.id)
     
     @commands.Cog.listener()
+    @timed_listener('DMManager.on_message')
     async def on_message(self, message):
         """Listen for DM replies and forward them to the designated channel"""
         # Only process DMs (not server messages)
@@ -206,55 +366,79 @@ class DMManager(commands.Cog):
         if message.author.bot:
             return
         
-        # Check if the user is in any servers with the bot
-        for guild in self.bot.guilds:
-            member = guild.get_member(message.author.id)
-            if member:
-                # Check if this guild has a DM channel set
-                guild_id = str(guild.id)
-                if guild_id in self.dm_channels:
-                    channel_id = self.dm_channels[guild_id]
-                    channel = guild.get_channel(channel_id)
-                    
-                    if channel:
-                        # Create reply embed
-                        reply_embed = discord.Embed(
-                            title="💬 DM Reply Received",
-                            description=message.content,
-                            color=discord.Color.purple(),
-                            timestamp=datetime.now()
-                        )
-                        reply_embed.add_field(
-                            name="From",
-                            value=f"{member.display_name} ({member.mention})",
-                            inline=True
-                        )
-                        reply_embed.add_field(
-                            name="User ID",
-                            value=member.id,
-                            inline=True
-                        )
-                        
-                        # Set user avatar
-                        reply_embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
-                        
-                        # Handle attachments
-                        if message.attachments:
-                            attachment_list = []
-                            for attachment in message.attachments:
-                                attachment_list.append(f"[{attachment.filename}]({attachment.url})")
-                            reply_embed.add_field(
-                                name="📎 Attachments",
-                                value="\n".join(attachment_list),
-                                inline=False
-                            )
-                        
-                        try:
-                            await channel.send(embed=reply_embed)
-                        except:
-                            pass  # Channel might be deleted or bot lacks permissions
-                
-                break  # Found the user in a server, no need to check others
+        target = self.reply_target(message.author.id)
+        if target is None:
+            return
+        member, channel = target
+        
+        # Create reply embed
+        reply_embed = discord.Embed(
+            title="💬 DM Reply Received",
+            description=message.content,
+            color=discord.Color.purple(),
+            timestamp=datetime.now()
+        )
+        reply_embed.add_field(
+            name="From",
+            value=f"{member.display_name} ({member.mention})",
+            inline=True
+        )
+        reply_embed.add_field(
+            name="User ID",
+            value=member.id,
+            inline=True
+        )
+        
+        # Set user avatar
+        reply_embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
+        
+        # Handle attachments
+        if message.attachments:
+            attachment_list = []
+            for attachment in message.attachments:
+                attachment_list.append(f"[{attachment.filename}]({attachment.url})")
+            reply_embed.add_field(
+                name="📎 Attachments",
+                value="\n".join(attachment_list),
+                inline=False
+            )
+        
+        try:
+            await channel.send(embed=reply_embed)
+        except:
+            pass  # Channel might be deleted or bot lacks permissions
+    
+    def reply_target(self, user_id):
+        """Pick the one (member, reply channel) that receives a DM reply from user_id
+        
+        Prefers the server that most recently messaged the user through /dm
+        or /dmall, then the first server they share with the bot that has a
+        reply channel.
+        """
+        direct = self.last_dm.get(user_id)
+        
+        def last_contact(guild_id):
+            contacted = self.last_broadcast.get(guild_id, 0.0)
+            if direct is not None and direct[0] == guild_id:
+                contacted = max(contacted, direct[1])
+            return contacted
+        
+        best, best_contact = None, -1.0
+        for guild_id in self.dm_routes.route(user_id):
+            guild = self.bot.get_guild(guild_id)
+            channel_id = self.dm_channels.get(str(guild_id))
+            if guild is None or channel_id is None:
+                continue
+            
+            member = guild.get_member(user_id)
+            channel = guild.get_channel(channel_id)
+            if member is None or channel is None:
+                continue
+            
+            contacted = last_contact(guild_id)
+            if contacted > best_contact:
+                best, best_contact = (member, channel), contacted
+        return best
 
 async def setup(bot):
     await bot.add_cog(DMManager(bot))
\ No newline at end of file
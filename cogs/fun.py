@@ -2,8 +2,8 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import random
-import aiohttp
 import json
+from utils.prefetch import PrefetchBuffer
 
 class Fun(commands.Cog):
     """Fun commands for entertainment"""
@@ -62,30 +62,61 @@ class Fun(commands.Cog):
             "Why did the bicycle fall over? Because it was two tired!",
             "What do you call a dinosaur that crashes his car? Tyrannosaurus Wrecks!"
         ]
+        
+        # API content fetched ahead of time so commands never wait on an API
+        settings = bot.config['prefetch']
+        options = {
+            'capacity': settings['capacity'],
+            'low_water': settings['low_water'],
+            'recent_size': settings['recent_size'],
+            'retry_delay': settings['retry_delay'],
+            'max_retry_delay': settings['max_retry_delay']
+        }
+        self.buffers = {
+            'jokes': PrefetchBuffer('jokes', self.fetch_joke, **options),
+            'quotes': PrefetchBuffer('quotes', self.fetch_quote, **options),
+            'facts': PrefetchBuffer('facts', self.fetch_fact, **options),
+            'memes': PrefetchBuffer('memes', self.fetch_meme, key=lambda meme: meme['url'], **options)
+        }
+    
+    async def cog_load(self):
+        for buffer in self.buffers.values():
+            buffer.start()
+    
+    async def cog_unload(self):
+        for buffer in self.buffers.values():
+            await buffer.close()
+    
+    async def fetch_joke(self):
+        data = await self.bot.api_client.get_json('jokes')
+        return f"{data['setup']}\n\n||{data['punchline']}||"
+    
+    async def fetch_quote(self):
+        data = await self.bot.api_client.get_json('quotes')
+        return f'"{data["content"]}" - {data["author"]}'
+    
+    async def fetch_fact(self):
+        data = await self.bot.api_client.get_json('facts')
+        return data['text']
+    
+    async def fetch_meme(self):
+        data = await self.bot.api_client.get_json('memes')
+        return {
+            'title': data.get('title', 'Programming Meme'),
+            'postLink': data.get('postLink', ''),
+            'url': data['url'],
+            'ups': data.get('ups', 0),
+            'subreddit': data.get('subreddit', 'programmerhumor')
+        }
     
     @app_commands.command(name="joke", description="Get a random joke")
     async def joke(self, interaction: discord.Interaction):
-        """Get a random joke from an API or fallback list"""
-        try:
-            # Try to get joke from API
-            async with aiohttp.ClientSession() as session:
-                async with session.get('https://official-joke-api.appspot.com/random_joke', timeout=5) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        joke_text = f"{data['setup']}\n\n||{data['punchline']}||"
-                        
-                        embed = discord.Embed(
-                            title="😂 Random Joke",
-                            description=joke_text,
-                            color=discord.Color.gold()
-                        )
-                        await interaction.response.send_message(embed=embed)
-                        return
-        except:
-            pass  # Fall back to local jokes
+        """Get a random joke from the prefetched API jokes or fallback list"""
+        joke_text = self.buffers['jokes'].pop()
+        if joke_text is None:
+            # Fallback to local jokes
+            joke_text = random.choice(self.jokes)
         
-        # Fallback to local jokes
-        joke_text = random.choice(self.jokes)
         embed = discord.Embed(
             title="😂 Random Joke",
             description=joke_text,
@@ -95,30 +126,15 @@ class Fun(commands.Cog):
     
     @app_commands.command(name="quote", description="Get an inspirational quote")
     async def quote(self, interaction: discord.Interaction):
-        """Get an inspirational quote from an API or fallback list"""
-        try:
-            # Try to get quote from API
-            async with aiohttp.ClientSession() as session:
-                async with session.get('https://api.quotable.io/random', timeout=5) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        quote_text = f'"{data["content"]}" - {data["author"]}'
-                        
-                        embed = discord.Embed(
-                            title="💭 Inspirational Quote",
-                            description=quote_text,
-                            color=discord.Color.purple()
-                        )
-                        await interaction.response.send_message(embed=embed)
-                        return
-        except:
-            pass  # Fall back to local quotes
+        """Get an inspirational quote from the prefetched API quotes or fallback list"""
+        quote_text = self.buffers['quotes'].pop()
+        if quote_text is None:
+            # Fallback to local quotes
+            quote_text = f'"{random.choice(self.quotes)}"'
         
-        # Fallback to local quotes
-        quote_text = random.choice(self.quotes)
         embed = discord.Embed(
             title="💭 Inspirational Quote",
-            description=f'"{quote_text}"',
+            description=quote_text,
             color=discord.Color.purple()
         )
         await interaction.response.send_message(embed=embed)
@@ -252,24 +268,16 @@ class Fun(commands.Cog):
     
     @app_commands.command(name="fact", description="Get a random fun fact")
     async def fact(self, interaction: discord.Interaction):
-        """Get a random fun fact from an API or fallback list"""
-        try:
-            # Try to get fact from API
-            async with aiohttp.ClientSession() as session:
-                async with session.get('https://uselessfacts.jsph.pl/random.json?language=en', timeout=5) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        fact_text = data['text']
-                        
-                        embed = discord.Embed(
-                            title="🧠 Random Fact",
-                            description=fact_text,
-                            color=discord.Color.orange()
-                        )
-                        await interaction.response.send_message(embed=embed)
-                        return
-        except:
-            pass  # Fall back to local facts
+        """Get a random fun fact from the prefetched API facts or fallback list"""
+        fact_text = self.buffers['facts'].pop()
+        if fact_text is not None:
+            embed = discord.Embed(
+                title="🧠 Random Fact",
+                description=fact_text,
+                color=discord.Color.orange()
+            )
+            await interaction.response.send_message(embed=embed)
+            return
         
         # Fallback facts
         facts = [
@@ -295,25 +303,19 @@ class Fun(commands.Cog):
     
     @app_commands.command(name="meme", description="Get a random programming meme")
     async def meme(self, interaction: discord.Interaction):
-        """Get a random programming meme from Reddit API"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get('https://meme-api.com/gimme/programmerhumor', timeout=10) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        
-                        embed = discord.Embed(
-                            title=data.get('title', 'Programming Meme'),
-                            color=discord.Color.blurple(),
-                            url=data.get('postLink', '')
-                        )
-                        embed.set_image(url=data.get('url', ''))
-                        embed.set_footer(text=f"👍 {data.get('ups', 0)} upvotes | r/{data.get('subreddit', 'programmerhumor')}")
-                        
-                        await interaction.response.send_message(embed=embed)
-                        return
-        except:
-            pass
+        """Get a random programming meme prefetched from the Reddit API"""
+        meme = self.buffers['memes'].pop()
+        if meme is not None:
+            embed = discord.Embed(
+                title=meme['title'],
+                color=discord.Color.blurple(),
+                url=meme['postLink']
+            )
+            embed.set_image(url=meme['url'])
+            embed.set_footer(text=f"👍 {meme['ups']} upvotes | r/{meme['subreddit']}")
+            
+            await interaction.response.send_message(embed=embed)
+            return
         
         # Fallback message
         embed = discord.Embed(
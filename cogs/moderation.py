@@ -3,12 +3,27 @@ from discord.ext import commands
 from discord import app_commands
 from datetime import datetime, timedelta
 import asyncio
+from utils.ban_index import BanIndex
+from utils.bulk_moderation import ACTIONS, BulkModerationJob, check_targets, parse_user_ids
+from utils.purge import PurgeJob
 
 class Moderation(commands.Cog):
     """Moderation commands for server management"""
     
     def __init__(self, bot):
         self.bot = bot
+        self.ban_index = BanIndex()
+        self.bulk_jobs = {}  # guild_id -> BulkModerationJob
+        self.purges = {}  # channel_id -> PurgeJob running in that channel
+    
+    async def cog_load(self):
+        self.bot.metrics.cache_gauge('ban_index', lambda: sum(len(bans) for bans in self.ban_index.guilds.values()))
+    
+    async def cog_unload(self):
+        self.bot.metrics.remove_cache_gauge('ban_index')
+        self.ban_index.close()
+        for job in self.bulk_jobs.values():
+            await job.stop()
     
     @app_commands.command(name="kick", description="Kick a member from the server")
     @app_commands.describe(
@@ -177,102 +192,213 @@ class Moderation(commands.Cog):
         """Unban a user from the server"""
         try:
             user_id = int(user_id)
-            user = await self.bot.fetch_user(user_id)
-            
-            # Check if user is actually banned
-            ban_entry = None
-            async for ban in interaction.guild.bans():
-                if ban.user.id == user_id:
-                    ban_entry = ban
-                    break
-            
-            if not ban_entry:
-                await interaction.response.send_message(
-                    "❌ This user is not banned from the server!",
-                    ephemeral=True
-                )
-                return
+        except ValueError:
+            await interaction.response.send_message(
+                "❌ Invalid user ID provided!",
+                ephemeral=True
+            )
+            return
+        
+        guild = interaction.guild
+        
+        # Check if user is actually banned, from the index when it is loaded
+        banned = self.ban_index.is_banned(guild.id, user_id)
+        if banned is False:
+            await interaction.response.send_message(
+                "❌ This user is not banned from the server!",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer()
+        
+        try:
+            if banned is None:
+                # Index is cold: look up just this ban, and load the rest for next time
+                self.ban_index.load(guild)
+                ban_entry = await guild.fetch_ban(discord.Object(id=user_id))
+                user = ban_entry.user
+            else:
+                user = self.bot.get_user(user_id) or discord.Object(id=user_id)
             
             # Unban the user
-            await interaction.guild.unban(user, reason=f"Unbanned by {interaction.user} - {reason}")
+            await guild.unban(user, reason=f"Unbanned by {interaction.user} - {reason}")
+            self.ban_index.unbanned(guild.id, user_id)
             
             # Send confirmation
             embed = discord.Embed(
                 title="✅ Member Unbanned",
-                description=f"{user.mention} has been unbanned from the server",
+                description=f"<@{user_id}> has been unbanned from the server",
                 color=discord.Color.green()
             )
             embed.add_field(name="Reason", value=reason, inline=False)
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
-            embed.set_thumbnail(url=user.avatar.url if user.avatar else None)
+            avatar = getattr(user, 'avatar', None)
+            embed.set_thumbnail(url=avatar.url if avatar else None)
             
-            await interaction.response.send_message(embed=embed)
+            await interaction.followup.send(embed=embed)
             
-        except ValueError:
-            await interaction.response.send_message(
-                "❌ Invalid user ID provided!",
-                ephemeral=True
-            )
         except discord.NotFound:
-            await interaction.response.send_message(
-                "❌ User not found!",
-                ephemeral=True
-            )
+            # Either the ban lookup or the unban itself found no ban
+            self.ban_index.unbanned(guild.id, user_id)
+            await interaction.followup.send("❌ This user is not banned from the server!")
         except discord.Forbidden:
-            await interaction.response.send_message(
-                "❌ I don't have permission to unban members!",
-                ephemeral=True
-            )
+            await interaction.followup.send("❌ I don't have permission to unban members!")
         except Exception as e:
-            await interaction.response.send_message(
-                f"❌ An error occurred while unbanning the user: {str(e)}",
-                ephemeral=True
-            )
+            await interaction.followup.send(f"❌ An error occurred while unbanning the user: {str(e)}")
+    
+    @unban.autocomplete('user_id')
+    async def unban_user_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Suggest banned users by ID or name"""
+        if not self.ban_index.is_loaded(interaction.guild_id):
+            # Start loading so suggestions are ready on the next keystroke
+            if interaction.guild is not None:
+                self.ban_index.load(interaction.guild)
+            return []
+        
+        return [
+            app_commands.Choice(name=f"{name} ({user_id})"[:100], value=str(user_id))
+            for user_id, name in self.ban_index.search(interaction.guild_id, current)
+        ]
+    
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild, user):
+        self.ban_index.banned(guild.id, user)
+    
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild, user):
+        self.ban_index.unbanned(guild.id, user.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.ban_index.discard(guild.id)
     
     @app_commands.command(name="clear", description="Clear messages from the channel")
     @app_commands.describe(
-        amount="Number of messages to delete (1-100)",
-        member="Only delete messages from this member"
+        amount="Number of messages to delete",
+        member="Only delete messages from this member",
+        contains="Only delete messages containing this text",
+        attachments="Only delete messages with attachments",
+        newer_than="Only delete messages from the last N minutes",
+        older_than="Only delete messages at least N minutes old"
     )
     @app_commands.default_permissions(manage_messages=True)
-    async def clear(self, interaction: discord.Interaction, amount: int, member: discord.Member = None):
+    async def clear(self, interaction: discord.Interaction, amount: int, member: discord.Member = None,
+                    contains: str = None, attachments: bool = False, newer_than: int = None, older_than: int = None):
         """Clear messages from the channel"""
-        if amount < 1 or amount > 100:
+        settings = self.bot.config['purge']
+        if amount < 1 or amount > settings['max_amount']:
+            await interaction.response.send_message(
+                f"❌ Amount must be between 1 and {settings['max_amount']}!",
+                ephemeral=True
+            )
+            return
+        
+        if (newer_than is not None and newer_than < 1) or (older_than is not None and older_than < 0):
             await interaction.response.send_message(
-                "❌ Amount must be between 1 and 100!",
+                "❌ Time filters must be positive numbers of minutes!",
                 ephemeral=True
             )
             return
         
+        channel = interaction.channel
+        if channel.id in self.purges:
+            await interaction.response.send_message(
+                "❌ Messages are already being cleared in this channel!",
+                ephemeral=True
+            )
+            return
+        
+        now = discord.utils.utcnow()
+        after = now - timedelta(minutes=newer_than) if newer_than else None
+        before = now - timedelta(minutes=older_than) if older_than else None
+        
+        contains_lower = contains.lower() if contains else None
+        
+        def check(message):
+            if member is not None and message.author.id != member.id:
+                return False
+            if contains_lower is not None and contains_lower not in message.content.lower():
+                return False
+            if attachments and not message.attachments:
+                return False
+            return True
+        
+        # Build a summary of the active filters for the result embed
+        filters = []
+        if member:
+            filters.append(f"from {member.mention}")
+        if contains:
+            filters.append(f"containing `{contains[:50]}`")
+        if attachments:
+            filters.append("with attachments")
+        if newer_than:
+            filters.append(f"from the last {newer_than} minutes")
+        if older_than:
+            filters.append(f"at least {older_than} minutes old")
+        
+        async def report_progress(job):
+            embed = discord.Embed(
+                title="🧹 Clearing Messages...",
+                description=f"Deleted {job.deleted:,}/{amount:,} ({job.throughput():.1f}/s), scanned {job.scanned:,}",
+                color=discord.Color.blue()
+            )
+            await interaction.edit_original_response(embed=embed)
+        
+        job = PurgeJob(
+            channel, amount,
+            check=check,
+            scan_limit=settings['scan_limit'],
+            after=after,
+            before=before,
+            single_delete_interval=settings['single_delete_interval'],
+            max_single_deletes=settings['max_single_deletes'],
+            time_limit=settings['time_limit'],
+            progress_interval=settings['progress_interval'],
+            on_progress=report_progress
+        )
+        
         try:
             await interaction.response.defer(ephemeral=True)
             
-            if member:
-                # Delete messages from specific member
-                def check(message):
-                    return message.author == member
-                
-                deleted = await interaction.channel.purge(limit=amount * 2, check=check)
-                deleted_count = len(deleted)
-                
-                embed = discord.Embed(
-                    title="🧹 Messages Cleared",
-                    description=f"Deleted {deleted_count} messages from {member.mention}",
-                    color=discord.Color.green()
-                )
-            else:
-                # Delete any messages
-                deleted = await interaction.channel.purge(limit=amount)
-                deleted_count = len(deleted)
-                
-                embed = discord.Embed(
-                    title="🧹 Messages Cleared",
-                    description=f"Deleted {deleted_count} messages",
-                    color=discord.Color.green()
-                )
+            self.purges[channel.id] = job
+            try:
+                await job.run()
+            finally:
+                del self.purges[channel.id]
             
+            description = f"Deleted {job.deleted} messages"
+            if filters:
+                description += " " + ", ".join(filters)
+            embed = discord.Embed(
+                title="🧹 Messages Cleared",
+                description=description,
+                color=discord.Color.green()
+            )
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
-            embed.add_field(name="Channel", value=interaction.channel.mention, inline=True)
+            embed.add_field(name="Channel", value=channel.mention, inline=True)
+            if job.deleted >= 100 or job.single_requests:
+                embed.add_field(name="Speed", value=f"{job.throughput():.1f} messages/s", inline=True)
+            if job.deleted < amount and job.budget_exhausted:
+                embed.add_field(
+                    name="⚠️ Scan Limit Reached",
+                    value=f"Stopped after looking at {job.scanned:,} messages",
+                    inline=False
+                )
+            if job.single_limit_reached:
+                embed.add_field(
+                    name="⚠️ Old Message Limit Reached",
+                    value=f"Messages older than 14 days are deleted one at a time; stopped after {job.max_single_deletes:,}. Run /clear again for more",
+                    inline=False
+                )
+            elif job.time_limit_reached:
+                embed.add_field(
+                    name="⚠️ Time Limit Reached",
+                    value=f"Stopped after {job.time_limit / 60:g} minutes. Run /clear again for more",
+                    inline=False
+                )
+            if job.failed:
+                embed.add_field(name="❌ Failed", value=f"{job.failed} messages", inline=True)
             
             await interaction.followup.send(embed=embed)
             
@@ -350,6 +476,130 @@ class Moderation(commands.Cog):
                 f"❌ An error occurred while timing out the member: {str(e)}",
                 ephemeral=True
             )
+    
+    async def start_bulk_action(self, interaction, action, user_ids, file, reason, delete_days=0, until=None):
+        """Shared flow for /bulkkick, /bulkban and /bulktimeout"""
+        settings = self.bot.config['bulk_moderation']
+        guild = interaction.guild
+        
+        # Only one bulk action per server at a time
+        running = self.bulk_jobs.get(guild.id)
+        if running is not None and not running.done:
+            await interaction.response.send_message(
+                f"❌ A bulk {running.action} is already running in this server ({running.processed:,}/{running.total:,} processed)!",
+                ephemeral=True
+            )
+            return
+        
+        if not user_ids and file is None:
+            await interaction.response.send_message(
+                "❌ Please provide user IDs or upload a text file with one ID per line!",
+                ephemeral=True
+            )
+            return
+        
+        if file is not None and file.size > settings['max_file_size']:
+            await interaction.response.send_message(
+                f"❌ File is too large! Please keep it under {settings['max_file_size'] // 1000} KB.",
+                ephemeral=True
+            )
+            return
+        
+        # Defer since reading the file and checking every target can take a moment
+        await interaction.response.defer()
+        
+        text = user_ids or ""
+        if file is not None:
+            try:
+                text += "\n" + (await file.read()).decode('utf-8', errors='ignore')
+            except discord.HTTPException:
+                await interaction.followup.send("❌ Could not read the uploaded file!")
+                return
+        
+        ids = parse_user_ids(text)
+        if not ids:
+            await interaction.followup.send("❌ No user IDs found!")
+            return
+        if len(ids) > settings['max_targets']:
+            await interaction.followup.send(f"❌ Too many users! The limit is {settings['max_targets']:,} per bulk action.")
+            return
+        
+        # Check role hierarchy for the whole batch before touching anyone
+        allowed, rejected = check_targets(guild, interaction.user, action, ids)
+        job = BulkModerationJob(
+            guild, action, allowed, interaction.user, reason,
+            rejected=rejected,
+            workers=settings['workers'],
+            max_per_second=settings['max_per_second'],
+            progress_interval=settings['progress_interval'],
+            delete_days=delete_days,
+            until=until
+        )
+        
+        # Progress goes through a normal bot message because the interaction
+        # token expires before a large bulk action with many retries finishes
+        try:
+            progress_message = await interaction.channel.send(embed=job.progress_embed())
+        except discord.HTTPException:
+            await interaction.followup.send(
+                "❌ I need permission to send messages in this channel to report progress!",
+                ephemeral=True
+            )
+            return
+        
+        self.bulk_jobs[guild.id] = job
+        job.start(progress_message)
+        await interaction.followup.send(f"{ACTIONS[action]['emoji']} Bulk {action} started: {progress_message.jump_url}")
+    
+    @app_commands.command(name="bulkkick", description="Kick many members at once by ID")
+    @app_commands.describe(
+        user_ids="User IDs or mentions, separated by spaces or commas",
+        file="Text file with user IDs (one per line)",
+        reason="Reason for kicking the members"
+    )
+    @app_commands.default_permissions(kick_members=True)
+    async def bulk_kick(self, interaction: discord.Interaction, user_ids: str = None, file: discord.Attachment = None, reason: str = "No reason provided"):
+        """Kick a list of members"""
+        await self.start_bulk_action(interaction, 'kick', user_ids, file, reason)
+    
+    @app_commands.command(name="bulkban", description="Ban many users at once by ID")
+    @app_commands.describe(
+        user_ids="User IDs or mentions, separated by spaces or commas",
+        file="Text file with user IDs (one per line)",
+        reason="Reason for banning the users",
+        delete_days="Number of days of messages to delete (0-7)"
+    )
+    @app_commands.default_permissions(ban_members=True)
+    async def bulk_ban(self, interaction: discord.Interaction, user_ids: str = None, file: discord.Attachment = None, reason: str = "No reason provided", delete_days: int = 0):
+        """Ban a list of users, including ones who already left"""
+        if delete_days < 0 or delete_days > 7:
+            await interaction.response.send_message(
+                "❌ Delete days must be between 0 and 7!",
+                ephemeral=True
+            )
+            return
+        
+        await self.start_bulk_action(interaction, 'ban', user_ids, file, reason, delete_days=delete_days)
+    
+    @app_commands.command(name="bulktimeout", description="Timeout many members at once by ID")
+    @app_commands.describe(
+        duration="Duration in minutes",
+        user_ids="User IDs or mentions, separated by spaces or commas",
+        file="Text file with user IDs (one per line)",
+        reason="Reason for the timeout"
+    )
+    @app_commands.default_permissions(moderate_members=True)
+    async def bulk_timeout(self, interaction: discord.Interaction, duration: int, user_ids: str = None, file: discord.Attachment = None, reason: str = "No reason provided"):
+        """Timeout a list of members for a specified duration"""
+        if duration < 1 or duration > 40320:  # Max 28 days
+            await interaction.response.send_message(
+                "❌ Duration must be between 1 minute and 28 days (40320 minutes)!",
+                ephemeral=True
+            )
+            return
+        
+        timeout_until = datetime.now() + timedelta(minutes=duration)
+        await self.start_bulk_action(interaction, 'timeout', user_ids, file, reason, until=timeout_until)
 
 async def setup(bot):
     await bot.add_cog(Moderation(bot))
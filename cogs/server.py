@@ -2,12 +2,55 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from datetime import datetime
+from utils.member_stats import MemberStatsIndex
 
 class Server(commands.Cog):
     """Server management and information commands"""
     
     def __init__(self, bot):
         self.bot = bot
+        
+        # Member counters per guild, kept current from gateway events
+        self.member_stats = MemberStatsIndex()
+    
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild):
+        """Count a guild's members once when it becomes available"""
+        self.member_stats.build(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        """Count a newly joined guild's members"""
+        self.member_stats.build(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        """Forget counters for guilds the bot has left"""
+        self.member_stats.discard(guild)
+    
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        self.member_stats.member_added(member)
+    
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        self.member_stats.member_removed(member)
+    
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        self.member_stats.member_updated(before, after)
+    
+    @commands.Cog.listener()
+    async def on_presence_update(self, before, after):
+        self.member_stats.presence_updated(before, after)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        self.member_stats.role_created(role)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        self.member_stats.role_deleted(role)
     
     @app_commands.command(name="userinfo", description="Get information about a user")
     @app_commands.describe(member="The member to get information about (defaults to yourself)")
@@ -77,7 +120,11 @@ class Server(commands.Cog):
         
         # Roles (if member is from a guild)
         if hasattr(member, 'roles') and len(member.roles) > 1:
-            roles = [role.mention for role in sorted(member.roles[1:], key=lambda r: r.position, reverse=True)]
+            stats = self.member_stats.get(member.guild)
+            roles = [
+                f"{role.mention} ({stats.role_count(role):,})"
+                for role in sorted(member.roles[1:], key=lambda r: r.position, reverse=True)
+            ]
             roles_text = ", ".join(roles[:10])  # Limit to 10 roles
             if len(member.roles) > 11:
                 roles_text += f" and {len(member.roles) - 11} more..."
@@ -131,14 +178,15 @@ class Server(commands.Cog):
         
         # Calculate member stats
         total_members = guild.member_count
-        humans = len([m for m in guild.members if not m.bot])
-        bots = len([m for m in guild.members if m.bot])
+        stats = self.member_stats.get(guild)
+        humans = stats.humans
+        bots = stats.bots
         
         # Get status counts
-        online = len([m for m in guild.members if m.status == discord.Status.online])
-        idle = len([m for m in guild.members if m.status == discord.Status.idle])
-        dnd = len([m for m in guild.members if m.status == discord.Status.dnd])
-        offline = len([m for m in guild.members if m.status == discord.Status.offline])
+        online = stats.statuses[discord.Status.online]
+        idle = stats.statuses[discord.Status.idle]
+        dnd = stats.statuses[discord.Status.dnd]
+        offline = stats.statuses[discord.Status.offline]
         
         embed = discord.Embed(
             title=f"🏠 Server Information - {guild.name}",
@@ -293,10 +341,12 @@ class Server(commands.Cog):
         # Split roles into chunks to avoid embed limits
         role_chunks = [roles[i:i+20] for i in range(0, len(roles), 20)]
         
+        stats = self.member_stats.get(guild)
+        
         for i, chunk in enumerate(role_chunks[:3]):  # Max 3 chunks (60 roles)
             role_list = []
             for role in chunk:
-                member_count = len(role.members)
+                member_count = stats.role_count(role)
                 role_list.append(f"{role.mention} - {member_count} member{'s' if member_count != 1 else ''}")
             
             field_name = f"Roles ({len(roles)} total)" if i == 0 else f"Roles (continued {i+1})"
@@ -331,14 +381,15 @@ class Server(commands.Cog):
         
         # Get member statistics
         total_members = guild.member_count
-        humans = len([m for m in guild.members if not m.bot])
-        bots = len([m for m in guild.members if m.bot])
+        stats = self.member_stats.get(guild)
+        humans = stats.humans
+        bots = stats.bots
         
         # Get status counts
-        online = len([m for m in guild.members if m.status == discord.Status.online])
-        idle = len([m for m in guild.members if m.status == discord.Status.idle])
-        dnd = len([m for m in guild.members if m.status == discord.Status.dnd])
-        offline = len([m for m in guild.members if m.status == discord.Status.offline])
+        online = stats.statuses[discord.Status.online]
+        idle = stats.statuses[discord.Status.idle]
+        dnd = stats.statuses[discord.Status.dnd]
+        offline = stats.statuses[discord.Status.offline]
         
         embed = discord.Embed(
             title=f"📊 Member Statistics - {guild.name}",
@@ -383,6 +434,40 @@ class Server(commands.Cog):
         
         await interaction.response.send_message(embed=embed)
     
+    @app_commands.command(name="statscheck", description="Recount member statistics and report any drift")
+    @app_commands.default_permissions(manage_guild=True)
+    async def statscheck(self, interaction: discord.Interaction):
+        """Recompute member counters from scratch and compare them to the index"""
+        guild = interaction.guild
+        
+        if not guild:
+            await interaction.response.send_message(
+                "❌ This command can only be used in a server!",
+                ephemeral=True
+            )
+            return
+        
+        drift = self.member_stats.check(guild)
+        
+        if drift:
+            embed = discord.Embed(
+                title="⚠️ Member Statistics Drift",
+                description="\n".join(
+                    f"**{label}:** indexed {indexed:,}, actual {actual:,}"
+                    for label, (indexed, actual) in drift.items()
+                )[:4096],
+                color=discord.Color.orange()
+            )
+            embed.set_footer(text="Counters have been reset to the actual values")
+        else:
+            embed = discord.Embed(
+                title="✅ Member Statistics Consistent",
+                description="The indexed counters match a full recount.",
+                color=discord.Color.green()
+            )
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
     @app_commands.command(name="channelinfo", description="Get information about a channel")
     @app_commands.describe(channel="The channel to get information about (defaults to current channel)")
     async def channelinfo(self, interaction: discord.Interaction, channel: discord.TextChannel = None):
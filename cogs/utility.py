@@ -4,17 +4,66 @@ from discord.ext import commands
 from discord import app_commands
 import time
 import platform
-import psutil
+import math
 import os
 import asyncio
-import aiohttp
 from datetime import datetime, timedelta
+from utils.metrics import timed_listener
+from utils.reminders import ReminderScheduler
+from utils.translation_cache import TranslationCache
+from utils.ttl_cache import TTLCache
+from utils.triggers import MODE_SUBSTRING, MODE_WORD
 
 class Utility(commands.Cog):
     """Utility commands for the Discord bot"""
     
+    trigger = app_commands.Group(
+        name="trigger",
+        description="Manage automatic responses to specific words",
+        default_permissions=discord.Permissions(manage_messages=True)
+    )
+    
     def __init__(self, bot):
         self.bot = bot
+        
+        settings = bot.config['reminders']
+        self.reminders = ReminderScheduler(
+            settings['database'],
+            self.deliver_reminders,
+            batch_size=settings['batch_size'],
+            wait_until_ready=bot.wait_until_ready
+        )
+        
+        cache_settings = bot.config['weather_cache']
+        self.weather_cache = TTLCache(
+            cache_settings['ttl'],
+            cache_settings['max_size'],
+            stale_ttl=cache_settings['stale_ttl']
+        )
+        
+        translation_settings = bot.config['translation_cache']
+        self.translation_cache = TranslationCache(
+            translation_settings['max_size'],
+            path=translation_settings['path'],
+            debounce=translation_settings['debounce']
+        )
+    
+    async def cog_load(self):
+        """Load pending reminders and start delivering them"""
+        await self.reminders.open()
+        await self.translation_cache.load()
+        
+        metrics = self.bot.metrics
+        metrics.cache_gauge('weather', lambda: len(self.weather_cache))
+        metrics.cache_gauge('translations', lambda: len(self.translation_cache))
+        metrics.cache_gauge('pending_reminders', lambda: len(self.reminders))
+    
+    async def cog_unload(self):
+        for cache_name in ('weather', 'translations', 'pending_reminders'):
+            self.bot.metrics.remove_cache_gauge(cache_name)
+        await self.reminders.close()
+        self.weather_cache.close()
+        await self.translation_cache.close()
     
     @app_commands.command(name="ping", description="Check the bot's latency")
     async def ping(self, interaction: discord.Interaction):
@@ -45,6 +94,15 @@ class Utility(commands.Cog):
             inline=True
         )
         
+        # Latency of every shard this process runs, marking the one serving this server
+        if self.bot.sharded:
+            current = interaction.guild.shard_id if interaction.guild else 0
+            lines = [
+                f"{'➤ ' if shard_id == current else ''}**Shard {shard_id}:** {self.format_latency(latency)}"
+                for shard_id, latency in self.bot.shard_stats.latencies()
+            ]
+            embed.add_field(name="Shard Latency", value=self.limit_lines(lines), inline=False)
+        
         # Color based on latency
         if self.bot.latency * 1000 < 100:
             embed.color = discord.Color.green()
@@ -58,12 +116,12 @@ class Utility(commands.Cog):
     @app_commands.command(name="info", description="Get information about the bot")
     async def info(self, interaction: discord.Interaction):
         """Display bot information and statistics"""
-        # Calculate uptime
-        uptime = datetime.now() - datetime.fromtimestamp(psutil.boot_time())
-        
-        # Get system information
-        memory = psutil.virtual_memory()
-        cpu_percent = psutil.cpu_percent()
+        # Process stats from the background sampler
+        sampler = self.bot.process_sampler
+        latest = sampler.latest()
+        trends = sampler.trends()
+        cpu_percent = f"{latest['cpu']:.1f}%" if latest else "Sampling..."
+        rss = f"{latest['rss'] / 1024**2:.1f} MB" if latest else "Sampling..."
         
         embed = discord.Embed(
             title="🤖 Bot Information",
@@ -72,32 +130,149 @@ class Utility(commands.Cog):
             timestamp=datetime.now()
         )
         
-        # Bot stats
+        # Bot stats (for the whole fleet in cluster mode)
+        guilds, users = self.bot.fleet_counts()
         embed.add_field(
             name="📊 Bot Stats",
-            value=f"**Servers:** {len(self.bot.guilds)}\n"
-                  f"**Users:** {len(self.bot.users)}\n"
+            value=f"**Servers:** {guilds}\n"
+                  f"**Users:** {users}\n"
                   f"**Commands:** {len(self.bot.tree.get_commands())}\n"
                   f"**Latency:** {round(self.bot.latency * 1000)}ms",
             inline=True
         )
         
+        # Worker processes and their shards in cluster mode
+        cluster = self.bot.cluster
+        if cluster is not None and cluster.clusters:
+            lines = [
+                f"{'🟢' if worker['up'] else '🔴'} **#{worker['id']}{' (this one)' if worker['id'] == cluster.cluster_id else ''}:** "
+                f"shards {worker['shards']}, {worker['guilds']} servers, {worker['users']} users"
+                for worker in cluster.clusters
+            ]
+            embed.add_field(name=f"🛰️ Clusters ({len(lines)})", value=self.limit_lines(lines), inline=False)
+        
+        # Guilds, members and gateway sessions per shard
+        if self.bot.sharded:
+            lines = [
+                f"**{shard['id']}:** {shard['guilds']} servers, {shard['members']:,} members, "
+                f"{shard['connects']} connects, {shard['resumes']} resumes"
+                for shard in self.bot.shard_stats.stats()
+            ]
+            embed.add_field(name=f"🧩 Shards ({len(lines)})", value=self.limit_lines(lines), inline=False)
+        
         # System info
         embed.add_field(
             name="💻 System Info",
             value=f"**Python:** {platform.python_version()}\n"
                   f"**Discord.py:** {discord.__version__}\n"
                   f"**Platform:** {platform.system()}\n"
-                  f"**CPU Usage:** {cpu_percent}%",
+                  f"**CPU Usage:** {cpu_percent}",
             inline=True
         )
         
         # Memory info
         embed.add_field(
             name="🧠 Memory Usage",
-            value=f"**Used:** {round(memory.used / 1024**3, 2)} GB\n"
-                  f"**Total:** {round(memory.total / 1024**3, 2)} GB\n"
-                  f"**Percentage:** {memory.percent}%",
+            value=f"**RSS:** {rss}\n"
+                  f"**1m / 15m / 1h:** {self.format_trend(trends, 'rss', lambda value: f'{value / 1024**2:.0f}')} MB",
+            inline=True
+        )
+        
+        # Process trends
+        embed.add_field(
+            name="📈 Process (1m / 15m / 1h)",
+            value=f"**CPU:** {self.format_trend(trends, 'cpu', lambda value: f'{value:.1f}')}%\n"
+                  f"**Tasks:** {self.format_trend(trends, 'tasks', lambda value: f'{value:.0f}')}\n"
+                  f"**Threads:** {self.format_trend(trends, 'threads', lambda value: f'{value:.0f}')}\n"
+                  f"**Open Files:** {self.format_trend(trends, 'fds', lambda value: f'{value:.0f}')}\n"
+                  f"**GC Runs:** {self.format_trend(trends, 'gc_collections', lambda value: f'{value:.0f}')}",
+            inline=True
+        )
+        
+        # HTTP connection pool usage
+        pool = self.bot.api_client.stats()
+        embed.add_field(
+            name="🌐 HTTP Pool",
+            value=f"**Open:** {pool['open']} ({pool['idle']} idle)\n"
+                  f"**Requests:** {pool['requests']}\n"
+                  f"**Reuse Ratio:** {round(pool['reuse_ratio'] * 100, 1)}%",
+            inline=True
+        )
+        
+        # Commands rejected by the rate limiter
+        limits = self.bot.rate_limiter.stats()
+        top_rejected = ", ".join(f"/{name} ({count})" for name, count in limits['top_rejected']) or "None"
+        embed.add_field(
+            name="🚦 Rate Limits",
+            value=f"**Rejected:** {limits['rejected_user']} per-user, {limits['rejected_global']} global\n"
+                  f"**Most Limited:** {top_rejected}\n"
+                  f"**Tracked Users:** {limits['tracked_buckets']}",
+            inline=True
+        )
+        
+        # Commands cancelled by the watchdog for overrunning their time budget
+        watchdog = self.bot.watchdog.stats()
+        if watchdog['total_overruns']:
+            worst = ", ".join(f"/{name} ({count})" for name, count in watchdog['by_command'])
+            _, last_command, last_elapsed, last_location = watchdog['last']
+            embed.add_field(
+                name="⌛ Timed Out Commands",
+                value=f"**Total:** {watchdog['total_overruns']}\n"
+                      f"**Most Often:** {worst}\n"
+                      f"**Last:** /{last_command} after {last_elapsed:.0f}s at `{last_location}`",
+                inline=False
+            )
+        
+        # Event loop lag and the handlers that blocked the loop the longest
+        loop = self.bot.loop_monitor.stats()
+        value = (f"**Lag:** {loop['p50'] * 1000:.1f}ms p50, {loop['p99'] * 1000:.1f}ms p99\n"
+                 f"**Blocked:** {loop['slow_callbacks']} time{'s' if loop['slow_callbacks'] != 1 else ''}")
+        if loop['worst']:
+            value += "\n**Worst:** " + ", ".join(f"`{handler}` ({lag * 1000:.0f}ms)" for handler, _, lag in loop['worst'])
+        embed.add_field(name="🐢 Event Loop", value=value, inline=False)
+        
+        # Circuit breaker state per external API
+        breaker_icons = {'closed': '🟢', 'half_open': '🟡', 'open': '🔴'}
+        lines = []
+        for name, breaker in self.bot.api_client.breaker_stats().items():
+            line = f"{breaker_icons[breaker['state']]} **{name.title()}:** {breaker['timeout']:.1f}s timeout"
+            if breaker['state'] == 'open':
+                line += f", retry in {breaker['retry_in']:.0f}s"
+            lines.append(line)
+        embed.add_field(name="⚡ API Status", value="\n".join(lines), inline=True)
+        
+        # Prefetch buffers for /joke, /quote, /fact and /meme
+        fun = self.bot.get_cog('Fun')
+        if fun is not None:
+            lines = []
+            for name, buffer in fun.buffers.items():
+                stats = buffer.stats()
+                lines.append(
+                    f"**{name.title()}:** {stats['depth']}/{stats['capacity']}, "
+                    f"{round(stats['refill_per_minute'], 1)}/min, "
+                    f"{round(stats['failure_rate'] * 100)}% failed"
+                )
+            embed.add_field(name="📦 Prefetch Buffers", value="\n".join(lines), inline=True)
+        
+        # Weather cache effectiveness
+        weather = self.weather_cache.stats()
+        embed.add_field(
+            name="🌤️ Weather Cache",
+            value=f"**Cities:** {weather['size']}\n"
+                  f"**Hits:** {weather['hits']} (+{weather['stale_hits']} stale)\n"
+                  f"**Misses:** {weather['misses']} ({weather['coalesced']} coalesced)\n"
+                  f"**Hit Ratio:** {round(weather['hit_ratio'] * 100, 1)}%",
+            inline=True
+        )
+        
+        # Translation cache effectiveness
+        translations = self.translation_cache.stats()
+        embed.add_field(
+            name="🌐 Translation Cache",
+            value=f"**Entries:** {translations['size']}\n"
+                  f"**Hits:** {translations['hits']}\n"
+                  f"**Misses:** {translations['misses']} ({translations['coalesced']} coalesced)\n"
+                  f"**Hit Ratio:** {round(translations['hit_ratio'] * 100, 1)}%",
             inline=True
         )
         
@@ -106,6 +281,23 @@ class Utility(commands.Cog):
         
         await interaction.response.send_message(embed=embed)
     
+    @staticmethod
+    def format_latency(latency):
+        # Shards report inf/nan until their first heartbeat is acknowledged
+        return f"{round(latency * 1000)}ms" if math.isfinite(latency) else "connecting..."
+    
+    @staticmethod
+    def limit_lines(lines, limit=15):
+        """Join lines for an embed field, summarising any past `limit`"""
+        if len(lines) > limit:
+            lines = lines[:limit] + [f"...and {len(lines) - limit} more"]
+        return "\n".join(lines)
+    
+    @staticmethod
+    def format_trend(trends, field, format_value):
+        """Format one field of ProcessSampler.trends() as 'a / b / c'"""
+        return " / ".join(format_value(trend[field]) if trend else "–" for _, trend in trends)
+    
     @app_commands.command(name="help", description="Get help with bot commands")
     async def help(self, interaction: discord.Interaction):
         """Display help information for all commands"""
@@ -123,10 +315,10 @@ class Utility(commands.Cog):
                   "**/help** - Show this help message\n"
                   "**/uptime** - Check bot uptime\n"
                   "**/weather** - Get weather for a city\n"
-                  "**/translate** - Translate text\n"
+                  "**/translate** - Translate text (into several languages at once with es, fr, de)\n"
                   "**/remindme** - Set a reminder\n"
                   "**/say** - Make the bot say something\n"
-                  "**/trigger** - Set automatic word responses",
+                  "**/trigger** - Set, list or remove automatic word responses",
             inline=False
         )
         
@@ -137,7 +329,8 @@ class Utility(commands.Cog):
                   "**/ban** - Ban a member from the server\n"
                   "**/unban** - Unban a member from the server\n"
                   "**/clear** - Clear messages from a channel\n"
-                  "**/timeout** - Timeout a member",
+                  "**/timeout** - Timeout a member\n"
+                  "**/bulkkick** / **/bulkban** / **/bulktimeout** - Act on many users by ID",
             inline=False
         )
         
@@ -173,7 +366,8 @@ class Utility(commands.Cog):
             name="📬 DM Commands",
             value="**/setchannel** - Set channel for DM replies\n"
                   "**/dm** - Send DM to a specific user\n"
-                  "**/dmall** - Send DM to all server members",
+                  "**/dmall send** - Send DM to all server members\n"
+                  "**/dmall status** / **/dmall cancel** - Check or stop a mass DM",
             inline=False
         )
         
@@ -184,12 +378,8 @@ class Utility(commands.Cog):
     @app_commands.command(name="uptime", description="Check how long the bot has been running")
     async def uptime(self, interaction: discord.Interaction):
         """Display bot uptime information"""
-        import psutil
-        from datetime import timedelta
-        
-        # Get process start time
-        process = psutil.Process()
-        start_time = datetime.fromtimestamp(process.create_time())
+        sampler = self.bot.process_sampler
+        start_time = datetime.fromtimestamp(sampler.started_at)
         uptime_duration = datetime.now() - start_time
         
         # Format uptime
@@ -205,7 +395,25 @@ class Utility(commands.Cog):
         )
         embed.add_field(name="Current Uptime", value=uptime_str, inline=True)
         embed.add_field(name="Started At", value=f"<t:{int(start_time.timestamp())}:F>", inline=True)
-        embed.add_field(name="Memory Usage", value=f"{round(process.memory_info().rss / 1024**2, 1)} MB", inline=True)
+        
+        # Resource use from the background sampler
+        latest = sampler.latest()
+        trends = sampler.trends()
+        embed.add_field(
+            name="Memory Usage",
+            value=f"{latest['rss'] / 1024**2:.1f} MB" if latest else "Sampling...",
+            inline=True
+        )
+        embed.add_field(
+            name="Memory (1m / 15m / 1h)",
+            value=f"{self.format_trend(trends, 'rss', lambda value: f'{value / 1024**2:.0f}')} MB",
+            inline=True
+        )
+        embed.add_field(
+            name="CPU (1m / 15m / 1h)",
+            value=f"{self.format_trend(trends, 'cpu', lambda value: f'{value:.1f}')}%",
+            inline=True
+        )
         
         await interaction.response.send_message(embed=embed)
     
@@ -214,55 +422,49 @@ class Utility(commands.Cog):
     async def weather(self, interaction: discord.Interaction, city: str):
         """Get weather information for a specified city"""
         try:
-            # Using a free weather API (OpenWeatherMap alternative)
-            async with aiohttp.ClientSession() as session:
-                url = f"https://wttr.in/{city}?format=j1"
-                async with session.get(url, timeout=10) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        current = data['current_condition'][0]
-                        
-                        embed = discord.Embed(
-                            title=f"🌤️ Weather in {city.title()}",
-                            color=discord.Color.blue(),
-                            timestamp=datetime.now()
-                        )
-                        
-                        embed.add_field(
-                            name="Temperature",
-                            value=f"{current['temp_C']}°C / {current['temp_F']}°F",
-                            inline=True
-                        )
-                        embed.add_field(
-                            name="Feels Like",
-                            value=f"{current['FeelsLikeC']}°C / {current['FeelsLikeF']}°F",
-                            inline=True
-                        )
-                        embed.add_field(
-                            name="Condition",
-                            value=current['weatherDesc'][0]['value'],
-                            inline=True
-                        )
-                        embed.add_field(
-                            name="Humidity",
-                            value=f"{current['humidity']}%",
-                            inline=True
-                        )
-                        embed.add_field(
-                            name="Wind",
-                            value=f"{current['windspeedKmph']} km/h",
-                            inline=True
-                        )
-                        embed.add_field(
-                            name="Visibility",
-                            value=f"{current['visibility']} km",
-                            inline=True
-                        )
-                        
-                        embed.set_footer(text=f"Requested by {interaction.user}", icon_url=interaction.user.avatar.url if interaction.user.avatar else None)
-                        
-                        await interaction.response.send_message(embed=embed)
-                        return
+            current = await self.get_current_weather(city)
+            
+            embed = discord.Embed(
+                title=f"🌤️ Weather in {city.title()}",
+                color=discord.Color.blue(),
+                timestamp=datetime.now()
+            )
+            
+            embed.add_field(
+                name="Temperature",
+                value=f"{current['temp_C']}°C / {current['temp_F']}°F",
+                inline=True
+            )
+            embed.add_field(
+                name="Feels Like",
+                value=f"{current['FeelsLikeC']}°C / {current['FeelsLikeF']}°F",
+                inline=True
+            )
+            embed.add_field(
+                name="Condition",
+                value=current['weatherDesc'][0]['value'],
+                inline=True
+            )
+            embed.add_field(
+                name="Humidity",
+                value=f"{current['humidity']}%",
+                inline=True
+            )
+            embed.add_field(
+                name="Wind",
+                value=f"{current['windspeedKmph']} km/h",
+                inline=True
+            )
+            embed.add_field(
+                name="Visibility",
+                value=f"{current['visibility']} km",
+                inline=True
+            )
+            
+            embed.set_footer(text=f"Requested by {interaction.user}", icon_url=interaction.user.avatar.url if interaction.user.avatar else None)
+            
+            await interaction.response.send_message(embed=embed)
+            return
         except Exception as e:
             pass
         
@@ -274,10 +476,38 @@ class Utility(commands.Cog):
         )
         await interaction.response.send_message(embed=embed)
     
-    @app_commands.command(name="translate", description="Translate text to another language")
+    async def get_current_weather(self, city):
+        """Return current conditions for a city, shared by everyone asking about it"""
+        key = ' '.join(city.lower().split())
+        
+        async def fetch():
+            # Using a free weather API (OpenWeatherMap alternative)
+            data = await self.bot.api_client.get_json('weather', city=key)
+            # Only keep current conditions; the full forecast is much larger
+            return data['current_condition'][0]
+        
+        return await self.weather_cache.get(key, fetch)
+    
+    async def get_translation(self, text, target_language):
+        """Translate text, reusing cached and in-flight translations"""
+        async def fetch():
+            # Using a free translation API
+            params = {
+                'q': text,
+                'langpair': f'auto|{target_language}'
+            }
+            data = await self.bot.api_client.get_json('translate', params=params)
+            # Quota and language errors come back as HTTP 200; don't cache them
+            if str(data.get('responseStatus', 200)) != '200':
+                raise ValueError(data.get('responseDetails') or 'translation failed')
+            return data['responseData']['translatedText']
+        
+        return await self.translation_cache.translate(text, target_language, fetch)
+    
+    @app_commands.command(name="translate", description="Translate text to one or more languages")
     @app_commands.describe(
         text="The text to translate",
-        target_language="Target language (e.g., es, fr, de, ja, ko)"
+        target_language="Target language, or several separated by commas (e.g., es, fr, de, ja, ko)"
     )
     async def translate(self, interaction: discord.Interaction, text: str, target_language: str):
         """Translate text using a translation API"""
@@ -288,32 +518,42 @@ class Utility(commands.Cog):
             )
             return
         
-        try:
-            # Using a free translation API
-            async with aiohttp.ClientSession() as session:
-                url = "https://api.mymemory.translated.net/get"
-                params = {
-                    'q': text,
-                    'langpair': f'auto|{target_language}'
-                }
-                async with session.get(url, params=params, timeout=10) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        translated_text = data['responseData']['translatedText']
-                        
-                        embed = discord.Embed(
-                            title="🌐 Translation",
-                            color=discord.Color.purple()
-                        )
-                        embed.add_field(name="Original", value=text, inline=False)
-                        embed.add_field(name="Translated", value=translated_text, inline=False)
-                        embed.add_field(name="Target Language", value=target_language.upper(), inline=True)
-                        embed.set_footer(text=f"Translated for {interaction.user}", icon_url=interaction.user.avatar.url if interaction.user.avatar else None)
-                        
-                        await interaction.response.send_message(embed=embed)
-                        return
-        except Exception as e:
-            pass
+        # Split and de-duplicate the requested languages, keeping their order
+        languages = list(dict.fromkeys(
+            language.strip().lower() for language in target_language.replace(' ', ',').split(',') if language.strip()
+        ))
+        max_languages = self.bot.config['translation_cache']['max_languages']
+        if not languages or len(languages) > max_languages:
+            await interaction.response.send_message(
+                f"❌ Please give between 1 and {max_languages} target languages!",
+                ephemeral=True
+            )
+            return
+        
+        # Several languages can take longer than Discord's 3 second reply window
+        await interaction.response.defer()
+        results = await asyncio.gather(
+            *(self.get_translation(text, language) for language in languages),
+            return_exceptions=True
+        )
+        
+        if not all(isinstance(result, Exception) for result in results):
+            embed = discord.Embed(
+                title="🌐 Translation",
+                color=discord.Color.purple()
+            )
+            embed.add_field(name="Original", value=text, inline=False)
+            if len(languages) == 1:
+                embed.add_field(name="Translated", value=results[0][:1024], inline=False)
+                embed.add_field(name="Target Language", value=languages[0].upper(), inline=True)
+            else:
+                for language, result in zip(languages, results):
+                    value = "❌ Unavailable" if isinstance(result, Exception) else result[:1024]
+                    embed.add_field(name=language.upper(), value=value, inline=False)
+            embed.set_footer(text=f"Translated for {interaction.user}", icon_url=interaction.user.avatar.url if interaction.user.avatar else None)
+            
+            await interaction.followup.send(embed=embed)
+            return
         
         # Fallback message
         embed = discord.Embed(
@@ -321,18 +561,19 @@ class Utility(commands.Cog):
             description="Sorry, I couldn't translate the text right now. Please try again later.",
             color=discord.Color.red()
         )
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
     
-    @app_commands.command(name="remindme", description="Set a reminder (up to 24 hours)")
+    @app_commands.command(name="remindme", description="Set a reminder")
     @app_commands.describe(
-        duration="Duration in minutes (max 1440 for 24 hours)",
+        duration="Duration in minutes",
         reminder="What to remind you about"
     )
     async def remindme(self, interaction: discord.Interaction, duration: int, reminder: str):
         """Set a reminder for the user"""
-        if duration < 1 or duration > 1440:  # Max 24 hours
+        max_minutes = self.bot.config['reminders']['max_minutes']
+        if duration < 1 or duration > max_minutes:
             await interaction.response.send_message(
-                "❌ Duration must be between 1 minute and 24 hours (1440 minutes)!",
+                f"❌ Duration must be between 1 minute and {max_minutes // 1440} days ({max_minutes} minutes)!",
                 ephemeral=True
             )
             return
@@ -344,8 +585,14 @@ class Utility(commands.Cog):
             )
             return
         
-        # Schedule the reminder
+        # Schedule the reminder; the scheduler delivers it even after a restart
         remind_time = datetime.now() + timedelta(minutes=duration)
+        await self.reminders.add(
+            interaction.user.id,
+            interaction.channel_id or 0,
+            reminder,
+            remind_time.timestamp()
+        )
         
         embed = discord.Embed(
             title="⏰ Reminder Set",
@@ -356,22 +603,32 @@ class Utility(commands.Cog):
         embed.add_field(name="Remind At", value=f"<t:{int(remind_time.timestamp())}:F>", inline=True)
         
         await interaction.response.send_message(embed=embed)
+    
+    async def deliver_reminders(self, batch):
+        """Send a batch of due reminders to their channels, falling back to DMs"""
+        await asyncio.gather(*(self.deliver_reminder(*reminder) for reminder in batch))
+    
+    async def deliver_reminder(self, due_at, reminder_id, user_id, channel_id, text, created_at):
+        reminder_embed = discord.Embed(
+            title="⏰ Reminder",
+            description=f"You asked me to remind you about: **{text}**",
+            color=discord.Color.gold()
+        )
+        reminder_embed.add_field(name="Set", value=f"<t:{int(created_at)}:R>", inline=True)
         
-        # Wait for the specified duration
-        await asyncio.sleep(duration * 60)
+        channel = self.bot.get_channel(channel_id)
+        if channel is not None and not isinstance(channel, discord.DMChannel):
+            try:
+                await channel.send(f"<@{user_id}>", embed=reminder_embed)
+                return
+            except discord.HTTPException:
+                pass  # Fall back to a DM below
         
-        # Send the reminder
         try:
-            reminder_embed = discord.Embed(
-                title="⏰ Reminder",
-                description=f"You asked me to remind you about: **{reminder}**",
-                color=discord.Color.gold()
-            )
-            reminder_embed.add_field(name="Set", value=f"<t:{int(datetime.now().timestamp() - duration * 60)}:R>", inline=True)
-            
-            await interaction.followup.send(f"{interaction.user.mention}", embed=reminder_embed)
-        except:
-            pass  # User might have left the server or disabled DMs
+            user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+            await user.send(embed=reminder_embed)
+        except discord.HTTPException:
+            pass  # User might have left or disabled DMs
     
     @app_commands.command(name="say", description="Make the bot say something")
     @app_commands.describe(message="The message for the bot to say")
@@ -388,13 +645,17 @@ class Utility(commands.Cog):
         # Send the message
         await interaction.response.send_message(message)
     
-    @app_commands.command(name="trigger", description="Set up automatic responses to specific words")
+    @trigger.command(name="set", description="Set up an automatic response to a specific word")
     @app_commands.describe(
         word="The word that will trigger a response",
-        response="The response message when someone says the trigger word"
+        response="The response message when someone says the trigger word",
+        mode="Match the trigger anywhere in a message or only as a whole word (default: anywhere)"
     )
-    @app_commands.default_permissions(manage_messages=True)
-    async def trigger(self, interaction: discord.Interaction, word: str, response: str):
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="Anywhere in message", value=MODE_SUBSTRING),
+        app_commands.Choice(name="Whole word only", value=MODE_WORD)
+    ])
+    async def trigger_set(self, interaction: discord.Interaction, word: str, response: str, mode: app_commands.Choice[str] = None):
         """Set up automatic responses when users say specific words"""
         
         if len(word) > 50:
@@ -411,49 +672,99 @@ class Utility(commands.Cog):
             )
             return
         
-        # Store trigger in bot's memory (in a real bot, you'd use a database)
-        if not hasattr(self.bot, 'triggers'):
-            self.bot.triggers = {}
+        match_mode = mode.value if mode else MODE_SUBSTRING
         
-        guild_id = str(interaction.guild.id)
-        if guild_id not in self.bot.triggers:
-            self.bot.triggers[guild_id] = {}
-            
-        self.bot.triggers[guild_id][word.lower()] = response
+        # Update the cache now; the database write happens in the background
+        await self.bot.trigger_store.set_trigger(interaction.guild.id, word.lower(), response, match_mode)
         
         embed = discord.Embed(
             title="✅ Trigger Set",
             description=f"When someone says **{word}**, I'll respond with:\n> {response}",
             color=discord.Color.green()
         )
+        embed.add_field(name="Match", value="Whole word only" if match_mode == MODE_WORD else "Anywhere in message", inline=True)
         embed.set_footer(text=f"Set by {interaction.user.display_name}")
         
         await interaction.response.send_message(embed=embed)
     
+    @trigger.command(name="list", description="List the trigger words set up in this server")
+    @app_commands.describe(page="Page number to show (default: 1)")
+    async def trigger_list(self, interaction: discord.Interaction, page: int = 1):
+        """List trigger words one page at a time"""
+        page_size = self.bot.config['triggers']['page_size']
+        page = max(page, 1)
+        
+        rows, total = await self.bot.trigger_store.list_triggers(interaction.guild.id, page, page_size)
+        
+        if total == 0:
+            await interaction.response.send_message(
+                "❌ This server has no triggers set up! Use `/trigger set` to add one.",
+                ephemeral=True
+            )
+            return
+        
+        total_pages = (total + page_size - 1) // page_size
+        if not rows:
+            await interaction.response.send_message(
+                f"❌ Page {page} doesn't exist! There {'is' if total_pages == 1 else 'are'} only {total_pages} page{'s' if total_pages != 1 else ''}.",
+                ephemeral=True
+            )
+            return
+        
+        lines = []
+        for word, response, mode in rows:
+            preview = response[:80] + "..." if len(response) > 80 else response
+            match_text = " (whole word)" if mode == MODE_WORD else ""
+            lines.append(f"**{word}**{match_text} → {preview}")
+        
+        embed = discord.Embed(
+            title=f"📝 Triggers in {interaction.guild.name}",
+            description="\n".join(lines),
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"Page {page}/{total_pages} • {total} trigger{'s' if total != 1 else ''}")
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @trigger.command(name="remove", description="Remove a trigger word")
+    @app_commands.describe(word="The trigger word to remove")
+    async def trigger_remove(self, interaction: discord.Interaction, word: str):
+        """Remove a trigger word from this server"""
+        removed = await self.bot.trigger_store.remove_trigger(interaction.guild.id, word.lower())
+        
+        if not removed:
+            await interaction.response.send_message(
+                f"❌ There is no trigger for **{word}** in this server!",
+                ephemeral=True
+            )
+            return
+        
+        embed = discord.Embed(
+            title="🗑️ Trigger Removed",
+            description=f"I'll no longer respond to **{word}**.",
+            color=discord.Color.green()
+        )
+        embed.set_footer(text=f"Removed by {interaction.user.display_name}")
+        
+        await interaction.response.send_message(embed=embed)
+    
     @commands.Cog.listener()
+    @timed_listener('Utility.on_message')
     async def on_message(self, message):
         """Listen for trigger words in messages"""
         # Don't respond to bots or DMs
         if message.author.bot or not message.guild:
             return
-            
-        # Check if bot has triggers set up
-        if not hasattr(self.bot, 'triggers'):
-            return
-            
-        guild_id = str(message.guild.id)
-        if guild_id not in self.bot.triggers:
+        
+        # Triggers are loaded from the store the first time a guild is seen
+        matcher = await self.bot.trigger_store.get_matcher(message.guild.id)
+        if matcher is None:
             return
             
-        # Check message content for trigger words (exact word matching to avoid false triggers)
-        message_content = message.content.lower()
-        words = message_content.split()
-        
-        for trigger_word, response in self.bot.triggers[guild_id].items():
-            # Check for exact word match or if trigger word is found in the message
-            if trigger_word in words or trigger_word in message_content:
-                await message.channel.send(response)
-                return  # Only respond to the first trigger found and exit
+        # Scan the message once for every trigger; the first trigger set wins
+        response = matcher.match(message.content.lower())
+        if response is not None:
+            await message.channel.send(response)
 
 async def setup(bot):
     await bot.add_cog(Utility(bot))
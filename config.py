@@ -1,4 +1,5 @@
 import os
+from utils.cluster import cluster_path
 
 # Bot configuration
 BOT_CONFIG = {
@@ -11,8 +12,40 @@ BOT_CONFIG = {
     'max_messages': 1000,  # Max messages to cache
     'heartbeat_timeout': 60.0,
     
+    # Gateway sharding with AutoShardedBot (also enabled by setting SHARD_COUNT or SHARD_IDS)
+    'sharding': {
+        'enabled': False,
+        'shard_count': None,  # Total shards across all processes; None = Discord's recommendation
+        'shard_ids': None,  # Shards this process runs, e.g. '0-3' or [0, 1, 2, 3]; None = all (needs shard_count)
+        'max_concurrency': None  # Shards that may IDENTIFY at once; None = read from Discord
+    },
+    
+    # Multi-process cluster mode: main.py supervises `workers` bot processes, each running a range of shards
+    'cluster': {
+        'workers': 0,  # 0 = a single process (also set with CLUSTER_WORKERS)
+        'ipc_path': 'cluster.sock',  # Unix socket for worker <-> supervisor stats (loopback TCP on Windows)
+        'report_interval': 15.0,  # Seconds between guild/user count reports from each worker
+        'restart_delay': 5.0,  # Delay before restarting a crashed worker; doubles while it keeps crashing
+        'max_restart_delay': 300.0,
+        'stable_after': 60.0,  # A worker that ran this long restarts with the initial delay again
+        'id': None,  # Set for workers by the supervisor (CLUSTER_ID / CLUSTER_IPC)
+        'ipc': None,
+        # Each worker keeps its own copy of state that is loaded and rewritten whole, keyed by
+        # guild; fix sharding.shard_count and keep the worker count stable so guilds stay put
+        'dm_settings_path': 'dm_channels.json'
+    },
+    
+    # Status text ("N servers | /help"); each update counts against the gateway's 120 commands per minute
+    'presence': {
+        'interval': 30.0  # Minimum seconds between presence updates; changes in between are coalesced
+    },
+    
     # Command settings
     'command_timeout': 30.0,  # Timeout for commands in seconds
+    'command_budgets': {  # Per-command timeouts that differ from command_timeout (at most 840s, under the 15 minute interaction token)
+        'clear': 720.0,  # Deleting old messages one by one is slow by design; above purge.time_limit
+        'translate': 60.0  # Several languages, each up to its API timeout
+    },
     
     # Embed colors (in hex)
     'colors': {
@@ -23,18 +56,138 @@ BOT_CONFIG = {
         'default': 0x7289da
     },
     
-    # API endpoints for fun commands
+    # API endpoints for fun and utility commands (timeouts in seconds)
     'api_endpoints': {
-        'jokes': 'https://official-joke-api.appspot.com/random_joke',
-        'quotes': 'https://api.quotable.io/random',
-        'facts': 'https://uselessfacts.jsph.pl/random.json?language=en'
+        'jokes': {'url': 'https://official-joke-api.appspot.com/random_joke', 'timeout': 5.0},
+        'quotes': {'url': 'https://api.quotable.io/random', 'timeout': 5.0},
+        'facts': {'url': 'https://uselessfacts.jsph.pl/random.json?language=en', 'timeout': 5.0},
+        'memes': {'url': 'https://meme-api.com/gimme/programmerhumor', 'timeout': 10.0},
+        'weather': {'url': 'https://wttr.in/{city}?format=j1', 'timeout': 10.0},
+        'translate': {'url': 'https://api.mymemory.translated.net/get', 'timeout': 10.0}
+    },
+    
+    # Shared HTTP connection pool for outbound API calls
+    'http_pool': {
+        'limit': 100,  # Max open connections overall
+        'limit_per_host': 10,  # Max open connections per host
+        'dns_cache_ttl': 300,  # Seconds to cache DNS lookups
+        'keepalive_timeout': 30.0  # Seconds to keep idle connections open
+    },
+    
+    # Circuit breakers and adaptive timeouts for the API endpoints above
+    'circuit_breaker': {
+        'failure_threshold': 5,  # Consecutive failures before calls fail fast
+        'reset_timeout': 30.0,  # Seconds before the first half-open probe
+        'max_reset_timeout': 300.0,  # Probe interval cap while an endpoint stays down
+        'min_timeout': 1.0,  # Adaptive timeouts never go below this (the endpoint timeout is the ceiling)
+        'timeout_multiplier': 2.0,  # Timeout = p95 latency x this
+        'latency_samples': 100,  # Recent requests used for p95
+        'min_samples': 20  # Requests needed before the timeout adapts
+    },
+    
+    # Jokes, quotes, facts and memes fetched ahead of time
+    'prefetch': {
+        'capacity': 10,  # Items buffered per source
+        'low_water': 5,  # Refill once a buffer drops below this
+        'recent_size': 100,  # Recent items remembered to skip duplicates
+        'retry_delay': 5.0,  # First retry delay after an API failure (doubles each time)
+        'max_retry_delay': 300.0  # Longest retry delay
+    },
+    
+    # /weather result cache
+    'weather_cache': {
+        'ttl': 600,  # Seconds a result is fresh
+        'stale_ttl': 1800,  # Extra seconds a result is served while it refreshes
+        'max_size': 500  # Cities kept (least recently used are evicted)
+    },
+    
+    # /translate result cache
+    'translation_cache': {
+        'max_size': 5000,  # Translations kept (least recently used are evicted)
+        'path': 'translations.json',  # File the cache is saved to; None keeps it in memory only
+        'debounce': 5.0,  # Seconds to batch new translations into one file write
+        'max_languages': 5  # Target languages allowed in one /translate
+    },
+    
+    # Trigger word storage
+    'triggers': {
+        'database': 'triggers.db',  # SQLite file for trigger words
+        'cache_size': 1000,  # Guilds kept in memory before the least recently used is evicted
+        'flush_interval': 2.0,  # Seconds to batch trigger changes before writing them
+        'page_size': 10  # Triggers shown per page in /trigger list
+    },
+    
+    # Reminders (/remindme)
+    'reminders': {
+        'database': 'reminders.db',  # SQLite file for pending reminders
+        'max_minutes': 525600,  # Longest reminder allowed (365 days)
+        'batch_size': 50  # Reminders delivered together when several are due
+    },
+    
+    # Seconds to batch settings changes (such as /setchannel) into one file write
+    'settings_debounce': 1.0,
+    
+    # Mass DM (/dmall) broadcasts
+    'broadcast': {
+        'workers': 5,  # DMs sent concurrently
+        'max_per_second': 10.0,  # Upper bound on DMs started per second
+        'progress_interval': 10.0,  # Seconds between progress message updates
+        'checkpoint_dir': 'broadcasts',  # Where running broadcasts are saved for resuming
+        'checkpoint_every': 25  # Members handled between checkpoints
+    },
+    
+    # /clear
+    'purge': {
+        'max_amount': 1000,  # Messages one /clear may delete
+        'scan_limit': 5000,  # Messages looked at before giving up on finding more matches
+        'single_delete_interval': 1.0,  # Seconds between deletes of messages older than 14 days
+        # Interaction tokens expire after 15 minutes, so /clear must report back well before that
+        'max_single_deletes': 300,  # Old messages deleted one by one per /clear (~5 minutes at the interval above)
+        'time_limit': 600.0,  # Seconds after which /clear stops and reports what it deleted
+        'progress_interval': 5.0  # Seconds between progress updates
+    },
+    
+    # Bulk moderation (/bulkkick, /bulkban, /bulktimeout)
+    'bulk_moderation': {
+        'max_targets': 1000,  # Users per bulk action
+        'max_file_size': 100_000,  # Bytes allowed in an uploaded ID list
+        'workers': 4,  # Requests in flight at once
+        'max_per_second': 5.0,  # Upper bound on requests started per second
+        'progress_interval': 3.0  # Seconds between progress message updates
+    },
+    
+    # Background sampling of the bot process's resource use for /info and /uptime
+    'process_sampler': {
+        'interval': 5.0,  # Seconds between samples
+        'history': 720  # Samples kept (1 hour at the default interval)
+    },
+    
+    # Event loop lag sampling and blocked-loop detection
+    'loop_monitor': {
+        'interval': 0.25,  # Seconds between lag samples
+        'threshold': 0.1,  # Lag (seconds) that counts as a blocked loop
+        'samples': 1200,  # Ring buffer size (5 minutes at the default interval)
+        'log_interval': 60.0  # Seconds between loop_lag summary log lines
+    },
+    
+    # Prometheus metrics endpoint (http://host:port/metrics)
+    'metrics': {
+        'enabled': True,
+        'host': '127.0.0.1',  # Keep it local; put a reverse proxy in front to expose it
+        'port': 9108
     },
     
     # Rate limiting
     'rate_limits': {
         'per_user': 5,  # Commands per user per bucket
         'per_bucket': 10.0,  # Bucket duration in seconds
-        'global_rate_limit': 100  # Global commands per minute
+        'global_rate_limit': 100,  # Global commands per minute
+        'max_tracked_users': 50000,  # User buckets kept in memory (least recently active are dropped)
+        'command_overrides': {  # Stricter buckets for commands that call external APIs
+            'weather': {'per_user': 2, 'per_bucket': 30.0},
+            'translate': {'per_user': 3, 'per_bucket': 30.0},
+            'meme': {'per_user': 3, 'per_bucket': 30.0}
+        }
     },
     
     # Logging configuration
@@ -64,10 +217,29 @@ REQUIRED_ENV_VARS = {
 OPTIONAL_ENV_VARS = {
     'BOT_PREFIX': get_env_var('BOT_PREFIX', BOT_CONFIG['prefix']),
     'LOG_LEVEL': get_env_var('LOG_LEVEL', BOT_CONFIG['logging']['level']),
-    'COMMAND_TIMEOUT': float(get_env_var('COMMAND_TIMEOUT', BOT_CONFIG['command_timeout']))
+    'COMMAND_TIMEOUT': float(get_env_var('COMMAND_TIMEOUT', BOT_CONFIG['command_timeout'])),
+    'SHARD_COUNT': get_env_var('SHARD_COUNT', BOT_CONFIG['sharding']['shard_count']),
+    'SHARD_IDS': get_env_var('SHARD_IDS', BOT_CONFIG['sharding']['shard_ids']),
+    'CLUSTER_WORKERS': int(get_env_var('CLUSTER_WORKERS', BOT_CONFIG['cluster']['workers'])),
+    'CLUSTER_ID': get_env_var('CLUSTER_ID'),
+    'CLUSTER_IPC': get_env_var('CLUSTER_IPC')
 }
 
 # Update config with environment variables
 BOT_CONFIG['prefix'] = OPTIONAL_ENV_VARS['BOT_PREFIX']
 BOT_CONFIG['logging']['level'] = OPTIONAL_ENV_VARS['LOG_LEVEL']
 BOT_CONFIG['command_timeout'] = OPTIONAL_ENV_VARS['COMMAND_TIMEOUT']
+if OPTIONAL_ENV_VARS['SHARD_COUNT'] is not None:
+    BOT_CONFIG['sharding']['shard_count'] = int(OPTIONAL_ENV_VARS['SHARD_COUNT'])
+BOT_CONFIG['sharding']['shard_ids'] = OPTIONAL_ENV_VARS['SHARD_IDS']
+if os.getenv('SHARD_COUNT') or os.getenv('SHARD_IDS'):
+    BOT_CONFIG['sharding']['enabled'] = True
+BOT_CONFIG['cluster']['workers'] = OPTIONAL_ENV_VARS['CLUSTER_WORKERS']
+if OPTIONAL_ENV_VARS['CLUSTER_ID'] is not None:
+    cluster_id = int(OPTIONAL_ENV_VARS['CLUSTER_ID'])
+    BOT_CONFIG['cluster']['id'] = cluster_id
+    BOT_CONFIG['cluster']['ipc'] = OPTIONAL_ENV_VARS['CLUSTER_IPC']
+    BOT_CONFIG['cluster']['dm_settings_path'] = cluster_path(BOT_CONFIG['cluster']['dm_settings_path'], cluster_id)
+    BOT_CONFIG['reminders']['database'] = cluster_path(BOT_CONFIG['reminders']['database'], cluster_id)
+    BOT_CONFIG['translation_cache']['path'] = cluster_path(BOT_CONFIG['translation_cache']['path'], cluster_id)
+    BOT_CONFIG['broadcast']['checkpoint_dir'] = cluster_path(BOT_CONFIG['broadcast']['checkpoint_dir'], cluster_id)
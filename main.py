@@ -1,12 +1,20 @@
 import asyncio
 import logging
 import os
+import signal
+import sys
+import discord
 from bot import DiscordBot
+from config import BOT_CONFIG
+from utils.cluster import EXIT_FATAL, ClusterSupervisor
+
+# Cluster workers share the log file, so tag their lines
+log_prefix = f"[cluster {os.environ['CLUSTER_ID']}] " if 'CLUSTER_ID' in os.environ else ''
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format=f'%(asctime)s - {log_prefix}%(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.FileHandler('bot.log'),
         logging.StreamHandler()
@@ -15,6 +23,72 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+def add_signal_handlers(signals, callback):
+    loop = asyncio.get_running_loop()
+    for signum in signals:
+        try:
+            loop.add_signal_handler(signum, callback)
+        except (NotImplementedError, RuntimeError):
+            pass  # Not supported on Windows
+
+async def fetch_gateway_info(token):
+    """Return Discord's recommended shard count and max IDENTIFY concurrency"""
+    http = discord.http.HTTPClient(asyncio.get_running_loop())
+    try:
+        await http.static_login(token)
+        shards, _, session_start_limit = await http.get_bot_gateway()
+    finally:
+        await http.close()
+    return shards, session_start_limit['max_concurrency']
+
+async def run_bot(token):
+    """Run the bot in this process (alone, or as one cluster worker); returns the exit code"""
+    bot = DiscordBot()
+    
+    # The cluster supervisor stops workers with SIGTERM, and handles Ctrl+C for them
+    worker = BOT_CONFIG['cluster']['id'] is not None
+    add_signal_handlers((signal.SIGTERM, signal.SIGINT) if worker else (signal.SIGTERM,),
+                        lambda: asyncio.create_task(bot.close()))
+    
+    try:
+        await bot.start(token)
+    except (discord.LoginFailure, discord.PrivilegedIntentsRequired) as e:
+        logger.error(f"Cannot start the bot: {e}")
+        return EXIT_FATAL
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        return 1
+    finally:
+        if not bot.is_closed():
+            await bot.close()
+    return 0
+
+async def run_cluster(token):
+    """Supervise one bot process per slice of the shards, restarting any that crash"""
+    cluster = BOT_CONFIG['cluster']
+    sharding = BOT_CONFIG['sharding']
+    
+    shard_count = sharding['shard_count']
+    max_concurrency = sharding['max_concurrency']
+    if shard_count is None or max_concurrency is None:
+        recommended, gateway_concurrency = await fetch_gateway_info(token)
+        shard_count = shard_count or recommended
+        max_concurrency = max_concurrency or gateway_concurrency
+    
+    supervisor = ClusterSupervisor(
+        [sys.executable, os.path.abspath(__file__)],
+        max(shard_count, cluster['workers']),  # Every worker needs at least one shard
+        cluster['workers'],
+        max_concurrency=max_concurrency,
+        ipc_path=cluster['ipc_path'],
+        restart_delay=cluster['restart_delay'],
+        max_restart_delay=cluster['max_restart_delay'],
+        stable_after=cluster['stable_after']
+    )
+    add_signal_handlers((signal.SIGINT, signal.SIGTERM), supervisor.stop)
+    await supervisor.run()
+    return 0
+
 async def main():
     """Main function to run the Discord bot"""
     try:
@@ -22,16 +96,21 @@ async def main():
         token = os.getenv('DISCORD_TOKEN')
         if not token:
             logger.error("DISCORD_TOKEN environment variable not found!")
-            return
+            return 1
         
-        # Create and run the bot
-        bot = DiscordBot()
-        await bot.start(token)
+        # Cluster mode: this process supervises the workers, which run the bot
+        cluster = BOT_CONFIG['cluster']
+        if cluster['workers'] > 0 and cluster['id'] is None:
+            return await run_cluster(token)
         
+        # Create and run the bot
+        return await run_bot(token)
+    
     except KeyboardInterrupt:
         logger.info("Bot shutdown requested by user")
     except Exception as e:
         logger.error(f"An error occurred: {e}")
+        return 1
     finally:
         logger.info("Bot has been shut down")
 
@@ -44,4 +123,4 @@ if __name__ == "__main__":
         logger.warning("python-dotenv not installed, using system environment variables")
     
     # Run the bot
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
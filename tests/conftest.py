@@ -0,0 +1,19 @@
+import pytest
+
+class FakeClock:
+    """Stands in for the time module inside a module under test"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """Call with a module to replace its `time` with a FakeClock, which is returned"""
+    def install(module):
+        clock = FakeClock()
+        monkeypatch.setattr(module, 'time', clock)
+        return clock
+    return install
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import time
+from utils.broadcast import BroadcastCheckpoint, BroadcastJob
+
+class FakeMember:
+    def __init__(self, member_id, guild):
+        self.id = member_id
+        self.guild = guild
+
+    async def send(self, embed=None):
+        await self.guild.gate.wait()
+        self.guild.received.append(self.id)
+        if len(self.guild.received) == self.guild.stop_after:
+            self.guild.gate.clear()  # Later sends hang until the test stops the job
+
+class FakeGuild:
+    id = 42
+
+    def __init__(self, member_ids, stop_after=None):
+        self.members = {member_id: FakeMember(member_id, self) for member_id in member_ids}
+        self.received = []
+        self.stop_after = stop_after
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+def make_job(guild, member_ids, checkpoint):
+    return BroadcastJob(guild, member_ids, None, 1, checkpoint, workers=3, max_per_second=10_000,
+                        progress_interval=60, checkpoint_every=4)
+
+def test_bitmap_round_trip(tmp_path):
+    checkpoint = BroadcastCheckpoint(str(tmp_path), 42)
+    checkpoint.create({'member_ids': list(range(20))}, 20)
+    checkpoint.write((3, 1, 0, 2, 5), b'\xff\x01', 1)
+
+    meta, counters, bitmap = checkpoint.load()
+    assert meta == {'member_ids': list(range(20))}
+    assert counters == (3, 1, 0, 2, 5)
+    assert bitmap == bytearray(b'\x00\xff\x01')  # 20 members fit in 3 bytes
+
+    assert [saved.guild_id for saved in BroadcastCheckpoint.saved(str(tmp_path))] == [42]
+    checkpoint.delete()
+    assert BroadcastCheckpoint.saved(str(tmp_path)) == []
+
+def test_resumed_job_skips_members_already_handled(tmp_path):
+    member_ids = list(range(1000, 1037))
+    gone = 1005  # Left the server; counted as skipped
+
+    async def scenario():
+        guild = FakeGuild([member_id for member_id in member_ids if member_id != gone], stop_after=10)
+        checkpoint = BroadcastCheckpoint(str(tmp_path), guild.id)
+        checkpoint.create({'member_ids': member_ids}, len(member_ids))
+
+        # First run stops part-way, as on a restart
+        job = make_job(guild, member_ids, checkpoint)
+        job.start(None)
+        while len(guild.received) < 10:
+            await asyncio.sleep(0)
+        await job.stop()
+        first_run = list(guild.received)
+
+        # Second run picks up from the checkpoint written by stop()
+        _, counters, bitmap = checkpoint.load()
+        guild.gate.set()
+        guild.stop_after = None
+        resumed = make_job(guild, member_ids, checkpoint)
+        resumed.restore(counters, bitmap)
+        await resumed.start(None)
+        return first_run, guild.received, resumed, checkpoint
+
+    first_run, received, job, checkpoint = asyncio.run(scenario())
+    assert 0 < len(first_run) < len(member_ids)
+    assert sorted(received) == [member_id for member_id in member_ids if member_id != gone]
+    assert (job.sent, job.skipped, job.processed) == (36, 1, 37)
+    assert not os.path.exists(checkpoint.meta_path)  # Finished jobs delete their checkpoint
+
+def test_stop_during_a_checkpoint_write_keeps_the_newest_header(tmp_path, monkeypatch):
+    member_ids = list(range(2000, 2040))
+    calls = []
+    writes = []
+
+    async def scenario():
+        guild = FakeGuild(member_ids)
+        checkpoint = BroadcastCheckpoint(str(tmp_path), guild.id)
+        checkpoint.create({'member_ids': member_ids}, len(member_ids))
+        write = checkpoint.write
+
+        def slow_write(counters, chunk, offset):
+            # The first write is still in its thread when the job is stopped
+            calls.append(counters)
+            time.sleep(0.2 if len(calls) == 1 else 0)
+            write(counters, chunk, offset)
+            writes.append(counters)
+
+        monkeypatch.setattr(checkpoint, 'write', slow_write)
+        job = make_job(guild, member_ids, checkpoint)
+        job.start(None)
+        while not job.checkpoint_lock.locked():
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.05)
+        await job.stop()
+        return job, checkpoint
+
+    job, checkpoint = asyncio.run(scenario())
+    _, counters, bitmap = checkpoint.load()
+    assert len(writes) == 2 and writes[-1] == counters
+    assert counters[0] == job.sent
+    assert sum(bin(byte).count('1') for byte in bitmap) == job.processed
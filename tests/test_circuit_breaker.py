@@ -0,0 +1,90 @@
+import pytest
+from utils import circuit_breaker
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(circuit_breaker)
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker('api', max_timeout=5.0, failure_threshold=3, reset_timeout=30.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success(0.1)  # Resets the streak
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+    assert breaker.retry_in() == pytest.approx(30.0)
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker('api', max_timeout=5.0, failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure()
+    clock.now += 29
+    assert not breaker.allow()
+
+    clock.now += 1
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # Only one probe at a time
+
+    breaker.record_success(0.2)
+    assert breaker.state == CLOSED
+    assert breaker.allow() and breaker.allow()
+
+def test_failed_probe_doubles_the_wait_up_to_the_limit(clock):
+    breaker = CircuitBreaker('api', max_timeout=5.0, failure_threshold=1, reset_timeout=30.0, max_reset_timeout=100.0)
+    breaker.record_failure()
+    for expected in (60.0, 100.0, 100.0):
+        clock.now += breaker.retry_in()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.retry_in() == pytest.approx(expected)
+
+    # Recovering resets the wait for the next outage
+    clock.now += breaker.retry_in()
+    assert breaker.allow()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.retry_in() == pytest.approx(30.0)
+
+def test_cancelled_probe_frees_the_slot(clock):
+    breaker = CircuitBreaker('api', max_timeout=5.0, failure_threshold=1, reset_timeout=10.0)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_cancelled()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+def test_timeout_follows_p95_latency(clock):
+    breaker = CircuitBreaker('api', max_timeout=10.0, min_timeout=1.0, timeout_multiplier=2.0, min_samples=20)
+    for _ in range(19):
+        breaker.record_success(0.1)
+    assert breaker.timeout() == 10.0  # Too few samples yet
+
+    breaker.record_success(0.1)
+    assert breaker.timeout() == 1.0  # 2 x 0.1s, raised to min_timeout
+
+    for _ in range(20):
+        breaker.record_success(2.0)
+    assert breaker.p95() == 2.0
+    assert breaker.timeout() == 4.0
+
+    for _ in range(20):
+        breaker.record_failure(latency=10.0)  # Timeouts recorded at the timeout value
+    assert breaker.timeout() == 10.0  # Capped at max_timeout
+
+def test_probe_gets_the_full_timeout(clock):
+    breaker = CircuitBreaker('api', max_timeout=10.0, failure_threshold=1, min_samples=1)
+    breaker.record_success(0.1)
+    assert breaker.timeout() == 1.0
+    breaker.record_failure()
+    clock.now += breaker.retry_in()
+    assert breaker.allow()
+    assert breaker.timeout() == 10.0
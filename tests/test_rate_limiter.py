@@ -0,0 +1,62 @@
+import pytest
+from utils import rate_limiter
+from utils.rate_limiter import RateLimiter
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(rate_limiter)
+
+def test_user_bucket_empties_and_refills(clock):
+    limiter = RateLimiter(per_user=5, per_bucket=10.0, global_rate_limit=1000)
+    for _ in range(5):
+        assert limiter.check(1, 'ping') == 0.0
+    assert limiter.check(1, 'ping') == pytest.approx(2.0)  # One token every 2s
+
+    clock.now += 1.0
+    assert limiter.check(1, 'ping') == pytest.approx(1.0)
+    clock.now += 1.0
+    assert limiter.check(1, 'ping') == 0.0
+
+    # Idle time refills up to the bucket size, never beyond it
+    clock.now += 60.0
+    for _ in range(5):
+        assert limiter.check(1, 'ping') == 0.0
+    assert limiter.check(1, 'ping') > 0
+    assert (limiter.allowed, limiter.rejected_user) == (11, 3)
+
+def test_users_and_overridden_commands_have_separate_buckets(clock):
+    limiter = RateLimiter(
+        per_user=2, per_bucket=10.0, global_rate_limit=1000,
+        command_overrides={'weather': {'per_user': 1, 'per_bucket': 30.0}}
+    )
+    assert limiter.check(1, 'ping') == 0.0
+    assert limiter.check(1, 'info') == 0.0  # Shares the default bucket with /ping
+    assert limiter.check(1, 'ping') > 0
+    assert limiter.check(2, 'ping') == 0.0
+
+    assert limiter.check(1, 'weather') == 0.0
+    assert limiter.check(1, 'weather') == pytest.approx(30.0)
+    assert limiter.rejected_commands == {'ping': 1, 'weather': 1}
+
+def test_global_limit_does_not_spend_user_tokens(clock):
+    limiter = RateLimiter(per_user=5, per_bucket=10.0, global_rate_limit=3)
+    for user_id in range(3):
+        assert limiter.check(user_id, 'ping') == 0.0
+    assert limiter.check(3, 'ping') == pytest.approx(20.0)  # 3 per minute
+    assert limiter.rejected_global == 1
+
+    clock.now += 20.0
+    assert limiter.check(3, 'ping') == 0.0
+    assert limiter.buckets[(3, None)][0] == pytest.approx(4.0)
+
+def test_least_recently_active_users_are_evicted(clock):
+    limiter = RateLimiter(per_user=1, per_bucket=60.0, global_rate_limit=1000, max_tracked_users=2)
+    limiter.check(1, 'ping')
+    limiter.check(2, 'ping')
+    limiter.check(1, 'ping')  # User 2 is now the least recently active
+    limiter.check(3, 'ping')
+    assert list(limiter.buckets) == [(1, None), (3, None)]
+    assert limiter.evictions == 1 and len(limiter) == 2
+
+    # An evicted user starts again with a full bucket
+    assert limiter.check(2, 'ping') == 0.0
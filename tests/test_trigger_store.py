@@ -0,0 +1,73 @@
+import asyncio
+from utils.trigger_store import TriggerStore
+from utils.triggers import MODE_SUBSTRING, MODE_WORD
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_changes_survive_reopen(tmp_path):
+    path = str(tmp_path / 'triggers.db')
+
+    async def write():
+        store = TriggerStore(path, flush_interval=60)
+        await store.open()
+        await store.set_trigger(1, 'hello', 'hi!', MODE_WORD)
+        await store.set_trigger(1, 'bye', 'see you', MODE_SUBSTRING)
+        await store.set_trigger(1, 'hello', 'hey!', MODE_WORD)  # Replaces, keeping its position
+        assert await store.remove_trigger(1, 'bye')
+        assert not await store.remove_trigger(1, 'missing')
+        await store.close()  # Flushes the write-behind queue
+
+    async def read():
+        store = TriggerStore(path)
+        await store.open()
+        try:
+            return await store.get_triggers(1), await store.list_triggers(1, 1, 10)
+        finally:
+            await store.close()
+
+    run(write())
+    triggers, (rows, total) = run(read())
+    assert triggers == {'hello': ('hey!', MODE_WORD)}
+    assert rows == [('hello', 'hey!', MODE_WORD)] and total == 1
+
+def test_least_recently_used_guild_is_evicted(tmp_path):
+    async def scenario():
+        store = TriggerStore(str(tmp_path / 'triggers.db'), cache_size=2)
+        await store.open()
+        try:
+            for guild_id in (1, 2):
+                await store.set_trigger(guild_id, 'w', f'guild {guild_id}', MODE_SUBSTRING)
+            await store.get_matcher(1)
+            await store.get_triggers(1)  # Guild 2 is now the least recently used
+            await store.get_triggers(3)
+            assert list(store.cache) == [1, 3]
+            assert 2 not in store.matchers
+
+            # An evicted guild is read back from the database, including unflushed changes
+            assert await store.get_triggers(2) == {'w': ('guild 2', MODE_SUBSTRING)}
+            assert list(store.cache) == [3, 2]
+        finally:
+            await store.close()
+
+    run(scenario())
+
+def test_matcher_is_rebuilt_after_a_change(tmp_path):
+    async def scenario():
+        store = TriggerStore(str(tmp_path / 'triggers.db'))
+        await store.open()
+        try:
+            assert await store.get_matcher(1) is None
+            await store.set_trigger(1, 'ping', 'pong', MODE_SUBSTRING)
+            matcher = await store.get_matcher(1)
+            assert matcher.match('ping?') == 'pong'
+            assert await store.get_matcher(1) is matcher
+
+            await store.set_trigger(1, 'ping', 'PONG', MODE_SUBSTRING)
+            assert (await store.get_matcher(1)).match('ping?') == 'PONG'
+            await store.remove_trigger(1, 'ping')
+            assert await store.get_matcher(1) is None
+        finally:
+            await store.close()
+
+    run(scenario())
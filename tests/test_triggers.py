@@ -0,0 +1,75 @@
+import random
+import pytest
+from utils import triggers
+from utils.triggers import MODE_SUBSTRING, MODE_WORD, TriggerMatcher
+
+def naive_match(trigger_list, text):
+    """The first trigger, in priority order, found at any position of text"""
+    for word, response, mode in trigger_list:
+        if not word:
+            continue
+        for start in range(len(text) - len(word) + 1):
+            end = start + len(word)
+            if text[start:end] != word:
+                continue
+            if mode == MODE_SUBSTRING:
+                return response
+            if (start == 0 or text[start - 1] == ' ') and (end == len(text) or text[end] == ' '):
+                return response
+    return None
+
+@pytest.fixture(params=['automaton', 'linear'])
+def scan_limit(request, monkeypatch):
+    # Exercise both the Aho-Corasick walk and the small-set linear scan
+    monkeypatch.setattr(triggers, 'LINEAR_SCAN_LIMIT', 0 if request.param == 'automaton' else 10**6)
+
+def test_substring_and_word_modes(scan_limit):
+    matcher = TriggerMatcher([
+        ('cat', 'meow', MODE_WORD),
+        ('dog', 'woof', MODE_SUBSTRING),
+    ])
+    assert matcher.match("my cat sleeps") == 'meow'
+    assert matcher.match("concatenate") is None
+    assert matcher.match("hotdogs") == 'woof'
+    assert matcher.match("cat") == 'meow'
+    assert matcher.match("") is None
+
+def test_earlier_trigger_wins(scan_limit):
+    matcher = TriggerMatcher([
+        ('world', 'first', MODE_SUBSTRING),
+        ('hello', 'second', MODE_SUBSTRING),
+    ])
+    assert matcher.match("hello world") == 'first'
+
+def test_overlapping_patterns(scan_limit):
+    matcher = TriggerMatcher([
+        ('she', 'she', MODE_SUBSTRING),
+        ('he', 'he', MODE_SUBSTRING),
+        ('hers', 'hers', MODE_SUBSTRING),
+    ])
+    assert matcher.match("ushers") == 'she'
+    assert matcher.match("hers") == 'he'
+    assert matcher.match("xhx") is None
+
+def test_word_trigger_found_after_failed_occurrence(scan_limit):
+    matcher = TriggerMatcher([('hi', 'hello!', MODE_WORD)])
+    assert matcher.match("this hi") == 'hello!'
+    assert matcher.match("this chi") is None
+
+def test_empty_trigger_is_ignored(scan_limit):
+    matcher = TriggerMatcher([('', 'never', MODE_SUBSTRING), ('a', 'a', MODE_SUBSTRING)])
+    assert matcher.match("a") == 'a'
+    assert len(matcher) == 2
+
+def test_matches_naive_reference(scan_limit):
+    rng = random.Random(1234)
+    alphabet = 'ab c'
+    for _ in range(300):
+        trigger_list = []
+        for index in range(rng.randint(1, 12)):
+            word = ''.join(rng.choice('abc') for _ in range(rng.randint(1, 4)))
+            trigger_list.append((word, index, rng.choice((MODE_SUBSTRING, MODE_WORD))))
+        matcher = TriggerMatcher(trigger_list)
+        for _ in range(20):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+            assert matcher.match(text) == naive_match(trigger_list, text), (trigger_list, text)
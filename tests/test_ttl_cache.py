@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from utils import ttl_cache
+from utils.ttl_cache import TTLCache
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(ttl_cache)
+
+def counting_fetch(calls, value):
+    async def fetch():
+        calls.append(value)
+        await asyncio.sleep(0)
+        return value
+    return fetch
+
+def test_fresh_stale_and_expired(clock):
+    async def scenario():
+        cache = TTLCache(ttl=10, max_size=10, stale_ttl=5)
+        calls = []
+        assert await cache.get('k', counting_fetch(calls, 1)) == 1
+
+        clock.now += 9
+        assert await cache.get('k', counting_fetch(calls, 2)) == 1  # Fresh: no fetch
+        assert calls == [1]
+
+        clock.now += 3
+        assert await cache.get('k', counting_fetch(calls, 2)) == 1  # Stale: served, refreshed behind
+        await asyncio.sleep(0.01)
+        assert calls == [1, 2]
+        assert await cache.get('k', counting_fetch(calls, 3)) == 2
+
+        clock.now += 20
+        assert await cache.get('k', counting_fetch(calls, 3)) == 3  # Expired: fetched before returning
+        assert (cache.hits, cache.stale_hits, cache.misses, cache.refreshes) == (2, 1, 2, 1)
+
+    asyncio.run(scenario())
+
+def test_concurrent_misses_share_one_fetch(clock):
+    async def scenario():
+        cache = TTLCache(ttl=10, max_size=10)
+        calls = []
+        results = await asyncio.gather(*(cache.get('k', counting_fetch(calls, 'v')) for _ in range(5)))
+        assert results == ['v'] * 5
+        assert calls == ['v']
+        assert cache.coalesced == 4
+
+    asyncio.run(scenario())
+
+def test_failures_are_not_cached(clock):
+    async def scenario():
+        cache = TTLCache(ttl=10, max_size=10)
+
+        async def fail():
+            raise RuntimeError("upstream down")
+
+        with pytest.raises(RuntimeError):
+            await cache.get('k', fail)
+        assert len(cache) == 0 and cache.errors == 1
+        assert await cache.get('k', counting_fetch([], 'ok')) == 'ok'
+
+    asyncio.run(scenario())
+
+def test_cancelled_caller_does_not_cancel_the_fetch(clock):
+    async def scenario():
+        cache = TTLCache(ttl=10, max_size=10)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return 'v'
+
+        first = asyncio.create_task(cache.get('k', slow))
+        second = asyncio.create_task(cache.get('k', slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        assert await second == 'v'
+        assert cache.entries['k'][0] == 'v'
+
+    asyncio.run(scenario())
+
+def test_least_recently_used_entry_is_evicted(clock):
+    async def scenario():
+        cache = TTLCache(ttl=10, max_size=2)
+        for key in ('a', 'b'):
+            await cache.get(key, counting_fetch([], key))
+        await cache.get('a', counting_fetch([], 'unused'))  # 'b' is now the least recently used
+        await cache.get('c', counting_fetch([], 'c'))
+        assert list(cache.entries) == ['a', 'c']
+        assert cache.evictions == 1
+
+    asyncio.run(scenario())
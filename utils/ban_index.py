@@ -0,0 +1,98 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BanIndex:
+    """Per-guild set of banned user IDs for /unban
+
+    A guild's ban list is fetched once, the first time it is needed, and is
+    then kept current from ban/unban events. Events that arrive while the
+    list is still being paged in are replayed once it finishes, so a ban
+    that lands on an already-fetched page is not lost.
+    """
+
+    def __init__(self):
+        self.guilds = {}  # guild_id -> {user_id: display name}
+        self.loading = {}  # guild_id -> load task
+        self.pending = {}  # guild_id -> events received while loading
+
+    def is_loaded(self, guild_id):
+        return guild_id in self.guilds
+
+    def is_banned(self, guild_id, user_id):
+        """Return True/False, or None if the guild's bans have not been loaded yet"""
+        bans = self.guilds.get(guild_id)
+        if bans is None:
+            return None
+        return user_id in bans
+
+    def load(self, guild):
+        """Start loading a guild's bans in the background; returns the (shared) task"""
+        task = self.loading.get(guild.id)
+        if task is None and guild.id not in self.guilds:
+            self.pending[guild.id] = []
+            task = asyncio.create_task(self._load(guild))
+            self.loading[guild.id] = task
+        return task
+
+    async def _load(self, guild):
+        bans = {}
+        try:
+            async for ban in guild.bans(limit=None):
+                bans[ban.user.id] = str(ban.user)
+        except Exception as e:
+            logger.warning(f"Could not load bans for guild {guild.id}: {e}")
+            self.pending.pop(guild.id, None)
+            return
+        finally:
+            self.loading.pop(guild.id, None)
+
+        for user_id, name in self.pending.pop(guild.id, ()):
+            if name is None:
+                bans.pop(user_id, None)
+            else:
+                bans[user_id] = name
+        self.guilds[guild.id] = bans
+        logger.info(f"Indexed {len(bans)} bans for guild {guild.id}")
+
+    def banned(self, guild_id, user):
+        bans = self.guilds.get(guild_id)
+        if bans is not None:
+            bans[user.id] = str(user)
+        elif guild_id in self.pending:
+            self.pending[guild_id].append((user.id, str(user)))
+
+    def unbanned(self, guild_id, user_id):
+        bans = self.guilds.get(guild_id)
+        if bans is not None:
+            bans.pop(user_id, None)
+        elif guild_id in self.pending:
+            self.pending[guild_id].append((user_id, None))
+
+    def discard(self, guild_id):
+        """Forget a guild (for example when the bot leaves it)"""
+        self.guilds.pop(guild_id, None)
+        self.pending.pop(guild_id, None)
+        task = self.loading.pop(guild_id, None)
+        if task is not None:
+            task.cancel()
+
+    def search(self, guild_id, query, limit=25):
+        """Return up to limit (user_id, name) pairs whose ID or name matches query"""
+        bans = self.guilds.get(guild_id)
+        if not bans:
+            return []
+        query = query.strip().lower()
+        matches = []
+        for user_id, name in bans.items():
+            if not query or str(user_id).startswith(query) or query in name.lower():
+                matches.append((user_id, name))
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    def close(self):
+        for task in list(self.loading.values()):
+            task.cancel()
+        self.loading.clear()
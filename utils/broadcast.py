@@ -0,0 +1,333 @@
+import asyncio
+import json
+import logging
+import os
+import struct
+import time
+import discord
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class BroadcastCheckpoint:
+    """On-disk state for one guild's broadcast so it can resume after a restart
+
+    Job details and the member list are written once to <guild_id>.json.
+    Delivery state lives in <guild_id>.bitmap: a fixed-size header of
+    counters followed by one bit per member. A checkpoint rewrites the header
+    and only the bitmap bytes touched since the previous checkpoint, so its
+    cost depends on the batch size rather than the size of the guild.
+    """
+
+    HEADER = struct.Struct('<5Q')  # sent, forbidden, errors, skipped, rate_limited
+
+    def __init__(self, directory, guild_id):
+        self.guild_id = guild_id
+        self.meta_path = os.path.join(directory, f"{guild_id}.json")
+        self.bitmap_path = os.path.join(directory, f"{guild_id}.bitmap")
+
+    @classmethod
+    def saved(cls, directory):
+        """Return checkpoints for every broadcast saved in directory"""
+        if not os.path.isdir(directory):
+            return []
+        return [
+            cls(directory, int(name[:-len('.json')]))
+            for name in os.listdir(directory)
+            if name.endswith('.json') and name[:-len('.json')].isdigit()
+        ]
+
+    def create(self, meta, total):
+        """Write job details and an empty delivery bitmap"""
+        os.makedirs(os.path.dirname(self.meta_path) or '.', exist_ok=True)
+        with open(self.bitmap_path, 'wb') as f:
+            f.write(self.HEADER.pack(0, 0, 0, 0, 0))
+            f.write(bytes((total + 7) // 8))
+
+        # Write the details last and atomically; a job only exists once they are on disk
+        temp_path = self.meta_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(temp_path, self.meta_path)
+
+    def load(self):
+        """Return (meta, counters, bitmap)"""
+        with open(self.meta_path, 'r') as f:
+            meta = json.load(f)
+        with open(self.bitmap_path, 'rb') as f:
+            counters = self.HEADER.unpack(f.read(self.HEADER.size))
+            bitmap = bytearray(f.read())
+        return meta, counters, bitmap
+
+    def write(self, counters, chunk, offset):
+        """Write the counters and the bitmap bytes starting at offset"""
+        with open(self.bitmap_path, 'r+b') as f:
+            f.write(self.HEADER.pack(*counters))
+            f.seek(self.HEADER.size + offset)
+            f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def delete(self):
+        for path in (self.meta_path, self.bitmap_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+class BroadcastJob:
+    """Mass DM that runs in the background with a bounded pool of senders
+
+    discord.py already queues requests behind Discord's per-route and global
+    rate limit buckets; on top of that the job paces sends to max_per_second
+    and, whenever Discord answers 429, pauses every worker for the advertised
+    retry_after instead of letting them pile more requests onto the bucket.
+    Progress is shown by editing a regular bot message, so it keeps working
+    after the slash command's interaction token has expired.
+
+    Every member handled is marked in a delivery bitmap that is checkpointed
+    every checkpoint_every members; a job stopped by a shutdown resumes from
+    its last checkpoint and skips everyone already marked.
+    """
+
+    def __init__(self, guild, member_ids, embed, author_id, checkpoint, workers=5, max_per_second=10.0,
+                 progress_interval=10.0, checkpoint_every=25):
+        self.guild = guild
+        self.member_ids = member_ids
+        self.embed = embed
+        self.author_id = author_id
+        self.checkpoint = checkpoint
+        self.workers = workers
+        self.send_interval = 1.0 / max_per_second
+        self.progress_interval = progress_interval
+        self.checkpoint_every = checkpoint_every
+
+        self.progress_message = None
+        self.task = None
+        self.cancelled = False
+
+        # Next member to hand to a worker
+        self.cursor = 0
+
+        # One bit per member, set once that member has been handled
+        self.delivered = bytearray((len(member_ids) + 7) // 8)
+        self.dirty_start = None
+        self.dirty_end = None
+        self.since_checkpoint = 0
+        self.checkpoint_lock = asyncio.Lock()
+
+        # Delivery counters
+        self.sent = 0
+        self.forbidden = 0
+        self.errors = 0
+        self.skipped = 0
+        self.rate_limited = 0
+
+        self.started_at = None
+        self.finished_at = None
+        self.baseline = 0  # Members already handled when this run started
+
+        # Pacing state shared by all workers
+        self.next_send_at = 0.0
+        self.paused_until = 0.0
+        self.pace_lock = asyncio.Lock()
+
+    def restore(self, counters, bitmap):
+        """Continue from a saved checkpoint"""
+        self.sent, self.forbidden, self.errors, self.skipped, self.rate_limited = counters
+        self.delivered[:len(bitmap)] = bitmap
+
+    @property
+    def total(self):
+        return len(self.member_ids)
+
+    @property
+    def processed(self):
+        return self.sent + self.forbidden + self.errors + self.skipped
+
+    @property
+    def done(self):
+        return self.task is not None and self.task.done()
+
+    def throughput(self):
+        """Return DMs processed per second since the job (re)started"""
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return (self.processed - self.baseline) / elapsed if elapsed > 0 else 0.0
+
+    def start(self, progress_message):
+        """Start sending in the background, reporting progress on progress_message"""
+        self.progress_message = progress_message
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    async def cancel(self):
+        """Stop the job for good and discard its checkpoint"""
+        self.cancelled = True
+        await self.stop()
+
+    async def stop(self):
+        """Stop the job, keeping its checkpoint unless it was cancelled"""
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self):
+        self.started_at = time.monotonic()
+        self.baseline = self.processed
+        reporter = asyncio.create_task(self._report_progress())
+        try:
+            await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+        finally:
+            self.finished_at = time.monotonic()
+            reporter.cancel()
+            logger.info(
+                f"Broadcast in guild {self.guild.id} stopped: {self.sent} sent, "
+                f"{self.forbidden} forbidden, {self.errors} errors, {self.skipped} skipped "
+                f"({self.throughput():.1f} DMs/s)"
+            )
+
+            if self.cancelled or self.processed >= self.total:
+                await asyncio.to_thread(self.checkpoint.delete)
+            else:
+                await self._save_checkpoint()
+            await self._update_progress()
+
+    async def _worker(self):
+        while self.cursor < self.total:
+            index = self.cursor
+            self.cursor += 1
+            if self.delivered[index >> 3] & (1 << (index & 7)):
+                continue  # Handled before the last restart
+            await self._deliver(self.member_ids[index])
+            self._mark(index)
+            if self.since_checkpoint >= self.checkpoint_every:
+                await self._save_checkpoint()
+
+    def _mark(self, index):
+        byte = index >> 3
+        self.delivered[byte] |= 1 << (index & 7)
+        self.dirty_start = byte if self.dirty_start is None else min(self.dirty_start, byte)
+        self.dirty_end = byte + 1 if self.dirty_end is None else max(self.dirty_end, byte + 1)
+        self.since_checkpoint += 1
+
+    async def _save_checkpoint(self):
+        """Write counters and the bitmap bytes changed since the last checkpoint"""
+        async with self.checkpoint_lock:
+            if self.dirty_start is None:
+                return
+            start, end = self.dirty_start, self.dirty_end
+            chunk = bytes(self.delivered[start:end])
+            counters = (self.sent, self.forbidden, self.errors, self.skipped, self.rate_limited)
+            self.dirty_start = self.dirty_end = None
+            self.since_checkpoint = 0
+            write = asyncio.ensure_future(asyncio.to_thread(self.checkpoint.write, counters, chunk, start))
+            try:
+                try:
+                    await asyncio.shield(write)
+                except asyncio.CancelledError:
+                    # The thread keeps writing; hold the lock until it is done so a
+                    # newer checkpoint cannot be overwritten by this older header
+                    await write
+                    raise
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to checkpoint broadcast in guild {self.guild.id}: {e}")
+                # Write these bytes again with the next checkpoint
+                self.dirty_start = start if self.dirty_start is None else min(self.dirty_start, start)
+                self.dirty_end = end if self.dirty_end is None else max(self.dirty_end, end)
+
+    async def _pace(self):
+        """Wait for this worker's send slot, honouring any 429 pause"""
+        async with self.pace_lock:
+            now = time.monotonic()
+            start_at = max(now, self.next_send_at, self.paused_until)
+            self.next_send_at = start_at + self.send_interval
+        delay = start_at - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _deliver(self, member_id):
+        member = self.guild.get_member(member_id)
+        if member is None:
+            self.skipped += 1  # Left the server since the job started
+            return
+
+        while True:
+            await self._pace()
+            try:
+                await member.send(embed=self.embed)
+                self.sent += 1
+                return
+            except discord.Forbidden:
+                self.forbidden += 1  # DMs disabled or bot blocked
+                return
+            except discord.RateLimited as e:
+                self._back_off(e.retry_after)
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    self.errors += 1
+                    return
+                self._back_off(self._retry_after(e))
+            except Exception as e:
+                logger.error(f"Broadcast DM to {member_id} failed: {e}")
+                self.errors += 1
+                return
+
+    def _retry_after(self, error):
+        try:
+            return float(error.response.headers.get('Retry-After', 1.0))
+        except (AttributeError, TypeError, ValueError):
+            return 1.0
+
+    def _back_off(self, retry_after):
+        """Pause every worker until Discord's rate limit has reset"""
+        self.rate_limited += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        logger.warning(f"Broadcast in guild {self.guild.id} rate limited, pausing {retry_after:.1f}s")
+
+    async def _report_progress(self):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            await self._update_progress()
+
+    async def _update_progress(self):
+        if self.progress_message is None:
+            return
+        try:
+            await self.progress_message.edit(embed=self.progress_embed())
+        except discord.HTTPException as e:
+            logger.warning(f"Could not update broadcast progress: {e}")
+
+    def progress_embed(self):
+        """Build the embed shown on the progress message"""
+        finished = self.finished_at is not None
+        if not finished:
+            title = "📤 Mass DM In Progress"
+            color = discord.Color.blue()
+        elif self.cancelled:
+            title = "⏹️ Mass DM Cancelled"
+            color = discord.Color.orange()
+        elif self.processed < self.total:
+            title = "⏸️ Mass DM Paused - will resume after restart"
+            color = discord.Color.orange()
+        else:
+            title = "📤 Mass DM Results"
+            color = discord.Color.green() if self.forbidden + self.errors == 0 else discord.Color.yellow()
+
+        embed = discord.Embed(title=title, color=color, timestamp=datetime.now())
+        embed.add_field(name="📈 Progress", value=f"{self.processed:,}/{self.total:,}", inline=True)
+        embed.add_field(name="⚡ Throughput", value=f"{self.throughput():.1f} DMs/s", inline=True)
+        embed.add_field(name="✅ Successful", value=f"{self.sent:,}", inline=True)
+        embed.add_field(name="🚫 DMs Closed", value=f"{self.forbidden:,}", inline=True)
+        embed.add_field(name="❌ Errors", value=f"{self.errors:,}", inline=True)
+        embed.add_field(name="👋 Left Server", value=f"{self.skipped:,}", inline=True)
+        if self.rate_limited:
+            embed.add_field(name="⏳ Rate Limited", value=f"{self.rate_limited:,} times", inline=True)
+        embed.add_field(name="Sent by", value=f"<@{self.author_id}>", inline=True)
+        return embed
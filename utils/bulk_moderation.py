@@ -0,0 +1,339 @@
+import asyncio
+import io
+import logging
+import re
+import time
+from datetime import datetime
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Discord's bulk ban endpoint accepts at most this many users per request
+BULK_BAN_LIMIT = 200
+
+# Raw IDs or mentions (<@123>, <@!123>) in pasted text or an uploaded file
+USER_ID_PATTERN = re.compile(r'\d{15,20}')
+
+ACTIONS = {
+    'kick': {'emoji': '👢', 'name': 'Kick', 'done': 'Kicked'},
+    'ban': {'emoji': '🔨', 'name': 'Ban', 'done': 'Banned'},
+    'timeout': {'emoji': '⏰', 'name': 'Timeout', 'done': 'Timed out'}
+}
+
+def parse_user_ids(text):
+    """Return the unique user IDs found in text, in the order given"""
+    return list(dict.fromkeys(int(match) for match in USER_ID_PATTERN.findall(text)))
+
+def check_targets(guild, moderator, action, user_ids):
+    """Apply the single-member command checks to a whole batch up front
+
+    Returns (allowed user IDs, {user_id: reason} for the rest). Users who are
+    not in the server can still be banned by ID, so they pass for bans.
+    """
+    me = guild.me
+    moderator_is_owner = moderator.id == guild.owner_id
+    allowed = []
+    rejected = {}
+
+    for user_id in user_ids:
+        member = guild.get_member(user_id)
+        if user_id == guild.owner_id:
+            rejected[user_id] = "Server owner"
+        elif user_id in (moderator.id, me.id):
+            rejected[user_id] = "Cannot target yourself or the bot"
+        elif member is None:
+            if action == 'ban':
+                allowed.append(user_id)
+            else:
+                rejected[user_id] = "Not a member"
+        elif member.top_role >= moderator.top_role and not moderator_is_owner:
+            rejected[user_id] = "Higher or equal role than you"
+        elif member.top_role >= me.top_role:
+            rejected[user_id] = "Higher or equal role than me"
+        elif action == 'timeout' and member.guild_permissions.administrator:
+            rejected[user_id] = "Administrators cannot be timed out"
+        else:
+            allowed.append(user_id)
+
+    return allowed, rejected
+
+class BulkModerationJob:
+    """Kick, ban or time out a list of users with a bounded pool of workers
+
+    Requests are paced to max_per_second on top of discord.py's own rate limit
+    handling, and a 429 pauses every worker for the advertised retry_after.
+    Bans go through Discord's bulk ban endpoint (200 users per request) and
+    fall back to one request per user if the bot lacks Manage Server.
+    Progress is shown by editing a single message.
+    """
+
+    def __init__(self, guild, action, user_ids, moderator, reason, rejected=None, workers=4,
+                 max_per_second=5.0, progress_interval=3.0, delete_days=0, until=None):
+        self.guild = guild
+        self.action = action
+        self.user_ids = user_ids
+        self.moderator = moderator
+        self.reason = reason
+        self.workers = workers
+        self.send_interval = 1.0 / max_per_second
+        self.progress_interval = progress_interval
+        self.delete_days = delete_days
+        self.until = until
+
+        self.audit_reason = f"Bulk {ACTIONS[action]['name'].lower()} by {moderator} - {reason}"
+        self.use_bulk_ban = action == 'ban'
+
+        # user_id -> (succeeded, detail); checks that failed up front count as skipped
+        self.results = {}
+        self.rejected = dict(rejected or {})
+        self.succeeded = 0
+        self.failed = 0
+        self.rate_limited = 0
+
+        # Work units: chunks for bulk bans, single users otherwise
+        size = BULK_BAN_LIMIT if self.use_bulk_ban else 1
+        self.batches = [user_ids[i:i + size] for i in range(0, len(user_ids), size)]
+        self.cursor = 0
+        # Workers splitting a chunk into single users; idle workers wait for them
+        self.splitting = 0
+        self.work_added = asyncio.Condition()
+
+        self.progress_message = None
+        self.task = None
+        self.started_at = None
+        self.finished_at = None
+
+        # Pacing state shared by all workers
+        self.next_send_at = 0.0
+        self.paused_until = 0.0
+        self.pace_lock = asyncio.Lock()
+
+    @property
+    def total(self):
+        return len(self.user_ids)
+
+    @property
+    def processed(self):
+        return self.succeeded + self.failed
+
+    @property
+    def done(self):
+        return self.task is not None and self.task.done()
+
+    def throughput(self):
+        """Return users processed per second"""
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def start(self, progress_message):
+        self.progress_message = progress_message
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    async def stop(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self):
+        self.started_at = time.monotonic()
+        reporter = asyncio.create_task(self._report_progress())
+        try:
+            # Sized by users, not chunks: a bulk ban chunk may fall back to one request per user
+            await asyncio.gather(*(self._worker() for _ in range(min(self.workers, len(self.user_ids)))))
+        finally:
+            self.finished_at = time.monotonic()
+            reporter.cancel()
+            logger.info(
+                f"Bulk {self.action} in guild {self.guild.id} by {self.moderator.id}: "
+                f"{self.succeeded} succeeded, {self.failed} failed, {len(self.rejected)} skipped "
+                f"({self.throughput():.1f} users/s)"
+            )
+            await self._update_progress(final=True)
+
+    async def _worker(self):
+        while True:
+            if self.cursor >= len(self.batches):
+                if not self.splitting:
+                    return
+                async with self.work_added:
+                    await self.work_added.wait_for(lambda: self.cursor < len(self.batches) or not self.splitting)
+                continue
+
+            batch = self.batches[self.cursor]
+            self.cursor += 1
+            if len(batch) > 1:
+                self.splitting += 1
+                try:
+                    if self.use_bulk_ban:
+                        batch = await self._bulk_ban(batch)
+                    # Whatever bulk banning could not handle is shared out one user at a time
+                    self.batches.extend([user_id] for user_id in batch)
+                finally:
+                    self.splitting -= 1
+                    async with self.work_added:
+                        self.work_added.notify_all()
+                continue
+            await self._act(batch[0])
+
+    def _record(self, user_id, succeeded, detail):
+        self.results[user_id] = (succeeded, detail)
+        if succeeded:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    async def _bulk_ban(self, batch):
+        """Ban a chunk in one request; returns the IDs still to ban one by one"""
+        try:
+            result = await self._request(
+                self.guild.bulk_ban,
+                [discord.Object(id=user_id) for user_id in batch],
+                reason=self.audit_reason,
+                delete_message_seconds=self.delete_days * 86400
+            )
+        except discord.Forbidden:
+            # Bulk bans also need Manage Server; ban individually instead
+            self.use_bulk_ban = False
+            return batch
+        except discord.HTTPException as e:
+            for user_id in batch:
+                self._record(user_id, False, f"Error {e.status}")
+            return []
+
+        for user in result.banned:
+            self._record(user.id, True, ACTIONS['ban']['done'])
+        for user in result.failed:
+            self._record(user.id, False, "Ban failed")
+        return []
+
+    async def _act(self, user_id):
+        target = discord.Object(id=user_id)
+        try:
+            if self.action == 'kick':
+                await self._request(self.guild.kick, target, reason=self.audit_reason)
+            elif self.action == 'ban':
+                await self._request(
+                    self.guild.ban, target,
+                    reason=self.audit_reason,
+                    delete_message_seconds=self.delete_days * 86400
+                )
+            else:
+                member = self.guild.get_member(user_id)
+                if member is None:
+                    self._record(user_id, False, "Left the server")
+                    return
+                await self._request(member.timeout, self.until, reason=self.audit_reason)
+        except discord.NotFound:
+            self._record(user_id, False, "Left the server" if self.action != 'ban' else "Unknown user")
+        except discord.Forbidden:
+            self._record(user_id, False, "Missing permissions")
+        except discord.HTTPException as e:
+            self._record(user_id, False, f"Error {e.status}")
+        except Exception as e:
+            logger.error(f"Bulk {self.action} of {user_id} failed: {e}")
+            self._record(user_id, False, "Error")
+        else:
+            self._record(user_id, True, ACTIONS[self.action]['done'])
+
+    async def _request(self, func, *args, **kwargs):
+        """Call a Discord API method within the job's pacing, retrying on 429"""
+        while True:
+            await self._pace()
+            try:
+                return await func(*args, **kwargs)
+            except discord.RateLimited as e:
+                self._back_off(e.retry_after)
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    raise
+                self._back_off(self._retry_after(e))
+
+    async def _pace(self):
+        """Wait for this worker's request slot, honouring any 429 pause"""
+        async with self.pace_lock:
+            now = time.monotonic()
+            start_at = max(now, self.next_send_at, self.paused_until)
+            self.next_send_at = start_at + self.send_interval
+        delay = start_at - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _retry_after(self, error):
+        try:
+            return float(error.response.headers.get('Retry-After', 1.0))
+        except (AttributeError, TypeError, ValueError):
+            return 1.0
+
+    def _back_off(self, retry_after):
+        """Pause every worker until Discord's rate limit has reset"""
+        self.rate_limited += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        logger.warning(f"Bulk {self.action} in guild {self.guild.id} rate limited, pausing {retry_after:.1f}s")
+
+    async def _report_progress(self):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            await self._update_progress()
+
+    async def _update_progress(self, final=False):
+        if self.progress_message is None:
+            return
+        kwargs = {'embed': self.progress_embed()}
+        if final and (self.results or self.rejected):
+            kwargs['attachments'] = [discord.File(io.BytesIO(self.summary().encode('utf-8')), filename='results.txt')]
+        try:
+            await self.progress_message.edit(**kwargs)
+        except discord.HTTPException as e:
+            logger.warning(f"Could not update bulk {self.action} progress: {e}")
+
+    def summary(self):
+        """One line per user ID with what happened to it"""
+        lines = [f"{user_id}: {'OK' if succeeded else 'FAILED'} - {detail}" for user_id, (succeeded, detail) in self.results.items()]
+        lines.extend(f"{user_id}: SKIPPED - {reason}" for user_id, reason in self.rejected.items())
+        return "\n".join(lines) + "\n"
+
+    def progress_embed(self):
+        """Build the embed shown on the progress message"""
+        info = ACTIONS[self.action]
+        finished = self.finished_at is not None
+        if not finished:
+            title = f"{info['emoji']} Bulk {info['name']} In Progress"
+            color = discord.Color.blue()
+        elif self.processed < self.total:
+            title = f"⏹️ Bulk {info['name']} Stopped"
+            color = discord.Color.orange()
+        else:
+            title = f"{info['emoji']} Bulk {info['name']} Results"
+            color = discord.Color.green() if self.failed == 0 else discord.Color.yellow()
+
+        embed = discord.Embed(title=title, color=color, timestamp=datetime.now())
+        embed.add_field(name="📈 Progress", value=f"{self.processed:,}/{self.total:,}", inline=True)
+        embed.add_field(name="⚡ Throughput", value=f"{self.throughput():.1f} users/s", inline=True)
+        embed.add_field(name=f"✅ {info['done']}", value=f"{self.succeeded:,}", inline=True)
+        embed.add_field(name="❌ Failed", value=f"{self.failed:,}", inline=True)
+        embed.add_field(name="⏭️ Skipped", value=f"{len(self.rejected):,}", inline=True)
+        if self.rate_limited:
+            embed.add_field(name="⏳ Rate Limited", value=f"{self.rate_limited:,} times", inline=True)
+        embed.add_field(name="Reason", value=self.reason[:1024], inline=False)
+
+        if finished:
+            # Failures and skips are what a moderator needs to follow up on; the full list is attached
+            problems = [f"`{user_id}` {detail}" for user_id, (succeeded, detail) in self.results.items() if not succeeded]
+            problems.extend(f"`{user_id}` {reason}" for user_id, reason in self.rejected.items())
+            if problems:
+                value = ""
+                for index, line in enumerate(problems):
+                    if len(value) + len(line) + 40 > 1024:
+                        value += f"...and {len(problems) - index} more (see results.txt)"
+                        break
+                    value += line + "\n"
+                embed.add_field(name="⚠️ Not Actioned", value=value, inline=False)
+
+        embed.set_footer(text=f"Moderator: {self.moderator}")
+        return embed
@@ -0,0 +1,126 @@
+import math
+import time
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"{name} is unavailable (retrying in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """Failure tracking and adaptive timeout for one external endpoint
+
+    After `failure_threshold` consecutive failures the breaker opens and calls
+    fail fast. Once `reset_timeout` has passed, a single half-open probe is let
+    through: success closes the breaker, failure reopens it with the wait
+    doubled (up to `max_reset_timeout`).
+
+    The timeout follows observed latency: `timeout_multiplier` times the p95 of
+    recent requests, kept between `min_timeout` and the configured
+    `max_timeout`. Requests that time out are recorded at the timeout value,
+    so the timeout grows again when an endpoint slows down.
+    """
+
+    def __init__(self, name, max_timeout, failure_threshold=5, reset_timeout=30.0, max_reset_timeout=300.0,
+                 min_timeout=1.0, timeout_multiplier=2.0, latency_samples=100, min_samples=20):
+        self.name = name
+        self.max_timeout = max_timeout
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.min_timeout = min(min_timeout, max_timeout)
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.reset_timeout = reset_timeout
+        self.retry_at = 0.0
+        self.probe_in_flight = False
+        self.latencies = deque(maxlen=latency_samples)
+
+        # Counters
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+
+    def allow(self):
+        """Return True if a request may be sent now"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() >= self.retry_at:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def retry_in(self):
+        return max(0.0, self.retry_at - time.monotonic())
+
+    def p95(self):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(len(ordered) * 0.95) - 1)]
+
+    def timeout(self):
+        """Timeout for the next request, in seconds"""
+        # Probes get the full timeout so a slow but working endpoint can recover
+        if self.state != CLOSED or len(self.latencies) < self.min_samples:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, self.p95() * self.timeout_multiplier))
+
+    def record_success(self, latency):
+        self.successes += 1
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self.probe_in_flight = False
+            self.reset_timeout = self.base_reset_timeout
+
+    def record_failure(self, latency=None):
+        self.failures += 1
+        self.consecutive_failures += 1
+        if latency is not None:
+            self.latencies.append(latency)
+
+        if self.state == HALF_OPEN:
+            self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            self._open()
+        elif self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def record_cancelled(self):
+        # A cancelled probe proves nothing; let the next request probe instead
+        self.probe_in_flight = False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened += 1
+        self.probe_in_flight = False
+        self.retry_at = time.monotonic() + self.reset_timeout
+
+    def stats(self):
+        p95 = self.p95()
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'retry_in': self.retry_in() if self.state == OPEN else 0.0,
+            'timeout': self.timeout(),
+            'p95': p95,
+            'successes': self.successes,
+            'failures': self.failures,
+            'rejected': self.rejected,
+            'opened': self.opened
+        }
@@ -0,0 +1,295 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from utils.sharding import IdentifyLimiter
+
+logger = logging.getLogger(__name__)
+
+# Worker exit code for errors a restart cannot fix (bad token, missing intents)
+EXIT_FATAL = 2
+
+def split_shards(shard_count, workers):
+    """Split shard IDs 0..shard_count-1 into `workers` contiguous, near-equal ranges"""
+    workers = max(1, min(workers, shard_count))
+    size, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for index in range(workers):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+def cluster_path(path, cluster_id):
+    """Give a cluster worker its own copy of a state file or directory ('reminders.db' -> 'reminders.cluster1.db')"""
+    if cluster_id is None or path is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.cluster{cluster_id}{ext}"
+
+def describe_shards(shard_ids):
+    if not shard_ids:
+        return "none"
+    if len(shard_ids) == 1:
+        return str(shard_ids[0])
+    return f"{shard_ids[0]}-{shard_ids[-1]}"
+
+def send(writer, message):
+    writer.write(json.dumps(message).encode() + b'\n')
+
+async def open_ipc(address):
+    """Connect to 'unix:/path' or 'tcp:host:port'"""
+    kind, _, target = address.partition(':')
+    if kind == 'unix':
+        return await asyncio.open_unix_connection(target)
+    host, _, port = target.rpartition(':')
+    return await asyncio.open_connection(host, int(port))
+
+class Worker:
+    """One bot process of the cluster and the shards it runs"""
+
+    def __init__(self, cluster_id, shard_ids):
+        self.id = cluster_id
+        self.shard_ids = shard_ids
+        self.process = None
+        self.writer = None  # IPC connection, once the worker has said hello
+        self.starts = 0
+        self.guilds = 0
+        self.users = 0
+
+    def summary(self):
+        return {
+            'id': self.id,
+            'shards': describe_shards(self.shard_ids),
+            'guilds': self.guilds,
+            'users': self.users,
+            'up': self.writer is not None
+        }
+
+class ClusterSupervisor:
+    """Runs the bot as several worker processes, each owning a range of shards
+
+    Workers are started with SHARD_COUNT/SHARD_IDS for their range and
+    CLUSTER_ID/CLUSTER_IPC pointing back at this supervisor. Over the IPC
+    socket (newline-delimited JSON) each worker reports its guild and user
+    counts, which are broadcast to every worker so the presence text and
+    /info can show fleet totals; workers also ask permission before each
+    shard IDENTIFY so the session start limit is shared across processes.
+    A worker that exits is restarted, with a delay that doubles while it
+    keeps crashing.
+    """
+
+    def __init__(self, command, shard_count, workers, max_concurrency=1, ipc_path='cluster.sock',
+                 restart_delay=5.0, max_restart_delay=300.0, stable_after=60.0):
+        self.command = command
+        self.shard_count = shard_count
+        self.workers = [Worker(index, shard_ids) for index, shard_ids in enumerate(split_shards(shard_count, workers))]
+        self.identify_limiter = IdentifyLimiter(max_concurrency)
+        self.ipc_path = os.path.abspath(ipc_path)
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+
+        self.address = None
+        self.server = None
+        self.stopping = asyncio.Event()
+
+    async def run(self):
+        await self._start_ipc()
+        logger.info(
+            f"Starting {len(self.workers)} cluster workers for {self.shard_count} shards: "
+            + ", ".join(f"#{worker.id} shards {describe_shards(worker.shard_ids)}" for worker in self.workers)
+        )
+        try:
+            await asyncio.gather(*(self._supervise(worker) for worker in self.workers))
+        finally:
+            self.server.close()
+            if self.address.startswith('unix:') and os.path.exists(self.ipc_path):
+                os.remove(self.ipc_path)
+
+    def stop(self):
+        """Terminate every worker and stop restarting them"""
+        if self.stopping.is_set():
+            return
+        logger.info("Stopping cluster workers...")
+        self.stopping.set()
+        asyncio.create_task(self._terminate_workers())
+
+    async def _terminate_workers(self, grace=30.0):
+        running = [worker.process for worker in self.workers if worker.process is not None]
+        for process in running:
+            if process.returncode is None:
+                process.terminate()
+        await asyncio.sleep(grace)
+        for process in running:
+            if process.returncode is None:
+                logger.warning(f"Worker pid {process.pid} did not exit after {grace:.0f}s; killing it")
+                process.kill()
+
+    async def _start_ipc(self):
+        if hasattr(asyncio, 'start_unix_server'):
+            if os.path.exists(self.ipc_path):
+                os.remove(self.ipc_path)  # Left behind by a previous run
+            self.server = await asyncio.start_unix_server(self._handle_worker, self.ipc_path)
+            self.address = f"unix:{self.ipc_path}"
+        else:
+            # No Unix sockets (Windows): fall back to a loopback TCP port
+            self.server = await asyncio.start_server(self._handle_worker, '127.0.0.1', 0)
+            port = self.server.sockets[0].getsockname()[1]
+            self.address = f"tcp:127.0.0.1:{port}"
+
+    async def _supervise(self, worker):
+        delay = self.restart_delay
+        while not self.stopping.is_set():
+            env = dict(
+                os.environ,
+                CLUSTER_ID=str(worker.id),
+                CLUSTER_IPC=self.address,
+                SHARD_COUNT=str(self.shard_count),
+                SHARD_IDS=",".join(map(str, worker.shard_ids))
+            )
+            started = time.monotonic()
+            worker.process = await asyncio.create_subprocess_exec(*self.command, env=env)
+            worker.starts += 1
+            logger.info(f"Cluster #{worker.id} started (pid {worker.process.pid}, shards {describe_shards(worker.shard_ids)})")
+
+            code = await worker.process.wait()
+            worker.process = None
+            if self.stopping.is_set():
+                break
+            if code == EXIT_FATAL:
+                logger.error(f"Cluster #{worker.id} exited with a fatal error; not restarting it")
+                break
+
+            if time.monotonic() - started >= self.stable_after:
+                delay = self.restart_delay
+            logger.warning(f"Cluster #{worker.id} exited with code {code}; restarting in {delay:g}s")
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.max_restart_delay)
+
+    async def _handle_worker(self, reader, writer):
+        worker = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                op = message['op']
+                if op == 'hello':
+                    worker = self.workers[message['cluster']]
+                    worker.writer = writer
+                    self._broadcast()
+                elif op == 'stats' and worker is not None:
+                    changed = (worker.guilds, worker.users) != (message['guilds'], message['users'])
+                    worker.guilds, worker.users = message['guilds'], message['users']
+                    if changed:
+                        self._broadcast()
+                elif op == 'identify':
+                    asyncio.create_task(self._allow_identify(writer, message['shard'], message['nonce']))
+        except (ConnectionError, ValueError, KeyError, IndexError) as e:
+            if not self.stopping.is_set():
+                logger.warning(f"Dropping IPC connection from cluster #{worker.id if worker else '?'}: {e}")
+        finally:
+            writer.close()
+            if worker is not None and worker.writer is writer:
+                worker.writer = None
+                self._broadcast()
+
+    async def _allow_identify(self, writer, shard_id, nonce):
+        await self.identify_limiter.wait(shard_id)
+        if not writer.is_closing():
+            send(writer, {'op': 'identify', 'nonce': nonce})
+
+    def _broadcast(self):
+        message = {'op': 'clusters', 'clusters': [worker.summary() for worker in self.workers]}
+        for worker in self.workers:
+            if worker.writer is not None and not worker.writer.is_closing():
+                send(worker.writer, message)
+
+class ClusterClient:
+    """A worker's connection to the ClusterSupervisor that started it"""
+
+    def __init__(self, bot, cluster_id, address, report_interval=15.0):
+        self.bot = bot
+        self.cluster_id = cluster_id
+        self.address = address
+        self.report_interval = report_interval
+
+        self.clusters = []  # Latest Worker.summary() of every cluster, from the supervisor
+        self.writer = None
+        self.tasks = []
+        self.pending_identifies = {}  # nonce -> future resolved when the supervisor allows it
+        self.next_nonce = 0
+        self.closing = False
+
+    async def start(self):
+        reader, self.writer = await open_ipc(self.address)
+        send(self.writer, {'op': 'hello', 'cluster': self.cluster_id, 'pid': os.getpid()})
+        self.tasks = [asyncio.create_task(self._read(reader)), asyncio.create_task(self._report_periodically())]
+
+    async def close(self):
+        self.closing = True
+        for task in self.tasks:
+            task.cancel()
+        if self.writer is not None:
+            self.writer.close()
+
+    def report(self):
+        """Send this process's guild and user counts to the supervisor now"""
+        if self.writer is not None and not self.writer.is_closing():
+            send(self.writer, {'op': 'stats', 'guilds': len(self.bot.guilds), 'users': len(self.bot.users)})
+
+    async def identify(self, shard_id):
+        """Wait for the supervisor's go-ahead to IDENTIFY a shard"""
+        nonce = self.next_nonce
+        self.next_nonce += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending_identifies[nonce] = future
+        send(self.writer, {'op': 'identify', 'shard': shard_id, 'nonce': nonce})
+        try:
+            await future
+        finally:
+            self.pending_identifies.pop(nonce, None)
+
+    def fleet_counts(self):
+        """(guilds, users) across every cluster, using this process's own counts as they are now
+
+        Users are summed per cluster, so someone sharing servers on two
+        clusters is counted twice.
+        """
+        guilds, users = len(self.bot.guilds), len(self.bot.users)
+        for cluster in self.clusters:
+            if cluster['id'] != self.cluster_id:
+                guilds += cluster['guilds']
+                users += cluster['users']
+        return guilds, users
+
+    async def _report_periodically(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.report()
+
+    async def _read(self, reader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            if message['op'] == 'clusters':
+                self.clusters = message['clusters']
+                self.bot.dispatch('cluster_update', self.clusters)
+            elif message['op'] == 'identify':
+                future = self.pending_identifies.get(message['nonce'])
+                if future is not None and not future.done():
+                    future.set_result(None)
+
+        if not self.closing:
+            # Without the supervisor nothing would restart or coordinate this
+            # process, and a new supervisor would start its own copy of these shards
+            logger.error("Lost connection to the cluster supervisor; shutting down")
+            asyncio.create_task(self.bot.close())
@@ -0,0 +1,75 @@
+import asyncio
+import time
+import discord
+from discord import app_commands
+
+# _call is private discord.py API (tested on 2.7; pinned in github_requirements.txt).
+# Fail at import rather than silently running commands without the watchdog and metrics
+if not hasattr(app_commands.CommandTree, '_call'):
+    raise RuntimeError("This discord.py version has no CommandTree._call; update BotCommandTree before upgrading")
+
+class BotCommandTree(app_commands.CommandTree):
+    """Command tree that applies the bot's rate limits and time budgets to every app command
+
+    Each command's run time is recorded in the bot's latency histograms.
+
+    Errors from any app command (including rate limit rejections) are passed
+    to DiscordBot.on_app_command_error.
+    """
+
+    @staticmethod
+    def command_name(interaction):
+        command = interaction.command
+        return command.qualified_name if command is not None else interaction.data.get('name')
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        # Autocomplete requests are keystrokes, not command calls
+        if interaction.type is not discord.InteractionType.application_command:
+            return True
+
+        retry_after = self.client.rate_limiter.check(interaction.user.id, self.command_name(interaction))
+        if retry_after:
+            raise app_commands.CommandOnCooldown(app_commands.Cooldown(1, retry_after), retry_after)
+        return True
+
+    async def _call(self, interaction):
+        # discord.py routes every interaction through the private _call; commands
+        # run in a child task here so the watchdog can cancel one that overruns
+        # its budget. Re-check this override whenever discord.py is upgraded
+        if interaction.type is not discord.InteractionType.application_command:
+            return await super()._call(interaction)
+
+        watchdog = self.client.watchdog
+        name = self.command_name(interaction)
+        budget = watchdog.budget_for(name)
+
+        start = time.perf_counter()
+        task = asyncio.ensure_future(super()._call(interaction))
+        try:
+            done, _ = await asyncio.wait({task}, timeout=budget)
+            if done:
+                return task.result()
+
+            watchdog.record_overrun(name, time.perf_counter() - start, task)
+            self.client.metrics.count_error('app_command', asyncio.TimeoutError())
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            await self.send_timeout_reply(interaction)
+        finally:
+            self.client.metrics.observe_command(name, time.perf_counter() - start)
+
+    async def send_timeout_reply(self, interaction):
+        message = "⌛ That command took too long and was stopped. Please try again later."
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send(message, ephemeral=True)
+            else:
+                await interaction.response.send_message(message, ephemeral=True)
+        except discord.HTTPException:
+            pass  # Interaction token may have expired
+
+    async def on_error(self, interaction: discord.Interaction, error):
+        await self.client.on_app_command_error(interaction, error)
@@ -0,0 +1,54 @@
+class DMRoutingIndex:
+    """Maps user IDs to the guilds with a DM reply channel that they belong to
+
+    Only guilds with a DM reply channel are indexed. Each one is scanned once
+    when it is added; after that member join/leave events keep the index
+    current, so routing an incoming DM is a single dict lookup.
+    """
+
+    def __init__(self):
+        self.users = {}  # user_id -> set of guild IDs
+        self.guild_members = {}  # guild_id -> set of user IDs (used to remove a guild)
+
+    def __contains__(self, guild_id):
+        return guild_id in self.guild_members
+
+    def add_guild(self, guild):
+        """Index every (non-bot) member of a guild with a reply channel"""
+        self.remove_guild(guild.id)
+        member_ids = set()
+        for member in guild.members:
+            if not member.bot:
+                member_ids.add(member.id)
+                self.users.setdefault(member.id, set()).add(guild.id)
+        self.guild_members[guild.id] = member_ids
+
+    def remove_guild(self, guild_id):
+        """Stop routing DMs to a guild"""
+        for user_id in self.guild_members.pop(guild_id, ()):
+            guild_ids = self.users.get(user_id)
+            if guild_ids is not None:
+                guild_ids.discard(guild_id)
+                if not guild_ids:
+                    del self.users[user_id]
+
+    def member_joined(self, member):
+        member_ids = self.guild_members.get(member.guild.id)
+        if member_ids is not None and not member.bot:
+            member_ids.add(member.id)
+            self.users.setdefault(member.id, set()).add(member.guild.id)
+
+    def member_left(self, guild_id, user_id):
+        member_ids = self.guild_members.get(guild_id)
+        if member_ids is None or user_id not in member_ids:
+            return
+        member_ids.discard(user_id)
+        guild_ids = self.users.get(user_id)
+        if guild_ids is not None:
+            guild_ids.discard(guild_id)
+            if not guild_ids:
+                del self.users[user_id]
+
+    def route(self, user_id):
+        """Return the IDs of reply-channel guilds that user_id belongs to"""
+        return self.users.get(user_id, ())
@@ -0,0 +1,148 @@
+import aiohttp
+import asyncio
+import logging
+import time
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+class APIClient:
+    """Bot-wide HTTP client with a keep-alive connection pool for external APIs"""
+
+    def __init__(self, endpoints, pool_config, breaker_config=None):
+        self.endpoints = endpoints
+        self.pool_config = pool_config
+        self.session = None
+        self.connector = None
+        self.closed = False
+        
+        # One circuit breaker per endpoint; the configured timeout is its ceiling
+        self.breakers = {
+            name: CircuitBreaker(name, endpoint['timeout'], **(breaker_config or {}))
+            for name, endpoint in endpoints.items()
+        }
+
+        # Pool usage counters
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    async def start(self):
+        """Create the pooled session (must be called from inside the event loop)"""
+        if self.session is not None and not self.session.closed:
+            return
+
+        self.connector = aiohttp.TCPConnector(
+            limit=self.pool_config['limit'],
+            limit_per_host=self.pool_config['limit_per_host'],
+            ttl_dns_cache=self.pool_config['dns_cache_ttl'],
+            use_dns_cache=True,
+            keepalive_timeout=self.pool_config['keepalive_timeout']
+        )
+
+        # Trace connection setup so we can tell new connections from reused ones
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+
+        self.session = aiohttp.ClientSession(
+            connector=self.connector,
+            trace_configs=[trace_config]
+        )
+        logger.info("HTTP client started")
+
+    async def close(self):
+        """Close the session and every pooled connection"""
+        self.closed = True
+        if self.session is not None and not self.session.closed:
+            logger.info(f"Closing HTTP client: {self.stats()}")
+            await self.session.close()
+        self.session = None
+        self.connector = None
+
+    async def _on_connection_created(self, session, context, params):
+        self.connections_created += 1
+
+    async def _on_connection_reused(self, session, context, params):
+        self.connections_reused += 1
+
+    def url(self, endpoint, **url_params):
+        """Return the configured URL for an endpoint, filling in any placeholders"""
+        url = self.endpoints[endpoint]['url']
+        return url.format(**url_params) if url_params else url
+
+    def timeout(self, endpoint):
+        """Return the aiohttp timeout for an endpoint's next request"""
+        return aiohttp.ClientTimeout(total=self.breakers[endpoint].timeout())
+
+    async def get_json(self, endpoint, params=None, **url_params):
+        """GET a configured endpoint and return the decoded JSON body
+
+        Raises aiohttp.ClientError (or asyncio.TimeoutError) on failure so callers
+        can fall back to local content. While the endpoint's circuit breaker is
+        open this raises CircuitOpenError immediately instead.
+        """
+        if self.closed:
+            # Reopening here would leak a session nobody closes
+            raise aiohttp.ClientConnectionError("HTTP client is closed")
+
+        breaker = self.breakers[endpoint]
+        if not breaker.allow():
+            raise CircuitOpenError(endpoint, breaker.retry_in())
+
+        if self.session is None or self.session.closed:
+            await self.start()
+
+        self.requests += 1
+        url = self.url(endpoint, **url_params)
+        timeout = self.timeout(endpoint)
+        start = time.perf_counter()
+        try:
+            async with self.session.get(url, params=params, timeout=timeout) as resp:
+                resp.raise_for_status()
+                data = await resp.json(content_type=None)
+        except aiohttp.ClientResponseError as e:
+            # Client errors (such as an unknown city) mean the service itself is up
+            if e.status < 500 and e.status != 429:
+                breaker.record_success(time.perf_counter() - start)
+            else:
+                breaker.record_failure(time.perf_counter() - start)
+            raise
+        except asyncio.TimeoutError:
+            breaker.record_failure(timeout.total)
+            raise
+        except (aiohttp.ClientError, ValueError):
+            breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            breaker.record_cancelled()
+            raise
+
+        breaker.record_success(time.perf_counter() - start)
+        return data
+
+    def breaker_stats(self):
+        """Return circuit breaker state for every endpoint"""
+        return {name: breaker.stats() for name, breaker in self.breakers.items()}
+
+    def stats(self):
+        """Return connection pool usage counters"""
+        idle = 0
+        in_use = 0
+        if self.connector is not None and not self.connector.closed:
+            # aiohttp does not expose these publicly; read them defensively
+            idle = sum(len(conns) for conns in getattr(self.connector, '_conns', {}).values())
+            in_use = len(getattr(self.connector, '_acquired', ()))
+
+        total_connections = self.connections_created + self.connections_reused
+        reuse_ratio = self.connections_reused / total_connections if total_connections else 0.0
+
+        return {
+            'requests': self.requests,
+            'open': idle + in_use,
+            'idle': idle,
+            'in_use': in_use,
+            'created': self.connections_created,
+            'reused': self.connections_reused,
+            'reuse_ratio': reuse_ratio
+        }
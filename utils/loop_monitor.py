@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from utils.watchdog import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+def own_code(filename):
+    return filename.startswith(PROJECT_ROOT)
+
+def describe_frame(frame):
+    filename, lineno, function = frame
+    filename = os.path.relpath(filename, PROJECT_ROOT) if own_code(filename) else os.path.basename(filename)
+    return f"{filename}:{lineno} in {function}"
+
+class LoopMonitor:
+    """Measures event loop lag and catches whatever blocks the loop
+
+    A sampler task sleeps `interval` seconds at a time and records how late
+    it woke up in a fixed-size ring buffer. A watcher thread checks when the
+    sampler is due; once it is more than `threshold` seconds overdue, some
+    callback or task step is blocking the loop, so the watcher snapshots the
+    loop thread's stack while it is still stuck. When the loop comes back the
+    stall is recorded against the handler it was stuck in, with that stack.
+    """
+
+    def __init__(self, interval=0.25, threshold=0.1, samples=1200, history=20, log_interval=60.0):
+        self.interval = interval
+        self.threshold = threshold
+        self.log_interval = log_interval
+
+        # Ring buffer of lag samples in seconds
+        self.samples = array('d', bytes(8 * samples))
+        self.position = 0
+        self.filled = 0
+
+        self.slow_callbacks = 0
+        self.offenders = {}  # handler -> [stalls, worst lag, stack of the worst]
+        self.recent = deque(maxlen=history)  # (when, handler, task name, lag, stack)
+
+        self.due_at = None  # When the sampler should next wake up (monotonic)
+        self.snapshot = None  # (due_at, handler, task name, stack) taken by the watcher
+
+        self.loop = None
+        self.loop_thread_id = None
+        self.task = None
+        self.watcher = None
+        self.stopping = threading.Event()
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.task = asyncio.create_task(self._sample())
+        self.watcher = threading.Thread(target=self._watch, name='loop-monitor', daemon=True)
+        self.watcher.start()
+
+    def close(self):
+        self.stopping.set()
+        if self.task is not None:
+            self.task.cancel()
+        if self.watcher is not None:
+            self.watcher.join(timeout=1.0)
+
+    def percentile(self, fraction):
+        if not self.filled:
+            return 0.0
+        ordered = sorted(self.samples[:self.filled])
+        return ordered[min(self.filled - 1, int(fraction * self.filled))]
+
+    def stats(self):
+        worst = sorted(self.offenders.items(), key=lambda item: item[1][1], reverse=True)[:3]
+        return {
+            'p50': self.percentile(0.5),
+            'p99': self.percentile(0.99),
+            'max': max(self.samples[:self.filled], default=0.0),
+            'samples': self.filled,
+            'slow_callbacks': self.slow_callbacks,
+            'worst': [(handler, stalls, lag) for handler, (stalls, lag, _) in worst],
+            'last': self.recent[-1] if self.recent else None
+        }
+
+    def log_stats(self):
+        stats = self.stats()
+        worst = ",".join(f"{handler}:{lag * 1000:.0f}ms" for handler, _, lag in stats['worst']) or "-"
+        logger.info(
+            f"loop_lag p50_ms={stats['p50'] * 1000:.1f} p99_ms={stats['p99'] * 1000:.1f} "
+            f"max_ms={stats['max'] * 1000:.1f} samples={stats['samples']} "
+            f"slow_callbacks={stats['slow_callbacks']} worst={worst}"
+        )
+
+    async def _sample(self):
+        next_log = time.monotonic() + self.log_interval
+        while True:
+            self.due_at = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - self.due_at)
+
+            self.samples[self.position] = lag
+            self.position = (self.position + 1) % len(self.samples)
+            self.filled = min(self.filled + 1, len(self.samples))
+
+            if lag > self.threshold:
+                self._record_stall(lag)
+            if now >= next_log:
+                self.log_stats()
+                next_log = now + self.log_interval
+
+    def _record_stall(self, lag):
+        snapshot, self.snapshot = self.snapshot, None
+        if snapshot is not None and snapshot[0] == self.due_at:
+            _, handler, task_name, stack = snapshot
+        else:
+            # Too short for the watcher to catch in the act
+            handler, task_name, stack = "unknown", None, []
+
+        self.slow_callbacks += 1
+        self.recent.append((time.time(), handler, task_name, lag, stack))
+        offender = self.offenders.get(handler)
+        if offender is None:
+            self.offenders[handler] = [1, lag, stack]
+        else:
+            offender[0] += 1
+            if lag > offender[1]:
+                offender[1] = lag
+                offender[2] = stack
+
+        logger.warning(
+            f"Event loop blocked for {lag * 1000:.0f}ms by {handler}"
+            + (f" (task {task_name})" if task_name else "")
+            + ("\n" + "\n".join(f"  {line}" for line in stack) if stack else "")
+        )
+
+    def _watch(self):
+        # Runs in its own thread so it can look at the loop while the loop is stuck
+        poll = self.threshold / 2
+        while not self.stopping.wait(poll):
+            due_at = self.due_at
+            if due_at is None or time.monotonic() - due_at < self.threshold:
+                continue
+            if self.snapshot is not None and self.snapshot[0] == due_at:
+                continue  # Already captured this stall
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            self.snapshot = (due_at, *self._describe(frame))
+
+    def _describe(self, frame):
+        """Return (handler, task name, stack lines) for the loop thread's current frame"""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append((code.co_filename, frame.f_lineno, getattr(code, 'co_qualname', code.co_name)))
+            frame = frame.f_back
+        frames.reverse()  # Outermost first
+
+        # Only the frames below the loop's callback dispatch belong to the blocking callback
+        for index in range(len(frames) - 1, -1, -1):
+            if frames[index][2] == 'Handle._run':
+                frames = frames[index + 1:]
+                break
+
+        # The innermost frame in the bot's own code names the handler; fall back
+        # to the innermost frame of all if the loop is stuck outside it
+        own = [entry for entry in frames if own_code(entry[0])]
+        handler = (own or frames)[-1][2] if frames else "unknown"
+
+        task = asyncio.current_task(self.loop)
+        task_name = task.get_name() if task is not None else None
+        return handler, task_name, [describe_frame(entry) for entry in frames[-8:]]
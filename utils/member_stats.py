@@ -0,0 +1,162 @@
+import discord
+
+# Statuses shown by /serverinfo and /membercount
+TRACKED_STATUSES = (
+    discord.Status.online,
+    discord.Status.idle,
+    discord.Status.dnd,
+    discord.Status.offline
+)
+
+class MemberStats:
+    """Human, bot, status and role membership counters for one guild"""
+
+    __slots__ = ('humans', 'bots', 'statuses', 'roles')
+
+    def __init__(self):
+        self.humans = 0
+        self.bots = 0
+        self.statuses = dict.fromkeys(TRACKED_STATUSES, 0)
+        self.roles = {}  # role_id -> member count
+
+    @classmethod
+    def from_members(cls, members):
+        """Count a member list from scratch in a single pass"""
+        stats = cls()
+        for member in members:
+            stats.add(member)
+        return stats
+
+    def add(self, member):
+        if member.bot:
+            self.bots += 1
+        else:
+            self.humans += 1
+        if member.status in self.statuses:
+            self.statuses[member.status] += 1
+        for role in member.roles:
+            self.roles[role.id] = self.roles.get(role.id, 0) + 1
+
+    def remove(self, member):
+        if member.bot:
+            self.bots -= 1
+        else:
+            self.humans -= 1
+        if member.status in self.statuses:
+            self.statuses[member.status] -= 1
+        for role in member.roles:
+            self.roles[role.id] = self.roles.get(role.id, 0) - 1
+
+    def update(self, before, after):
+        self.update_status(before, after)
+        self.update_roles(before, after)
+
+    def update_status(self, before, after):
+        if before.status != after.status:
+            if before.status in self.statuses:
+                self.statuses[before.status] -= 1
+            if after.status in self.statuses:
+                self.statuses[after.status] += 1
+
+    def update_roles(self, before, after):
+        if before.roles != after.roles:
+            before_ids = {role.id for role in before.roles}
+            after_ids = {role.id for role in after.roles}
+            for role_id in before_ids - after_ids:
+                self.roles[role_id] = self.roles.get(role_id, 0) - 1
+            for role_id in after_ids - before_ids:
+                self.roles[role_id] = self.roles.get(role_id, 0) + 1
+
+    def role_count(self, role):
+        """Return how many members have a role"""
+        return self.roles.get(role.id, 0)
+
+    def as_dict(self):
+        """Return the member counters keyed by display label (role counts excluded)"""
+        counts = {'Humans': self.humans, 'Bots': self.bots}
+        for status, count in self.statuses.items():
+            counts[status.name.title()] = count
+        return counts
+
+class MemberStatsIndex:
+    """Per-guild member counters kept current from gateway events
+
+    Counters are built once when a guild becomes available and then adjusted
+    by member join/remove/update, presence and role create/delete events, so
+    reading them is O(1).
+    """
+
+    def __init__(self):
+        self.guilds = {}
+
+    def build(self, guild):
+        """(Re)count a guild from its cached member list"""
+        stats = MemberStats.from_members(guild.members)
+        self.guilds[guild.id] = stats
+        return stats
+
+    def get(self, guild):
+        """Return a guild's counters, building them on first use"""
+        stats = self.guilds.get(guild.id)
+        if stats is None:
+            stats = self.build(guild)
+        return stats
+
+    def discard(self, guild):
+        self.guilds.pop(guild.id, None)
+
+    def role_created(self, role):
+        stats = self.guilds.get(role.guild.id)
+        if stats is not None:
+            stats.roles[role.id] = 0
+
+    def role_deleted(self, role):
+        stats = self.guilds.get(role.guild.id)
+        if stats is not None:
+            stats.roles.pop(role.id, None)
+
+    def member_added(self, member):
+        stats = self.guilds.get(member.guild.id)
+        if stats is not None:
+            stats.add(member)
+
+    def member_removed(self, member):
+        stats = self.guilds.get(member.guild.id)
+        if stats is not None:
+            stats.remove(member)
+
+    def member_updated(self, before, after):
+        stats = self.guilds.get(after.guild.id)
+        if stats is not None:
+            stats.update(before, after)
+
+    def presence_updated(self, before, after):
+        # Presence updates only change status, so skip the role comparison
+        stats = self.guilds.get(after.guild.id)
+        if stats is not None:
+            stats.update_status(before, after)
+
+    def check(self, guild):
+        """Recount a guild from scratch and return {label: (indexed, actual)} for any drift
+
+        The fresh counts replace the indexed ones.
+        """
+        indexed = self.guilds.get(guild.id)
+        actual = self.build(guild)
+        if indexed is None:
+            return {}
+
+        indexed_counts = indexed.as_dict()
+        drift = {
+            label: (indexed_counts[label], count)
+            for label, count in actual.as_dict().items()
+            if indexed_counts[label] != count
+        }
+
+        for role in guild.roles:
+            indexed_count = indexed.role_count(role)
+            actual_count = actual.role_count(role)
+            if indexed_count != actual_count:
+                drift[f"@{role.name}"] = (indexed_count, actual_count)
+
+        return drift
@@ -0,0 +1,177 @@
+import functools
+import logging
+import math
+import time
+from bisect import bisect_left
+from collections import Counter
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and three additions"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _number(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return 'NaN'
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """Command/listener latency histograms, error counters and gauges
+
+    Recording only touches plain dicts and lists on the event loop; gauges
+    are callables evaluated when /metrics is scraped, so they cost nothing
+    in between.
+    """
+
+    def __init__(self):
+        self.command_latency = {}  # command name -> Histogram
+        self.listener_latency = {}  # listener name -> Histogram
+        self.errors = Counter()  # (source, error type) -> count
+        self.gauges = {}  # metric name -> (help text, callable)
+        self.families = {}  # metric name -> (help text, type, label, callable returning {label value: value})
+        self.cache_sizes = {}  # cache name -> callable returning its size
+
+    def observe_command(self, name, seconds):
+        histogram = self.command_latency.get(name)
+        if histogram is None:
+            histogram = self.command_latency[name] = Histogram()
+        histogram.observe(seconds)
+
+    def observe_listener(self, name, seconds):
+        histogram = self.listener_latency.get(name)
+        if histogram is None:
+            histogram = self.listener_latency[name] = Histogram()
+        histogram.observe(seconds)
+
+    def count_error(self, source, error):
+        self.errors[(source, type(error).__name__)] += 1
+
+    def gauge(self, name, help_text, func):
+        """Register a gauge read from func() at scrape time"""
+        self.gauges[name] = (help_text, func)
+
+    def family(self, name, help_text, label, func, kind='gauge'):
+        """Register a labelled gauge or counter; func() returns {label value: value} at scrape time"""
+        self.families[name] = (help_text, kind, label, func)
+
+    def cache_gauge(self, cache_name, func):
+        """Report len()-style sizes of an in-memory cache as bot_cache_entries{cache=...}"""
+        self.cache_sizes[cache_name] = func
+
+    def remove_cache_gauge(self, cache_name):
+        self.cache_sizes.pop(cache_name, None)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        self._render_histograms(lines, 'bot_command_latency_seconds', 'App command latency', 'command', self.command_latency)
+        self._render_histograms(lines, 'bot_listener_latency_seconds', 'Event listener latency', 'listener', self.listener_latency)
+
+        lines.append('# HELP bot_errors_total Errors raised by commands, by type')
+        lines.append('# TYPE bot_errors_total counter')
+        for (source, error_type), count in sorted(self.errors.items()):
+            lines.append(f'bot_errors_total{{source="{_escape(source)}",type="{_escape(error_type)}"}} {count}')
+
+        for name, (help_text, func) in sorted(self.gauges.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {_number(self._read(name, func))}')
+
+        for name, (help_text, kind, label, func) in sorted(self.families.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for label_value, value in sorted((self._read(name, func) or {}).items()):
+                lines.append(f'{name}{{{label}="{_escape(label_value)}"}} {_number(value)}')
+
+        lines.append('# HELP bot_cache_entries Entries held in in-memory caches')
+        lines.append('# TYPE bot_cache_entries gauge')
+        for cache_name, func in sorted(self.cache_sizes.items()):
+            lines.append(f'bot_cache_entries{{cache="{_escape(cache_name)}"}} {_number(self._read(cache_name, func))}')
+
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _read(name, func):
+        try:
+            return func()
+        except Exception as e:
+            logger.debug(f"Could not read gauge {name}: {e}")
+            return None
+
+    @staticmethod
+    def _render_histograms(lines, metric, help_text, label, histograms):
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} histogram')
+        for name, histogram in sorted(histograms.items()):
+            label_value = f'{label}="{_escape(name)}"'
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{label_value},le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{label_value},le="+Inf"}} {histogram.count}')
+            lines.append(f'{metric}_sum{{{label_value}}} {histogram.sum!r}')
+            lines.append(f'{metric}_count{{{label_value}}} {histogram.count}')
+
+def timed_listener(name):
+    """Record a cog listener's run time in bot.metrics under name"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(self, *args, **kwargs)
+            finally:
+                self.bot.metrics.observe_listener(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+class MetricsServer:
+    """Serves MetricsRegistry.render() at /metrics over plain HTTP"""
+
+    def __init__(self, registry, host='127.0.0.1', port=9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.runner = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/metrics', self.handle_metrics)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        logger.info(f"Metrics available at http://{self.host}:{self.port}/metrics")
+
+    async def close(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def handle_metrics(self, request):
+        return web.Response(
+            body=self.registry.render().encode('utf-8'),
+            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+        )
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Refill rate is reported over this many recent seconds
+RATE_WINDOW = 600.0
+
+class PrefetchBuffer:
+    """Bounded buffer of API results fetched ahead of time by a background task
+
+    Commands pop a ready item instead of waiting on the API. Whenever the
+    buffer drops below `low_water` the task tops it back up to `capacity`,
+    skipping items among the last `recent_size` seen (0 keeps duplicates).
+    Upstream failures back off exponentially; while the buffer is empty,
+    pop() returns None so callers can use local fallback content.
+    """
+
+    def __init__(self, name, fetch, key=None, capacity=10, low_water=5, recent_size=100,
+                 retry_delay=5.0, max_retry_delay=300.0):
+        self.name = name
+        self.fetch = fetch
+        self.key = key or (lambda item: item)
+        self.capacity = capacity
+        self.low_water = low_water
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self.items = deque()
+        self.recent = deque(maxlen=recent_size)
+        self.recent_keys = set()
+        self.refill_needed = asyncio.Event()
+        self.task = None
+
+        # Metrics
+        self.fetched = 0
+        self.duplicates = 0
+        self.failures = 0
+        self.served = 0
+        self.empty = 0
+        self.fetch_times = deque(maxlen=1000)
+
+    def __len__(self):
+        return len(self.items)
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.refill_needed.set()
+            self.task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def pop(self):
+        """Return the next buffered item, or None if the buffer is empty"""
+        if not self.items:
+            self.empty += 1
+            self.refill_needed.set()
+            return None
+
+        self.served += 1
+        item = self.items.popleft()
+        if len(self.items) < self.low_water:
+            self.refill_needed.set()
+        return item
+
+    def _remember(self, key):
+        if not self.recent.maxlen:
+            return  # recent_size=0 turns duplicate skipping off
+        if len(self.recent) == self.recent.maxlen:
+            self.recent_keys.discard(self.recent[0])
+        self.recent.append(key)
+        self.recent_keys.add(key)
+
+    async def _run(self):
+        delay = self.retry_delay
+        while True:
+            await self.refill_needed.wait()
+            self.refill_needed.clear()
+
+            # Bound the attempts per round so an API repeating itself cannot spin forever
+            attempts = 0
+            while len(self.items) < self.capacity and attempts < self.capacity * 3:
+                attempts += 1
+                try:
+                    item = await self.fetch()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.failures += 1
+                    logger.debug(f"Prefetch for {self.name} failed, retrying in {delay:.0f}s: {e}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.max_retry_delay)
+                    continue
+
+                delay = self.retry_delay
+                self.fetched += 1
+                self.fetch_times.append(time.monotonic())
+                key = self.key(item)
+                if key in self.recent_keys:
+                    self.duplicates += 1
+                    continue
+                self._remember(key)
+                self.items.append(item)
+
+            if len(self.items) < self.low_water:
+                # Still short (the API kept repeating itself); try again after a pause
+                await asyncio.sleep(self.retry_delay)
+                self.refill_needed.set()
+
+    def stats(self):
+        """Return buffer depth, refill rate and upstream failure rate"""
+        cutoff = time.monotonic() - RATE_WINDOW
+        recent_fetches = sum(1 for fetched_at in self.fetch_times if fetched_at >= cutoff)
+        attempts = self.fetched + self.failures
+        return {
+            'depth': len(self.items),
+            'capacity': self.capacity,
+            'served': self.served,
+            'empty': self.empty,
+            'fetched': self.fetched,
+            'duplicates': self.duplicates,
+            'failures': self.failures,
+            'failure_rate': self.failures / attempts if attempts else 0.0,
+            'refill_per_minute': recent_fetches / (RATE_WINDOW / 60)
+        }
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import time
+import discord
+
+logger = logging.getLogger(__name__)
+
+class PresenceManager:
+    """Keeps the bot's status text current with at most one presence update per interval
+
+    Guild joins and leaves only mark the presence as stale. One task sends the
+    update, waiting until `interval` seconds have passed since the previous
+    one, and builds the text when it sends, so a burst of changes (an invite
+    wave, a mass kick, the GUILD_CREATE flood after a reconnect) becomes a
+    single update with the final count. Text that matches what is already
+    shown is not sent again. The text is also stored as the bot's login
+    activity, so a new gateway session IDENTIFYs with it.
+    """
+
+    def __init__(self, bot, text, interval=30.0):
+        self.bot = bot
+        self.text = text  # Called when the update is sent; returns the status text
+        self.interval = interval
+
+        self.shown = None
+        self.last_sent = None
+        self.pending = False
+        self.update_task = None
+
+        # Updates sent, requests folded into a pending update, and updates skipped as unchanged
+        self.sent = 0
+        self.coalesced = 0
+        self.unchanged = 0
+
+    def request(self):
+        """Schedule a presence update; requests before it is sent coalesce into it"""
+        if self.pending:
+            self.coalesced += 1
+        self.pending = True
+        if self.update_task is None or self.update_task.done():
+            self.update_task = asyncio.create_task(self._update())
+
+    def session_started(self):
+        """A new gateway session (READY) starts without our presence; send the text again"""
+        self.shown = None
+        if self.bot.is_ready():
+            self.request()
+
+    def counts(self):
+        return {'sent': self.sent, 'coalesced': self.coalesced, 'unchanged': self.unchanged}
+
+    async def _update(self):
+        # One task sends every update, so they never overlap or reorder
+        while self.pending:
+            if self.last_sent is not None:
+                wait = self.last_sent + self.interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+            self.pending = False
+            text = self.text()
+            if text == self.shown:
+                self.unchanged += 1
+                continue
+
+            activity = discord.Activity(type=discord.ActivityType.watching, name=text)
+            try:
+                await self.bot.change_presence(activity=activity)
+            except Exception as e:
+                logger.warning(f"Could not update presence: {e}")
+                continue
+            finally:
+                self.last_sent = time.monotonic()
+            # change_presence does not keep the activity for the next IDENTIFY; the login activity does
+            self.bot.activity = activity
+            self.shown = text
+            self.sent += 1
+
+    def close(self):
+        if self.update_task is not None:
+            self.update_task.cancel()
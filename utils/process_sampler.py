@@ -0,0 +1,110 @@
+import asyncio
+import gc
+import logging
+import time
+from array import array
+import psutil
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('rss', 'cpu', 'fds', 'tasks', 'threads', 'gc_collections')
+
+# Windows shown by /info and /uptime
+TREND_WINDOWS = (('1m', 60), ('15m', 15 * 60), ('1h', 60 * 60))
+
+class ProcessSampler:
+    """Samples the bot process's resource use in the background
+
+    Every `interval` seconds the process's RSS, CPU%, open file descriptors,
+    asyncio task count, thread count and total GC collections are written
+    into one fixed-size array per field, so `history` samples are kept in
+    constant memory and readers never touch psutil themselves. CPU% is
+    measured over the time since the previous sample.
+    """
+
+    def __init__(self, interval=5.0, history=720):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.started_at = self.process.create_time()
+
+        self.times = array('d', bytes(8 * history))
+        self.series = {field: array('d', bytes(8 * history)) for field in FIELDS}
+        self.position = 0
+        self.filled = 0
+        self.task = None
+
+    def start(self):
+        self.process.cpu_percent()  # The first call only sets the baseline
+        self.task = asyncio.create_task(self._run())
+
+    def close(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.sample()
+            except psutil.Error as e:
+                logger.warning(f"Could not sample process stats: {e}")
+
+    def sample(self):
+        process = self.process
+        with process.oneshot():
+            rss = process.memory_info().rss
+            cpu = process.cpu_percent()
+            threads = process.num_threads()
+            fds = process.num_fds() if hasattr(process, 'num_fds') else process.num_handles()
+
+        values = {
+            'rss': rss,
+            'cpu': cpu,
+            'fds': fds,
+            'tasks': len(asyncio.all_tasks()),
+            'threads': threads,
+            'gc_collections': sum(stats['collections'] for stats in gc.get_stats())
+        }
+        position = self.position
+        self.times[position] = time.monotonic()
+        for field, value in values.items():
+            self.series[field][position] = value
+        self.position = (position + 1) % len(self.times)
+        self.filled = min(self.filled + 1, len(self.times))
+
+    def _recent(self, seconds):
+        """Return ring buffer indexes of the samples taken in the last `seconds`, oldest first"""
+        size = len(self.times)
+        cutoff = time.monotonic() - seconds
+        indexes = []
+        for offset in range(1, self.filled + 1):
+            index = (self.position - offset) % size
+            if self.times[index] < cutoff:
+                break
+            indexes.append(index)
+        indexes.reverse()
+        return indexes
+
+    def latest(self):
+        """Return the most recent sample, or None before the first one"""
+        if not self.filled:
+            return None
+        index = (self.position - 1) % len(self.times)
+        return {field: series[index] for field, series in self.series.items()}
+
+    def trend(self, seconds):
+        """Average of each field over the last `seconds`; gc_collections is the count in that window"""
+        indexes = self._recent(seconds)
+        if not indexes:
+            return None
+        result = {
+            field: sum(series[index] for index in indexes) / len(indexes)
+            for field, series in self.series.items()
+        }
+        collections = self.series['gc_collections']
+        result['gc_collections'] = collections[indexes[-1]] - collections[indexes[0]]
+        return result
+
+    def trends(self):
+        """Return [(label, trend)] for each of TREND_WINDOWS"""
+        return [(label, self.trend(seconds)) for label, seconds in TREND_WINDOWS]
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Discord only bulk deletes messages younger than 14 days; keep a margin for clock skew
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+BULK_DELETE_LIMIT = 100
+
+class PurgeJob:
+    """Delete up to `amount` matching messages from a channel, newest first
+
+    History is streamed page by page and matches are deleted as they are
+    found: in bulk batches of up to 100 while messages are recent enough for
+    bulk delete, then one at a time (paced) for older ones. Scanning stops
+    once `amount` messages have been deleted, `scan_limit` messages have
+    been looked at, `max_single_deletes` messages older than 14 days have
+    been deleted one by one, or the job has run for `time_limit` seconds, so
+    it finishes well inside the 15 minutes an interaction token stays valid.
+    """
+
+    def __init__(self, channel, amount, check=None, scan_limit=5000, after=None, before=None,
+                 single_delete_interval=1.0, max_single_deletes=300, time_limit=600.0,
+                 progress_interval=5.0, on_progress=None):
+        self.channel = channel
+        self.amount = amount
+        self.check = check or (lambda message: True)
+        self.scan_limit = scan_limit
+        self.after = after
+        self.before = before
+        self.single_delete_interval = single_delete_interval
+        self.max_single_deletes = max_single_deletes
+        self.time_limit = time_limit
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress
+
+        self.scanned = 0
+        self.matched = 0
+        self.deleted = 0
+        self.failed = 0
+        self.bulk_requests = 0
+        self.single_requests = 0
+        self.old_deletes = 0  # Paced single deletes of messages too old for bulk delete
+
+        self.started_at = None
+        self.finished_at = None
+        self.single_limit_reached = False
+        self.time_limit_reached = False
+
+    @property
+    def budget_exhausted(self):
+        return self.scanned >= self.scan_limit
+
+    def throughput(self):
+        """Return messages deleted per second"""
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return self.deleted / elapsed if elapsed > 0 else 0.0
+
+    async def run(self):
+        self.started_at = time.monotonic()
+        reporter = asyncio.create_task(self._report_progress()) if self.on_progress else None
+        try:
+            await self._purge()
+        finally:
+            self.finished_at = time.monotonic()
+            if reporter is not None:
+                reporter.cancel()
+        return self.deleted
+
+    async def _purge(self):
+        cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        batch = []
+
+        async for message in self.channel.history(limit=self.scan_limit, before=self.before, after=self.after, oldest_first=False):
+            if time.monotonic() - self.started_at >= self.time_limit:
+                self.time_limit_reached = True
+                break
+            self.scanned += 1
+            if not self.check(message):
+                continue
+            self.matched += 1
+
+            if message.created_at > cutoff:
+                batch.append(message)
+                if len(batch) == BULK_DELETE_LIMIT:
+                    await self._bulk_delete(batch)
+                    batch = []
+            else:
+                # Newest first, so everything from here on is too old for bulk delete
+                if batch:
+                    await self._bulk_delete(batch)
+                    batch = []
+                if self.old_deletes >= self.max_single_deletes:
+                    self.single_limit_reached = True
+                    break
+                await self._single_delete(message)
+
+            if self.matched >= self.amount:
+                break
+
+        if batch:
+            await self._bulk_delete(batch)
+
+    async def _bulk_delete(self, messages):
+        if len(messages) == 1:
+            await self._single_delete(messages[0], paced=False)
+            return
+        self.bulk_requests += 1
+        try:
+            await self.channel.delete_messages(messages)
+            self.deleted += len(messages)
+        except discord.NotFound:
+            # Some were already gone; Discord rejects the whole batch, so retry one by one
+            for message in messages:
+                await self._single_delete(message, paced=False)
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException as e:
+            logger.warning(f"Bulk delete of {len(messages)} messages in {self.channel.id} failed: {e}")
+            self.failed += len(messages)
+
+    async def _single_delete(self, message, paced=True):
+        self.single_requests += 1
+        try:
+            await message.delete()
+            self.deleted += 1
+        except discord.NotFound:
+            pass  # Already deleted
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException as e:
+            logger.warning(f"Deleting message {message.id} failed: {e}")
+            self.failed += 1
+        if paced:
+            self.old_deletes += 1
+            # Old-message deletes share a strict rate limit; stay under it instead of hitting 429s
+            await asyncio.sleep(self.single_delete_interval)
+
+    async def _report_progress(self):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            try:
+                await self.on_progress(self)
+            except Exception as e:
+                logger.warning(f"Could not report purge progress: {e}")
@@ -0,0 +1,91 @@
+import time
+from collections import Counter, OrderedDict
+
+class RateLimiter:
+    """Per-user and global token buckets for app commands
+
+    Buckets refill lazily: a bucket stores its token count and when it was
+    last touched, and the refill since then is added on the next check, so
+    idle users cost nothing. User buckets live in an LRU capped at
+    `max_tracked_users`; the least recently active are evicted first (an
+    evicted bucket would usually have refilled to full anyway), so memory
+    stays flat however many users the bot sees.
+
+    Commands listed in `command_overrides` get their own per-user bucket with
+    their own size and refill period; every other command shares the user's
+    default bucket.
+    """
+
+    def __init__(self, per_user, per_bucket, global_rate_limit, max_tracked_users=50000, command_overrides=None):
+        # (capacity, tokens per second) for the default per-user bucket
+        self.user_limit = (per_user, per_user / per_bucket)
+        self.global_limit = (global_rate_limit, global_rate_limit / 60.0)
+        self.overrides = {
+            name: (override['per_user'], override['per_user'] / override['per_bucket'])
+            for name, override in (command_overrides or {}).items()
+        }
+        self.max_tracked_users = max_tracked_users
+
+        self.buckets = OrderedDict()  # (user_id, command name or None) -> [tokens, updated]
+        self.global_bucket = [float(global_rate_limit), time.monotonic()]
+
+        # Counters
+        self.allowed = 0
+        self.rejected_user = 0
+        self.rejected_global = 0
+        self.rejected_commands = Counter()
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.buckets)
+
+    @staticmethod
+    def _refill(bucket, limit, now):
+        capacity, rate = limit
+        tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        bucket[0] = tokens
+        bucket[1] = now
+        return tokens
+
+    def check(self, user_id, command_name):
+        """Take a token for this call; returns 0 if allowed, else seconds until it would be"""
+        now = time.monotonic()
+
+        limit = self.overrides.get(command_name)
+        key = (user_id, command_name if limit is not None else None)
+        limit = limit or self.user_limit
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = [float(limit[0]), now]
+            self.buckets[key] = bucket
+            if len(self.buckets) > self.max_tracked_users:
+                self.buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.buckets.move_to_end(key)
+
+        if self._refill(bucket, limit, now) < 1.0:
+            self.rejected_user += 1
+            self.rejected_commands[command_name] += 1
+            return (1.0 - bucket[0]) / limit[1]
+
+        if self._refill(self.global_bucket, self.global_limit, now) < 1.0:
+            self.rejected_global += 1
+            self.rejected_commands[command_name] += 1
+            return (1.0 - self.global_bucket[0]) / self.global_limit[1]
+
+        bucket[0] -= 1.0
+        self.global_bucket[0] -= 1.0
+        self.allowed += 1
+        return 0.0
+
+    def stats(self):
+        return {
+            'allowed': self.allowed,
+            'rejected_user': self.rejected_user,
+            'rejected_global': self.rejected_global,
+            'tracked_buckets': len(self.buckets),
+            'evictions': self.evictions,
+            'top_rejected': self.rejected_commands.most_common(3)
+        }
@@ -0,0 +1,134 @@
+import asyncio
+import heapq
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Longest the scheduler sleeps before re-checking the clock
+MAX_SLEEP = 60.0
+
+class ReminderScheduler:
+    """Single task that fires every pending reminder from a persisted min-heap
+
+    Each pending reminder is one small tuple in the heap,
+    (due_at, reminder_id, user_id, channel_id, text, created_at), mirrored in
+    a SQLite table so reminders survive restarts. Times are Unix timestamps;
+    reminders that fell due while the bot was offline fire on startup.
+    """
+
+    def __init__(self, path, deliver, batch_size=50, wait_until_ready=None):
+        self.path = path
+        self.deliver = deliver
+        self.batch_size = batch_size
+        self.wait_until_ready = wait_until_ready
+
+        self.db = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='reminders')
+        self.heap = []
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    async def _run_db(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def __len__(self):
+        return len(self.heap)
+
+    async def open(self):
+        """Load pending reminders and start the scheduler task"""
+        rows = await self._run_db(self._open_db)
+        self.heap = [tuple(row) for row in rows]
+        heapq.heapify(self.heap)
+        self.task = asyncio.create_task(self._run())
+        logger.info(f"Reminder scheduler started with {len(self.heap)} pending reminders")
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.db is not None:
+            await self._run_db(self.db.close)
+            self.db = None
+        self.executor.shutdown(wait=True)
+
+    def _open_db(self):
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS reminders ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " due_at REAL NOT NULL,"
+            " user_id INTEGER NOT NULL,"
+            " channel_id INTEGER NOT NULL,"
+            " text TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self.db.commit()
+        return self.db.execute(
+            "SELECT due_at, id, user_id, channel_id, text, created_at FROM reminders"
+        ).fetchall()
+
+    async def add(self, user_id, channel_id, text, due_at):
+        """Persist a reminder and schedule it; returns its ID"""
+        created_at = time.time()
+        reminder_id = await self._run_db(self._insert, due_at, user_id, channel_id, text, created_at)
+        heapq.heappush(self.heap, (due_at, reminder_id, user_id, channel_id, text, created_at))
+
+        # Wake the scheduler if this is now the next reminder due
+        if self.heap[0][1] == reminder_id:
+            self.wakeup.set()
+        return reminder_id
+
+    def _insert(self, due_at, user_id, channel_id, text, created_at):
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO reminders (due_at, user_id, channel_id, text, created_at) VALUES (?, ?, ?, ?, ?)",
+                (due_at, user_id, channel_id, text, created_at)
+            )
+        return cursor.lastrowid
+
+    def _delete(self, reminder_ids):
+        with self.db:
+            self.db.executemany("DELETE FROM reminders WHERE id = ?", [(reminder_id,) for reminder_id in reminder_ids])
+
+    async def _run(self):
+        if self.wait_until_ready is not None:
+            await self.wait_until_ready()
+
+        while True:
+            self.wakeup.clear()
+            if not self.heap:
+                await self.wakeup.wait()
+                continue
+
+            delay = self.heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Pop everything that is due, up to one batch
+            now = time.time()
+            batch = []
+            while self.heap and self.heap[0][0] <= now and len(batch) < self.batch_size:
+                batch.append(heapq.heappop(self.heap))
+
+            try:
+                await self.deliver(batch)
+            except Exception as e:
+                logger.error(f"Failed to deliver {len(batch)} reminders: {e}")
+
+            try:
+                await self._run_db(self._delete, [reminder[1] for reminder in batch])
+            except Exception as e:
+                logger.error(f"Failed to delete delivered reminders: {e}")
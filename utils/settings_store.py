@@ -0,0 +1,102 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+class JSONSettingsStore:
+    """Dict of settings persisted to a JSON file without blocking the event loop
+
+    Saves are debounced: a burst of changes within the debounce window becomes
+    one write. Each write serializes a snapshot in a worker thread, writes it
+    to a temporary file and atomically renames it over the real one, so a
+    crash mid-write leaves the previous file intact. A failed write is
+    retried after `retry_delay` seconds.
+    """
+
+    def __init__(self, path, debounce=1.0, retry_delay=5.0):
+        self.path = path
+        self.debounce = debounce
+        self.retry_delay = retry_delay
+        self.data = {}
+
+        self.changes = 0  # save() calls so far
+        self.saved = 0  # self.changes as of the last successful write
+        self.flushing = False
+        self.flush_requested = asyncio.Event()
+        self.save_task = None
+
+    async def load(self):
+        """Read the settings file; a corrupt file is reported and moved aside"""
+        self.data = await asyncio.to_thread(self._read)
+        return self.data
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            # Keep the broken file for inspection instead of overwriting it on the next save
+            backup_path = f"{self.path}.corrupt-{int(time.time())}"
+            logger.error(f"Could not load {self.path}: {e}. Moved it to {backup_path} and starting empty")
+            try:
+                os.replace(self.path, backup_path)
+            except OSError as move_error:
+                logger.error(f"Could not move {self.path} aside: {move_error}")
+            return {}
+
+    def save(self):
+        """Schedule a write of the current settings; repeated calls coalesce"""
+        self.changes += 1
+        if self.save_task is None or self.save_task.done():
+            self.save_task = asyncio.create_task(self._save_later())
+
+    async def _save_later(self):
+        # One task does every write, so writes never overlap or reorder
+        delay = self.debounce
+        while self.saved != self.changes:
+            if not self.flushing:
+                try:
+                    await asyncio.wait_for(self.flush_requested.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                self.flush_requested.clear()
+
+            # Changes made while the thread writes stay pending for the next pass
+            changes = self.changes
+            # Copy on the loop (cheap) so the thread never sees the dict change mid-dump
+            snapshot = dict(self.data)
+            try:
+                await asyncio.to_thread(self._write_file, snapshot)
+            except Exception as e:
+                if self.flushing:
+                    logger.error(f"Error saving {self.path}: {e}; unsaved changes are lost")
+                    return
+                logger.error(f"Error saving {self.path}: {e}; retrying in {self.retry_delay:g}s")
+                delay = self.retry_delay
+                continue
+            self.saved = changes
+            delay = self.debounce
+
+    async def flush(self):
+        """Write any scheduled changes now and wait for them to reach disk"""
+        if self.save_task is None or self.save_task.done():
+            return
+        self.flushing = True
+        self.flush_requested.set()
+        try:
+            await self.save_task
+        finally:
+            self.flushing = False
+
+    def _write_file(self, snapshot):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from collections import Counter
+
+# Discord allows max_concurrency IDENTIFYs per this many seconds, one per rate limit bucket
+IDENTIFY_INTERVAL = 5.0
+
+def parse_shard_ids(value):
+    """Parse '0-3' or '0,2,4' (from SHARD_IDS) into a list of shard IDs"""
+    if value is None or isinstance(value, (list, tuple, range)):
+        return list(value) if value is not None else None
+    shard_ids = []
+    for part in str(value).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            shard_ids.extend(range(int(first), int(last) + 1))
+        else:
+            shard_ids.append(int(part))
+    return shard_ids or None
+
+class IdentifyLimiter:
+    """Spaces out shard IDENTIFYs the way Discord's session start limit allows
+
+    discord.py's default before_identify_hook sleeps 5 seconds before every
+    shard after the first, so 16 shards take over a minute to log in even
+    when the application may identify several at once. Discord puts shard N
+    in rate limit bucket N % max_concurrency and allows one IDENTIFY per
+    bucket every 5 seconds, so only shards sharing a bucket need to wait.
+    """
+
+    def __init__(self, max_concurrency=1, interval=IDENTIFY_INTERVAL):
+        self.max_concurrency = max(1, max_concurrency)
+        self.interval = interval
+        self.last_identify = {}  # bucket -> monotonic time of its last IDENTIFY
+        self.locks = {}  # bucket -> asyncio.Lock
+
+    async def wait(self, shard_id):
+        bucket = (shard_id or 0) % self.max_concurrency
+        lock = self.locks.setdefault(bucket, asyncio.Lock())
+        async with lock:
+            last = self.last_identify.get(bucket)
+            if last is not None:
+                delay = last + self.interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self.last_identify[bucket] = time.monotonic()
+
+class ShardStats:
+    """Connect/resume/disconnect counters and per-shard views of the bot's guilds"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.connects = Counter()  # shard_id -> sessions started (READY)
+        self.resumes = Counter()  # shard_id -> sessions resumed
+        self.disconnects = Counter()  # shard_id -> websocket disconnects
+        self.connected_at = {}  # shard_id -> time.time() of the last READY or RESUMED
+
+    # A bot without sharding reports shard_id None; count it as shard 0
+    def record_connect(self, shard_id):
+        shard_id = shard_id or 0
+        self.connects[shard_id] += 1
+        self.connected_at[shard_id] = time.time()
+
+    def record_resume(self, shard_id):
+        shard_id = shard_id or 0
+        self.resumes[shard_id] += 1
+        self.connected_at[shard_id] = time.time()
+
+    def record_disconnect(self, shard_id):
+        self.disconnects[shard_id or 0] += 1
+
+    def shard_ids(self):
+        shards = getattr(self.bot, 'shards', None)
+        if shards is not None:
+            return sorted(shards)
+        return [self.bot.shard_id or 0]
+
+    def latencies(self):
+        """Return [(shard_id, seconds)], sorted by shard ID"""
+        if hasattr(self.bot, 'latencies'):
+            return sorted(self.bot.latencies)
+        return [(self.bot.shard_id or 0, self.bot.latency)]
+
+    def guild_counts(self):
+        """Return {shard_id: (guilds, members)}"""
+        counts = {shard_id: [0, 0] for shard_id in self.shard_ids()}
+        for guild in self.bot.guilds:
+            shard = counts.setdefault(guild.shard_id or 0, [0, 0])
+            shard[0] += 1
+            shard[1] += guild.member_count or 0
+        return {shard_id: tuple(shard) for shard_id, shard in counts.items()}
+
+    def stats(self):
+        """Return one dict per shard with its latency, guilds, members and counters"""
+        guilds = self.guild_counts()
+        return [
+            {
+                'id': shard_id,
+                'latency': latency,
+                'guilds': guilds.get(shard_id, (0, 0))[0],
+                'members': guilds.get(shard_id, (0, 0))[1],
+                'connects': self.connects[shard_id],
+                'resumes': self.resumes[shard_id],
+                'disconnects': self.disconnects[shard_id]
+            }
+            for shard_id, latency in self.latencies()
+        ]
@@ -0,0 +1,73 @@
+import hashlib
+import logging
+import math
+import unicodedata
+from collections.abc import Mapping
+from utils.settings_store import JSONSettingsStore
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+def translation_key(text, target_language):
+    """Hash of the normalized text and target language, used as the cache key"""
+    # Normalize Unicode form and whitespace; case is kept because it changes the translation
+    normalized = ' '.join(unicodedata.normalize('NFC', text).split())
+    payload = f"{target_language.strip().lower()}\n{normalized}".encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+class TranslationsView(Mapping):
+    """The cache's entries as {key: translated text}, in LRU order, for the JSON file"""
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def __getitem__(self, key):
+        return self.entries[key][0]
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+class TranslationCache(TTLCache):
+    """Bounded LRU cache of translations, optionally saved to a JSON file
+
+    A TTLCache whose entries never expire, so identical requests that arrive
+    while a translation is in flight share that one API call. With a path
+    the cache is written (debounced, in LRU order) to disk so it survives
+    restarts.
+    """
+
+    def __init__(self, max_size, path=None, debounce=5.0):
+        super().__init__(math.inf, max_size)
+        self.store = JSONSettingsStore(path, debounce=debounce) if path else None
+        if self.store is not None:
+            self.store.data = TranslationsView(self.entries)
+
+    async def load(self):
+        """Load saved translations (no-op without a path)"""
+        if self.store is None:
+            return
+        saved = await self.store.load()
+        # The file is in LRU order, so keep the most recently used entries
+        for key, translated in list(saved.items())[-self.max_size:]:
+            self.entries[key] = (translated, 0.0)
+        self.store.data = TranslationsView(self.entries)
+        logger.info(f"Loaded {len(self.entries)} cached translations")
+
+    async def translate(self, text, target_language, fetch):
+        """Return the translation of text, calling the coroutine function fetch() on a miss"""
+        return await self.get(translation_key(text, target_language), fetch)
+
+    async def _fetch(self, key, fetch):
+        translated = await super()._fetch(key, fetch)
+        if self.store is not None:
+            self.store.save()
+        return translated
+
+    async def close(self):
+        """Cancel pending requests and write the cache to disk"""
+        super().close()
+        if self.store is not None:
+            await self.store.flush()
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils.triggers import TriggerMatcher
+
+logger = logging.getLogger(__name__)
+
+class TriggerStore:
+    """SQLite-backed trigger storage with a bounded per-guild read cache
+
+    All database work runs on a single background thread so the event loop
+    never waits on disk I/O. Guilds are loaded lazily the first time they are
+    needed and the least recently used ones are evicted once the cache is
+    full. Changes update the cache immediately and are written behind in
+    batches.
+    """
+
+    def __init__(self, path, cache_size=1000, flush_interval=2.0):
+        self.path = path
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+
+        self.db = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='trigger-store')
+
+        # guild_id -> {word: (response, mode)} in priority order
+        self.cache = OrderedDict()
+        # guild_id -> compiled TriggerMatcher (evicted together with the cache entry)
+        self.matchers = {}
+
+        self.pending = []
+        self.flush_event = asyncio.Event()
+        self.flush_lock = asyncio.Lock()
+        self.writer_task = None
+
+    async def _run(self, func, *args):
+        """Run a blocking database call on the store's thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def open(self):
+        """Open the database and start the write-behind task"""
+        await self._run(self._open_db)
+        self.writer_task = asyncio.create_task(self._writer())
+        logger.info(f"Trigger store opened: {self.path}")
+
+    async def close(self):
+        """Flush pending writes and close the database"""
+        if self.writer_task is not None:
+            self.writer_task.cancel()
+            try:
+                await self.writer_task
+            except asyncio.CancelledError:
+                pass
+            self.writer_task = None
+
+        if self.db is not None:
+            await self.flush()
+            await self._run(self.db.close)
+            self.db = None
+        self.executor.shutdown(wait=True)
+
+    def _open_db(self):
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS triggers ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " guild_id INTEGER NOT NULL,"
+            " word TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " mode TEXT NOT NULL,"
+            " UNIQUE (guild_id, word))"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS triggers_guild_order ON triggers (guild_id, id)")
+        self.db.commit()
+
+    # Cache
+
+    async def get_triggers(self, guild_id):
+        """Return a guild's triggers as {word: (response, mode)}, loading them if needed"""
+        triggers = self.cache.get(guild_id)
+        if triggers is not None:
+            self.cache.move_to_end(guild_id)
+            return triggers
+
+        # Make sure the database reflects every change before reading it back
+        await self.flush()
+        rows = await self._run(self._load_guild, guild_id)
+
+        # Another coroutine may have loaded the guild while we were waiting
+        triggers = self.cache.get(guild_id)
+        if triggers is None:
+            triggers = {word: (response, mode) for word, response, mode in rows}
+            self.cache[guild_id] = triggers
+            self._evict()
+        self.cache.move_to_end(guild_id)
+        return triggers
+
+    async def get_matcher(self, guild_id):
+        """Return the compiled matcher for a guild, or None if it has no triggers"""
+        triggers = await self.get_triggers(guild_id)
+        if not triggers:
+            return None
+
+        matcher = self.matchers.get(guild_id)
+        if matcher is None:
+            matcher = TriggerMatcher(
+                (word, response, mode) for word, (response, mode) in triggers.items()
+            )
+            self.matchers[guild_id] = matcher
+        return matcher
+
+    def _evict(self):
+        while len(self.cache) > self.cache_size:
+            guild_id, _ = self.cache.popitem(last=False)
+            self.matchers.pop(guild_id, None)
+
+    def _load_guild(self, guild_id):
+        cursor = self.db.execute(
+            "SELECT word, response, mode FROM triggers WHERE guild_id = ? ORDER BY id",
+            (guild_id,)
+        )
+        return cursor.fetchall()
+
+    # Writes
+
+    async def set_trigger(self, guild_id, word, response, mode):
+        """Add or replace a trigger; the database write happens in the background"""
+        triggers = await self.get_triggers(guild_id)
+        triggers[word] = (response, mode)
+        self.matchers.pop(guild_id, None)
+        self._queue(('set', guild_id, word, response, mode))
+
+    async def remove_trigger(self, guild_id, word):
+        """Remove a trigger, returning False if it did not exist"""
+        triggers = await self.get_triggers(guild_id)
+        if word not in triggers:
+            return False
+        del triggers[word]
+        self.matchers.pop(guild_id, None)
+        self._queue(('remove', guild_id, word))
+        return True
+
+    def _queue(self, operation):
+        self.pending.append(operation)
+        self.flush_event.set()
+
+    async def _writer(self):
+        """Batch queued changes into one transaction every flush interval"""
+        while True:
+            await self.flush_event.wait()
+            await asyncio.sleep(self.flush_interval)
+            self.flush_event.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write triggers: {e}")
+
+    async def flush(self):
+        """Write every pending change to the database"""
+        async with self.flush_lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, []
+            try:
+                await self._run(self._write_batch, batch)
+            except Exception:
+                # Keep the changes so the next flush retries them in order
+                self.pending = batch + self.pending
+                raise
+
+    def _write_batch(self, batch):
+        with self.db:
+            for operation in batch:
+                if operation[0] == 'set':
+                    _, guild_id, word, response, mode = operation
+                    self.db.execute(
+                        "INSERT INTO triggers (guild_id, word, response, mode) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (guild_id, word) DO UPDATE SET response = excluded.response, mode = excluded.mode",
+                        (guild_id, word, response, mode)
+                    )
+                else:
+                    _, guild_id, word = operation
+                    self.db.execute(
+                        "DELETE FROM triggers WHERE guild_id = ? AND word = ?",
+                        (guild_id, word)
+                    )
+
+    # Paging
+
+    async def list_triggers(self, guild_id, page, page_size):
+        """Return (rows, total) for one page of a guild's triggers in priority order"""
+        await self.flush()
+        return await self._run(self._list_page, guild_id, page, page_size)
+
+    def _list_page(self, guild_id, page, page_size):
+        total = self.db.execute(
+            "SELECT COUNT(*) FROM triggers WHERE guild_id = ?",
+            (guild_id,)
+        ).fetchone()[0]
+        rows = self.db.execute(
+            "SELECT word, response, mode FROM triggers WHERE guild_id = ? ORDER BY id LIMIT ? OFFSET ?",
+            (guild_id, page_size, (page - 1) * page_size)
+        ).fetchall()
+        return rows, total
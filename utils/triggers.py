@@ -0,0 +1,139 @@
+from collections import deque
+
+# Trigger matching modes
+MODE_SUBSTRING = 'substring'  # Trigger can appear anywhere in the message
+MODE_WORD = 'word'  # Trigger must be surrounded by whitespace or the message edges
+
+# Below this many triggers a C-level str.find per trigger beats walking the automaton
+LINEAR_SCAN_LIMIT = 32
+
+def _is_whole_word(text, start, end):
+    """Check that text[start:end] is bounded by whitespace or the edges of text"""
+    return (start == 0 or text[start - 1].isspace()) and (end == len(text) or text[end].isspace())
+
+class TriggerMatcher:
+    """Aho-Corasick automaton that finds a guild's first matching trigger in one pass
+
+    Triggers are ranked by the order they were given in; when several triggers
+    appear in a message the lowest-ranked one wins, which matches walking the
+    old per-guild trigger dict in insertion order.
+    """
+
+    def __init__(self, triggers):
+        """Build the automaton from (word, response, mode) tuples in priority order"""
+        self.responses = []
+        self.patterns = []
+
+        # Per-node state: outgoing edges, failure link, best substring rank and
+        # whole-word outputs as (rank, length) pairs sorted by rank
+        self.goto = [{}]
+        self.fail = [0]
+        self.best = [None]
+        self.word_outputs = [[]]
+
+        for rank, (word, response, mode) in enumerate(triggers):
+            self.responses.append(response)
+            self.patterns.append((word, mode))
+            if not word:
+                continue
+
+            node = 0
+            for char in word:
+                next_node = self.goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto[node][char] = next_node
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(None)
+                    self.word_outputs.append([])
+                node = next_node
+
+            if mode == MODE_WORD:
+                self.word_outputs[node].append((rank, len(word)))
+            elif self.best[node] is None:
+                self.best[node] = rank
+
+        self._link()
+
+    def _link(self):
+        """Compute failure links breadth-first and fold outputs along them"""
+        queue = deque()
+        for child in self.goto[0].values():
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+
+                # Longest proper suffix of child's path that is also in the trie
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                target = self.goto[state].get(char, 0)
+                self.fail[child] = target if target != child else 0
+
+                # Inherit every pattern that ends at the failure target
+                inherited = self.best[self.fail[child]]
+                if inherited is not None and (self.best[child] is None or inherited < self.best[child]):
+                    self.best[child] = inherited
+                if self.word_outputs[self.fail[child]]:
+                    self.word_outputs[child] = sorted(self.word_outputs[child] + self.word_outputs[self.fail[child]])
+
+    def __len__(self):
+        return len(self.responses)
+
+    def match(self, text):
+        """Return the response of the highest-priority trigger found in text, or None
+
+        text is expected to already be lowercased.
+        """
+        if len(self.responses) <= LINEAR_SCAN_LIMIT:
+            return self._linear_match(text)
+
+        goto = self.goto
+        fail = self.fail
+        best_at = self.best
+        word_outputs = self.word_outputs
+
+        best = None
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not node:
+                continue
+
+            rank = best_at[node]
+            if rank is not None and (best is None or rank < best):
+                best = rank
+
+            for rank, length in word_outputs[node]:
+                if best is not None and rank >= best:
+                    break
+                if _is_whole_word(text, index - length + 1, index + 1):
+                    best = rank
+                    break
+
+            if best == 0:
+                break  # Nothing can outrank the first trigger
+
+        return self.responses[best] if best is not None else None
+
+    def _linear_match(self, text):
+        """Check each trigger in priority order; cheaper than the automaton for small sets"""
+        for rank, (word, mode) in enumerate(self.patterns):
+            if not word:
+                continue
+            start = text.find(word)
+            if mode != MODE_WORD:
+                if start != -1:
+                    return self.responses[rank]
+                continue
+            while start != -1:
+                if _is_whole_word(text, start, start + len(word)):
+                    return self.responses[rank]
+                start = text.find(word, start + 1)
+        return None
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """Bounded LRU cache for async lookups with request coalescing
+
+    Entries are fresh for `ttl` seconds. For a further `stale_ttl` seconds
+    they are still served while one background fetch refreshes them; after
+    that they are dropped. Concurrent misses for the same key share a single
+    fetch. Failed fetches are never cached.
+    """
+
+    def __init__(self, ttl, max_size, stale_ttl=0.0):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+
+        self.entries = OrderedDict()  # key -> (value, fetched_at)
+        self.in_flight = {}  # key -> fetch task
+
+        # Lookup counters
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    async def get(self, key, fetch):
+        """Return the cached value for key, calling the coroutine function fetch() when needed"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return value
+            if age < self.ttl + self.stale_ttl:
+                # Serve the stale value now and refresh it in the background
+                self.stale_hits += 1
+                self.entries.move_to_end(key)
+                if key not in self.in_flight:
+                    self.refreshes += 1
+                    self._start_fetch(key, fetch)
+                return value
+            del self.entries[key]
+
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._start_fetch(key, fetch)
+
+        # Shield so one caller giving up does not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, key, fetch):
+        task = asyncio.create_task(self._fetch(key, fetch))
+        task.add_done_callback(self._fetch_done)
+        self.in_flight[key] = task
+        return task
+
+    async def _fetch(self, key, fetch):
+        try:
+            value = await fetch()
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight.pop(key, None)
+
+        self.entries[key] = (value, time.monotonic())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def _fetch_done(self, task):
+        # Background refreshes have no caller; retrieve their errors so they are not reported as unhandled
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Cache fetch failed: {task.exception()}")
+
+    def close(self):
+        """Cancel any fetches still running"""
+        for task in list(self.in_flight.values()):
+            task.cancel()
+        self.in_flight.clear()
+
+    def stats(self):
+        """Return lookup counters and the current size"""
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        served_from_cache = self.hits + self.stale_hits + self.coalesced
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'refreshes': self.refreshes,
+            'errors': self.errors,
+            'evictions': self.evictions,
+            'hit_ratio': served_from_cache / lookups if lookups else 0.0
+        }
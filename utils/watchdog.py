@@ -0,0 +1,79 @@
+import logging
+import os
+import time
+from collections import Counter, deque
+
+logger = logging.getLogger(__name__)
+
+# Interaction tokens expire after 15 minutes; a budget must leave time to send the timeout reply
+MAX_BUDGET = 840.0
+
+# Frames from the bot's own code are preferred when reporting where a command was stuck
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def await_chain(coro):
+    """Return 'file:line in function' for each coroutine in an await chain, outermost first"""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if frame is not None:
+            frames.append((frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name))
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+    return frames
+
+def stuck_at(task):
+    """Describe the await point a running task is suspended at"""
+    frames = await_chain(task.get_coro())
+    if not frames:
+        return "unknown"
+
+    def describe(frame):
+        filename, lineno, function = frame
+        if filename.startswith(PROJECT_ROOT):
+            filename = os.path.relpath(filename, PROJECT_ROOT)
+        else:
+            filename = os.path.basename(filename)
+        return f"{filename}:{lineno} in {function}"
+
+    # The innermost frame in our own code says more than one deep inside a library,
+    # so show that, followed by the library call it was waiting on
+    own = [frame for frame in frames if frame[0].startswith(PROJECT_ROOT)]
+    if own and own[-1] is not frames[-1]:
+        return f"{describe(own[-1])} -> {describe(frames[-1])}"
+    return describe(frames[-1])
+
+class CommandWatchdog:
+    """Time budgets for app commands and a record of the ones that overran"""
+
+    def __init__(self, default_budget, budgets=None, history=20):
+        self.default_budget = self._cap('default', default_budget)
+        self.budgets = {name: self._cap(name, budget) for name, budget in (budgets or {}).items()}
+        self.overruns = Counter()  # command name -> times cancelled
+        self.recent = deque(maxlen=history)  # (when, command, elapsed, stuck at)
+
+    @staticmethod
+    def _cap(command_name, budget):
+        if budget > MAX_BUDGET:
+            logger.warning(f"Budget for {command_name} ({budget:g}s) outlives the interaction token; using {MAX_BUDGET:g}s")
+            return MAX_BUDGET
+        return budget
+
+    def budget_for(self, command_name):
+        return self.budgets.get(command_name, self.default_budget)
+
+    def record_overrun(self, command_name, elapsed, task):
+        location = stuck_at(task)
+        self.overruns[command_name] += 1
+        self.recent.append((time.time(), command_name, elapsed, location))
+        logger.warning(
+            f"Command /{command_name} exceeded its {self.budget_for(command_name):g}s budget "
+            f"after {elapsed:.1f}s and was cancelled; stuck at {location}"
+        )
+        return location
+
+    def stats(self):
+        return {
+            'total_overruns': sum(self.overruns.values()),
+            'by_command': self.overruns.most_common(3),
+            'last': self.recent[-1] if self.recent else None
+        }